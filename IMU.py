@@ -27,14 +27,55 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 =============================================
 """
-from machine import I2C, Pin
-from utime import sleep_ms
+from array import array
+from collections import namedtuple
 from math import atan, pi, pow, sqrt
+try:
+    from machine import I2C, Pin
+except ImportError:
+    # CPython, the bus comes from i2cdev.I2CDev
+    I2C = Pin = None
+try:
+    from utime import sleep_ms, sleep_us, ticks_add, ticks_diff, ticks_us
+except ImportError:
+    from time import monotonic_ns, sleep
+
+    def sleep_ms(ms):
+        """Sleep for `ms` milliseconds."""
+        sleep(ms / 1000)
+
+    def sleep_us(us):
+        """Sleep for `us` microseconds."""
+        sleep(us / 1000000)
+
+    def ticks_us():
+        """Get a monotonic microsecond counter, it does not wrap."""
+        return monotonic_ns() // 1000
+
+    def ticks_diff(end, start):
+        """Get `end - start` of two ticks_us values."""
+        return end - start
+
+    def ticks_add(ticks, delta):
+        """Get ticks_us value `ticks` moved by `delta`."""
+        return ticks + delta
+try:
+    from ustruct import unpack_from
+except ImportError:
+    from struct import unpack_from
+try:
+    from _thread import allocate_lock, get_ident, start_new_thread
+except ImportError:
+    allocate_lock = get_ident = start_new_thread = None
 
 MPU6050_ADDRESS_AD0_LOW  = 0x68  # address pin low (GND)
 MPU6050_ADDRESS_AD0_HIGH = 0x69  # address pin high (VCC)
 MPU6050_DEFAULT_ADDRESS  = MPU6050_ADDRESS_AD0_LOW
 
+MPU6050_RA_SELF_TEST_X       = 0x0D
+MPU6050_RA_SELF_TEST_Y       = 0x0E
+MPU6050_RA_SELF_TEST_Z       = 0x0F
+MPU6050_RA_SELF_TEST_A       = 0x10
 MPU6050_RA_SMPLRT_DIV        = 0x19
 MPU6050_RA_CONFIG            = 0x1A  # [5:3] EXT_SYNC_SET[2:0], [2:0] DLPF_CFG[2:0]
 MPU6050_RA_GYRO_CONFIG       = 0x1B
@@ -68,6 +109,16 @@ MPU6050_RA_FIFO_COUNTL       = 0x73
 MPU6050_RA_FIFO_R_W          = 0x74
 MPU6050_RA_WHO_AM_I          = 0x75
 
+# SELF_TEST_X, SELF_TEST_Y, SELF_TEST_Z: [7:5] XA_TEST[4:2], [4:0] XG_TEST
+# SELF_TEST_A: [5:4] XA_TEST[1:0], [3:2] YA_TEST[1:0], [1:0] ZA_TEST[1:0]
+MPU6050_TEST_A_BIT    = 7
+MPU6050_TEST_A_LENGTH = 3
+MPU6050_TEST_G_BIT    = 4
+MPU6050_TEST_G_LENGTH = 5
+MPU6050_TEST_A_LOW_BIT    = 5  # X, then 2 bits lower per axis
+MPU6050_TEST_A_LOW_LENGTH = 2
+MPU6050_SELF_TEST_TOLERANCE = 0.14  # change from factory trim
+
 # CONFIG
 MPU6050_CFG_EXT_SYNC_SET_BIT    = 5
 MPU6050_CFG_EXT_SYNC_SET_LENGTH = 3
@@ -93,6 +144,32 @@ MPU6050_DLPF_BW_20  = 0x04
 MPU6050_DLPF_BW_10  = 0x05
 MPU6050_DLPF_BW_5   = 0x06
 
+# Gyroscope bandwidth (Hz) by DLPF_CFG
+MPU6050_DLPF_BANDWIDTH = (256, 188, 98, 42, 20, 10, 5)
+
+# Gyroscope output rate (Hz)
+MPU6050_GYRO_OUTPUT_RATE      = 8000  # DLPF_CFG = 0 or 7
+MPU6050_GYRO_OUTPUT_RATE_DLPF = 1000  # DLPF_CFG = 1 to 6
+MPU6050_ACCEL_OUTPUT_RATE     = 1000
+
+# Relative sample rate error above which plan_output_rate warns
+MPU6050_RATE_TOLERANCE = 0.05
+
+# I2C bus budget
+MPU6050_I2C_DEFAULT_FREQ  = 400000  # machine.I2C default on ESP32
+MPU6050_I2C_BYTE_CLOCKS   = 9  # 8 data bits + ACK
+MPU6050_I2C_READ_OVERHEAD = 3  # address write, register, address read
+MPU6050_I2C_FREQS         = (100000, 400000, 800000, 1000000)
+MPU6050_FIFO_SIZE         = 1024
+
+# INT_STATUS, ACCEL_*OUT, TEMP_OUT, GYRO_*OUT burst
+MPU6050_POLL_LENGTH = 15
+
+# Cached memoryview slices per buffer, see Views
+MPU6050_VIEWS_LIMIT = 16
+# Most drain units per Sampler block, see Sampler
+MPU6050_SAMPLER_UNITS = 8
+
 # GYRO_CONFIG
 MPU6050_GCONFIG_XG_ST_BIT     = 7
 MPU6050_GCONFIG_YG_ST_BIT     = 6
@@ -105,6 +182,8 @@ MPU6050_GYRO_FS_250  = 0x00
 MPU6050_GYRO_FS_500  = 0x01
 MPU6050_GYRO_FS_1000 = 0x02
 MPU6050_GYRO_FS_2000 = 0x03
+# LSB per deg/s for each FS_SEL
+MPU6050_GYRO_SENSITIVITY = (131, 65.5, 32.8, 16.4)
 
 # ACCEL_CONFIG
 MPU6050_ACONFIG_XA_ST_BIT      = 7
@@ -118,6 +197,12 @@ MPU6050_ACCEL_FS_2  = 0x00
 MPU6050_ACCEL_FS_4  = 0x01
 MPU6050_ACCEL_FS_8  = 0x02
 MPU6050_ACCEL_FS_16 = 0x03
+# LSB per g for each AFS_SEL
+MPU6050_ACCEL_SENSITIVITY = (16384, 8192, 4096, 2048)
+
+# TEMP_OUT: degC = raw / 340 + 36.53
+MPU6050_TEMP_SENSITIVITY = 340
+MPU6050_TEMP_OFFSET = 36.53
 
 # FIFO_EN
 MPU6050_TEMP_FIFO_EN_BIT  = 7
@@ -228,468 +313,700 @@ MPU6050_PWR2_STBY_XG_BIT         = 2
 MPU6050_PWR2_STBY_YG_BIT         = 1
 MPU6050_PWR2_STBY_ZG_BIT         = 0
 
+# LP_WAKE_CTRL, accelerometer only low power wake-up rate
+MPU6050_WAKE_FREQ_1P25 = 0x0
+MPU6050_WAKE_FREQ_5    = 0x1
+MPU6050_WAKE_FREQ_20   = 0x2
+MPU6050_WAKE_FREQ_40   = 0x3
+
+# Power profiles, name: (PWR_MGMT_1, PWR_MGMT_2, typical current uA).
+# Currents are the datasheet typical values at 25C; 6axis is quoted with
+# the DMP running. Profiles without gyroscope run on the internal clock
+# with the temperature sensor off.
+MPU6050_POWER_PROFILES = {
+    '6axis': (0x01, 0x00, 3900),         # PLL X gyro
+    'gyro': (0x01, 0x38, 3600),          # PLL X gyro, accel standby
+    'accel': (0x08, 0x07, 500),          # TEMP_DIS, gyro standby
+    'accel_lp_1.25': (0x28, 0x07, 10),   # CYCLE, TEMP_DIS, gyro standby
+    'accel_lp_5': (0x28, 0x47, 20),      # and LP_WAKE_CTRL
+    'accel_lp_20': (0x28, 0x87, 70),
+    'accel_lp_40': (0x28, 0xC7, 140),
+    'sleep': (0x48, 0x00, 5),            # SLEEP, TEMP_DIS
+}
+
 # WHO_AM_I
 MPU6050_WHO_AM_I_BIT    = 6
 MPU6050_WHO_AM_I_LENGTH = 6
 
+# Register field access
+MPU6050_RO = 0
+MPU6050_RW = 1
 
-class MPUException(OSError):
-    """MPUExeption."""
-
-    pass
-
-
-class MPU6050():
-    """A micropython module for the InvenSense MPU6050 sensor."""
-
-    def __init__(self, i2c=None, address=MPU6050_DEFAULT_ADDRESS):
-        """Init MPU6050 instance."""
-        if isinstance(i2c, I2C):
-            self.i2c = i2c
-        else:
-            self.i2c = I2C(sda=Pin(21), scl=Pin(22))  # ESP32 DEVKIT V1
-
-        self.address = address
-        self.buf = bytearray(1)
-        self.reset_flag = False
-
-    # SMPLRT_DIV
-    def set_sample_rate(self, rate):
-        """Set gyroscope sample rate divider."""
-        return self.write_byte(MPU6050_RA_SMPLRT_DIV,
-                               rate)
-
-    def get_sample_rate(self):
-        """
-        Get gyroscope output rate divider.
-
-        8-bit  unsigned   value.The  Sample  Rate  is  determined  by  dividing
-        the gyroscope output rate by this value.
-        """
-        return self.read_byte(MPU6050_RA_SMPLRT_DIV)[0]
-
+# Register fields, name: (register, bit, length, access).
+# get_<name>() and set_<name>(enabled) (RW only) are generated for each
+# field, see MPU6050.get_field and MPU6050.set_field.
+MPU6050_FIELDS = {
+    # SMPLRT_DIV: Sample Rate = Gyroscope Output Rate / (1 + SMPLRT_DIV)
+    'sample_rate': (MPU6050_RA_SMPLRT_DIV, 7, 8, MPU6050_RW),
     # CONFIG
-    def set_external_frame_sync(self, sync):
-        """
-        Set external FSYNC configuration.
-
-        MPU6050_EXT_SYNC_DISABLED       = 0x0
-        MPU6050_EXT_SYNC_TEMP_OUT_L     = 0x1
-        MPU6050_EXT_SYNC_GYRO_XOUT_L    = 0x2
-        MPU6050_EXT_SYNC_GYRO_YOUT_L    = 0x3
-        MPU6050_EXT_SYNC_GYRO_ZOUT_L    = 0x4
-        MPU6050_EXT_SYNC_ACCEL_XOUT_L   = 0x5
-        MPU6050_EXT_SYNC_ACCEL_YOUT_L   = 0x6
-        MPU6050_EXT_SYNC_ACCEL_ZOUT_L   = 0x7
-        """
-        return self.read_bits(MPU6050_RA_CONFIG,
-                              MPU6050_CFG_EXT_SYNC_SET_BIT,
-                              MPU6050_CFG_EXT_SYNC_SET_LENGTH,
-                              sync)
-
-    def get_external_frame_sync(self):
-        """
-        Get FSYNC configuration value.
-
-        ---------------------------------
-        EXT_SYNC_SET | FSYNC Bit Location
-        -------------+-------------------
-        0            | Input disabled
-        1            | TEMP_OUT_L[0]
-        2            | GYRO_XOUT_L[0]
-        3            | GYRO_YOUT_L[0]
-        4            | GYRO_ZOUT_L[0]
-        5            | ACCEL_XOUT_L[0]
-        6            | ACCEL_YOUT_L[0]
-        7            | ACCEL_ZOUT_L[0]
-        """
-        return self.write_bits(MPU6050_RA_CONFIG,
-                               MPU6050_CFG_EXT_SYNC_SET_BIT,
-                               MPU6050_CFG_EXT_SYNC_SET_LENGTH)
-
-    def set_dlpf_mode(self, mode):
-        """
-        Set digital low-pass filter configuration.
-
-        MPU6050_DLPF_BW_256         = 0x00
-        MPU6050_DLPF_BW_188         = 0x01
-        MPU6050_DLPF_BW_98          = 0x02
-        MPU6050_DLPF_BW_42          = 0x03
-        MPU6050_DLPF_BW_20          = 0x04
-        MPU6050_DLPF_BW_10          = 0x05
-        MPU6050_DLPF_BW_5           = 0x06
-        """
-        return self.write_bits(MPU6050_RA_CONFIG,
-                               MPU6050_CFG_DLPF_CFG_BIT,
-                               MPU6050_CFG_DLPF_CFG_LENGTH,
-                               mode)
-
-    def get_dlpf_mode(self):
-        """
-        Get Digital Low_pass filter configuration.
-
-        -----------------------------------------------------------------
-                 |   ACCELEROMETER    |           GYROSCOPE
-        DLPF_CFG | Bandwidth | Delay  | Bandwidth | Delay  | Sample Rate
-        ---------+-----------+--------+-----------+--------+-------------
-        0        | 260Hz     | 0ms    | 256Hz     | 0.98ms | 8kHz
-        1        | 184Hz     | 2.0ms  | 188Hz     | 1.9ms  | 1kHz
-        2        | 94Hz      | 3.0ms  | 98Hz      | 2.8ms  | 1kHz
-        3        | 44Hz      | 4.9ms  | 42Hz      | 4.8ms  | 1kHz
-        4        | 21Hz      | 8.5ms  | 20Hz      | 8.3ms  | 1kHz
-        5        | 10Hz      | 13.8ms | 10Hz      | 13.4ms | 1kHz
-        6        | 5Hz       | 19.0ms | 5Hz       | 18.6ms | 1kHz
-        7        |   -- Reserved --   |   -- Reserved --   | 8Khz
-        """
-        return self.read_bits(MPU6050_RA_CONFIG,
-                              MPU6050_CFG_DLPF_CFG_BIT,
-                              MPU6050_CFG_DLPF_CFG_LENGTH)
-
+    # EXT_SYNC_SET, FSYNC bit location: 0 input disabled, 1 TEMP_OUT_L[0],
+    # 2 GYRO_XOUT_L[0], 3 GYRO_YOUT_L[0], 4 GYRO_ZOUT_L[0],
+    # 5 ACCEL_XOUT_L[0], 6 ACCEL_YOUT_L[0], 7 ACCEL_ZOUT_L[0]
+    'external_frame_sync': (MPU6050_RA_CONFIG,
+                            MPU6050_CFG_EXT_SYNC_SET_BIT,
+                            MPU6050_CFG_EXT_SYNC_SET_LENGTH, MPU6050_RW),
+    # -----------------------------------------------------------------
+    #          |   ACCELEROMETER    |           GYROSCOPE
+    # DLPF_CFG | Bandwidth | Delay  | Bandwidth | Delay  | Sample Rate
+    # ---------+-----------+--------+-----------+--------+-------------
+    # 0        | 260Hz     | 0ms    | 256Hz     | 0.98ms | 8kHz
+    # 1        | 184Hz     | 2.0ms  | 188Hz     | 1.9ms  | 1kHz
+    # 2        | 94Hz      | 3.0ms  | 98Hz      | 2.8ms  | 1kHz
+    # 3        | 44Hz      | 4.9ms  | 42Hz      | 4.8ms  | 1kHz
+    # 4        | 21Hz      | 8.5ms  | 20Hz      | 8.3ms  | 1kHz
+    # 5        | 10Hz      | 13.8ms | 10Hz      | 13.4ms | 1kHz
+    # 6        | 5Hz       | 19.0ms | 5Hz       | 18.6ms | 1kHz
+    # 7        |   -- Reserved --   |   -- Reserved --   | 8Khz
+    'dlpf_mode': (MPU6050_RA_CONFIG, MPU6050_CFG_DLPF_CFG_BIT,
+                  MPU6050_CFG_DLPF_CFG_LENGTH, MPU6050_RW),
     # GYRO_CONFIG
-    def set_full_scale_gyro_range(self, fscale):
-        """
-        Set full-scale gyroscope range.
-
-        MPU6050_GYRO_FS_250  = 0x00
-        MPU6050_GYRO_FS_500  = 0x01
-        MPU6050_GYRO_FS_1000 = 0x02
-        MPU6050_GYRO_FS_2000 = 0x03
-        """
-        return self.write_bits(MPU6050_RA_GYRO_CONFIG,
-                               MPU6050_GCONFIG_FS_SEL_BIT,
-                               MPU6050_GCONFIG_FS_SEL_LENGTH,
-                               fscale)
-
-    def get_full_scale_gyro_range(self):
-        """
-        Get current full-scale gyroscope range setting.
-
-        -------------------------
-        FS_SEL | Full scale range
-        -------------------------
-        0      | +/- 250 deg/sec
-        1      | +/- 500 deg/sec
-        2      | +/- 1000 deg/sec
-        3      | +/- 2000 deg/sec
-        """
-        return self.read_bits(MPU6050_RA_GYRO_CONFIG,
+    'gyro_x_self_test': (MPU6050_RA_GYRO_CONFIG, MPU6050_GCONFIG_XG_ST_BIT,
+                         1, MPU6050_RW),
+    'gyro_y_self_test': (MPU6050_RA_GYRO_CONFIG, MPU6050_GCONFIG_YG_ST_BIT,
+                         1, MPU6050_RW),
+    'gyro_z_self_test': (MPU6050_RA_GYRO_CONFIG, MPU6050_GCONFIG_ZG_ST_BIT,
+                         1, MPU6050_RW),
+    # FS_SEL: 0 +/- 250, 1 +/- 500, 2 +/- 1000, 3 +/- 2000 deg/s
+    'full_scale_gyro_range': (MPU6050_RA_GYRO_CONFIG,
                               MPU6050_GCONFIG_FS_SEL_BIT,
-                              MPU6050_GCONFIG_FS_SEL_LENGTH)
-
+                              MPU6050_GCONFIG_FS_SEL_LENGTH, MPU6050_RW),
     # ACCEL_CONFIG
-    def set_accel_x_self_test(self, enabled):
-        """Set self-test enabled setting for accelerometer X axis."""
-        return self.write_bit(MPU6050_RA_ACCEL_CONFIG,
-                              MPU6050_ACONFIG_XA_ST_BIT,
-                              enabled)
-
-    def get_accel_x_self_test(self):
-        """When set to 1, the X-Axis accelerometer performs self test."""
-        return self.read_bit(MPU6050_RA_ACCEL_CONFIG,
-                             MPU6050_ACONFIG_XA_ST_BIT)
-
-    def set_accel_y_self_test(self, enabled):
-        """Set self-test enabled setting for accelerometer Y axis."""
-        return self.write_bit(MPU6050_RA_ACCEL_CONFIG,
-                              MPU6050_ACONFIG_YA_ST_BIT,
-                              enabled)
-
-    def get_accel_y_self_test(self):
-        """When set to 1, the Y-Axis accelerometer performs self test."""
-        return self.read_bit(MPU6050_RA_ACCEL_CONFIG,
-                             MPU6050_ACONFIG_YA_ST_BIT)
-
-    def set_accel_z_self_test(self, enabled):
-        """Set self-test enabled setting for accelerometer Z axis."""
-        return self.write_bit(MPU6050_RA_ACCEL_CONFIG,
-                              MPU6050_ACONFIG_ZA_ST_BIT,
-                              enabled)
-
-    def get_accel_z_self_test(self):
-        """When set to 1, the Z-Axis accelerometer performs self test."""
-        return self.read_bit(MPU6050_RA_ACCEL_CONFIG,
-                             MPU6050_ACONFIG_ZA_ST_BIT)
-
-    def set_full_scale_accel_range(self, afs_sel):
-        """
-        Set full-scale accelerometer range.
-
-        MPU6050_ACCEL_FS_2  = 0x00
-        MPU6050_ACCEL_FS_4  = 0x01
-        MPU6050_ACCEL_FS_8  = 0x02
-        MPU6050_ACCEL_FS_16 = 0x03
-        """
-        return self.write_bits(MPU6050_RA_ACCEL_CONFIG,
+    'accel_x_self_test': (MPU6050_RA_ACCEL_CONFIG, MPU6050_ACONFIG_XA_ST_BIT,
+                          1, MPU6050_RW),
+    'accel_y_self_test': (MPU6050_RA_ACCEL_CONFIG, MPU6050_ACONFIG_YA_ST_BIT,
+                          1, MPU6050_RW),
+    'accel_z_self_test': (MPU6050_RA_ACCEL_CONFIG, MPU6050_ACONFIG_ZA_ST_BIT,
+                          1, MPU6050_RW),
+    # AFS_SEL: 0 +/- 2g, 1 +/- 4g, 2 +/- 8g, 3 +/- 16g
+    'full_scale_accel_range': (MPU6050_RA_ACCEL_CONFIG,
                                MPU6050_ACONFIG_AFS_SEL_BIT,
-                               MPU6050_ACONFIG_AFS_SEL_LENGTH,
-                               afs_sel)
-
-    def get_full_scale_accel_range(self):
-        """
-        Get current full-scale accelerometer range setting.
-
-        --------------------------------
-        SFS_SEL | Full scale accel range
-        --------------------------------
-        0       | +/- 2g
-        1       | +/- 4g
-        2       | +/- 8g
-        3       | +/- 16g
-        """
-        return self.read_bits(MPU6050_RA_ACCEL_CONFIG,
-                              MPU6050_ACONFIG_AFS_SEL_BIT,
-                              MPU6050_ACONFIG_AFS_SEL_LENGTH)
-
-    # FIFO_EN
-    def set_temp_fifo_enabled(self, enabled):
-        """
-        Set temperature FIFO enabled value.
-
-        When set to 1, this bit enables TEMP_OUT_H and TEMP_OUT_L
-        (Registers 65 and 66) to be written into the FIFO buffer.
-        """
-        return self.write_bit(MPU6050_RA_FIFO_EN,
-                              MPU6050_TEMP_FIFO_EN_BIT,
-                              enabled)
-
-    def get_temp_fifo_enabled(self):
-        """Get temperature FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_FIFO_EN,
-                             MPU6050_TEMP_FIFO_EN_BIT)
-
-    def set_x_gyro_fifo_enabled(self, enabled):
-        """
-        Set gyroscope X-axis FIFO enabled value.
-
-        When set to 1, this bit enables GYRO_XOUT_H and GYRO_XOUT_L
-        (Registers 67 and 68) to be written into the FIFO buffer.
-        """
-        return self.write_bit(MPU6050_RA_FIFO_EN,
-                              MPU6050_XG_FIFO_EN_BIT,
-                              enabled)
-
-    def get_x_gyro_fifo_enabled(self):
-        """Get gyroscope X-axis FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_FIFO_EN,
-                             MPU6050_XG_FIFO_EN_BIT)
-
-    def set_y_gyro_fifo_enabled(self, enabled):
-        """
-        Set gyroscope Y-axis FIFO enabled value.
-
-        When set to 1, this bit enables GYRO_YOUT_H and GYRO_YOUT_L
-        (Registers 69 and 70) to be written into the FIFO buffer.
-        """
-        return self.write_bit(MPU6050_RA_FIFO_EN,
-                              MPU6050_YG_FIFO_EN_BIT,
-                              enabled)
-
-    def get_y_gyro_fifo_enabled(self):
-        """Get gyroscope Y-axis FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_FIFO_EN,
-                             MPU6050_YG_FIFO_EN_BIT)
-
-    def set_z_gyro_fifo_enabled(self, enabled):
-        """
-        Set gyroscope Z-axis FIFO enabled value.
-
-        When set to 1, this bit enables GYRO_ZOUT_H and GYRO_ZOUT_L
-        (Registers 71 and 72) to be written into the FIFO buffer.
-        """
-        return self.write_bit(MPU6050_RA_FIFO_EN,
-                              MPU6050_ZG_FIFO_EN_BIT,
-                              enabled)
-
-    def get_z_gyro_fifo_enabled(self):
-        """Get gyroscope Z-axis FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_FIFO_EN,
-                             MPU6050_ZG_FIFO_EN_BIT)
+                               MPU6050_ACONFIG_AFS_SEL_LENGTH, MPU6050_RW),
+    # FIFO_EN: 1 writes the sensor registers into the FIFO buffer
+    'temp_fifo_enabled': (MPU6050_RA_FIFO_EN, MPU6050_TEMP_FIFO_EN_BIT,
+                          1, MPU6050_RW),
+    'x_gyro_fifo_enabled': (MPU6050_RA_FIFO_EN, MPU6050_XG_FIFO_EN_BIT,
+                            1, MPU6050_RW),
+    'y_gyro_fifo_enabled': (MPU6050_RA_FIFO_EN, MPU6050_YG_FIFO_EN_BIT,
+                            1, MPU6050_RW),
+    'z_gyro_fifo_enabled': (MPU6050_RA_FIFO_EN, MPU6050_ZG_FIFO_EN_BIT,
+                            1, MPU6050_RW),
+    'accel_fifo_enabled': (MPU6050_RA_FIFO_EN, MPU6050_ACCEL_FIFO_EN_BIT,
+                           1, MPU6050_RW),
+    'slv2_fifo_enabled': (MPU6050_RA_FIFO_EN, MPU6050_SLV2_FIFO_EN_BIT,
+                          1, MPU6050_RW),
+    'slv1_fifo_enabled': (MPU6050_RA_FIFO_EN, MPU6050_SLV1_FIFO_EN_BIT,
+                          1, MPU6050_RW),
+    'slv0_fifo_enabled': (MPU6050_RA_FIFO_EN, MPU6050_SLV0_FIFO_EN_BIT,
+                          1, MPU6050_RW),
+    # I2C_MST_CTRL
+    'multi_master_enabled': (MPU6050_RA_I2C_MST_CTRL, MPU6050_MULT_MST_EN_BIT,
+                             1, MPU6050_RW),
+    # 1 delays the Data Ready interrupt until EXT_SENS_DATA is loaded
+    'wait_for_external_sensor_enabled': (MPU6050_RA_I2C_MST_CTRL,
+                                         MPU6050_WAIT_FOR_ES_BIT,
+                                         1, MPU6050_RW),
+    'slv3_fifo_enabled': (MPU6050_RA_I2C_MST_CTRL, MPU6050_SLV3_FIFO_EN_BIT,
+                          1, MPU6050_RW),
+    # 0 restart between slave reads, 1 stop and start
+    'master_transition': (MPU6050_RA_I2C_MST_CTRL, MPU6050_I2C_MST_P_NSR_BIT,
+                          1, MPU6050_RW),
+    # I2C_MST_CLK, see MPU6050_CLOCK_DIV_*
+    'master_clock_speed': (MPU6050_RA_I2C_MST_CTRL, MPU6050_I2C_MST_CLK_BIT,
+                           MPU6050_I2C_MST_CLK_LENGTH, MPU6050_RW),
+    # I2C_MST_STATUS, cleared on read
+    'passthrough_status': (MPU6050_RA_I2C_MST_STATUS,
+                           MPU6050_MST_PASS_THROUGH_BIT, 1, MPU6050_RO),
+    'slv4_done': (MPU6050_RA_I2C_MST_STATUS, MPU6050_MST_I2C_SLV4_DONE_BIT,
+                  1, MPU6050_RO),
+    'lost_arbitration': (MPU6050_RA_I2C_MST_STATUS,
+                         MPU6050_MST_I2C_LOST_ARB_BIT, 1, MPU6050_RO),
+    'slv4_nack': (MPU6050_RA_I2C_MST_STATUS, MPU6050_MST_I2C_SLV4_NACK_BIT,
+                  1, MPU6050_RO),
+    'slv3_nack': (MPU6050_RA_I2C_MST_STATUS, MPU6050_MST_I2C_SLV3_NACK_BIT,
+                  1, MPU6050_RO),
+    'slv2_nack': (MPU6050_RA_I2C_MST_STATUS, MPU6050_MST_I2C_SLV2_NACK_BIT,
+                  1, MPU6050_RO),
+    'slv1_nack': (MPU6050_RA_I2C_MST_STATUS, MPU6050_MST_I2C_SLV1_NACK_BIT,
+                  1, MPU6050_RO),
+    'slv0_nack': (MPU6050_RA_I2C_MST_STATUS, MPU6050_MST_I2C_SLV0_NACK_BIT,
+                  1, MPU6050_RO),
+    # INT_PIN_CFG
+    # INT pin: 0 active high, 1 active low
+    'interrupt_mode': (MPU6050_RA_INT_PIN_CFG, MPU6050_INTCFG_INT_LEVEL_BIT,
+                       1, MPU6050_RW),
+    # INT pin: 0 push-pull, 1 open drain
+    'interrupt_drive': (MPU6050_RA_INT_PIN_CFG, MPU6050_INTCFG_INT_OPEN_BIT,
+                        1, MPU6050_RW),
+    # INT pin: 0 50us pulse, 1 held until the interrupt is cleared
+    'latch_interrupt': (MPU6050_RA_INT_PIN_CFG,
+                        MPU6050_INTCFG_LATCH_INT_EN_BIT, 1, MPU6050_RW),
+    # Status cleared: 0 only by reading INT_STATUS, 1 by any read
+    'interrupt_rd_clear': (MPU6050_RA_INT_PIN_CFG,
+                           MPU6050_INTCFG_INT_RD_CLEAR_BIT, 1, MPU6050_RW),
+    # FSYNC pin: 0 active high, 1 active low
+    'fsync_interrupt_level': (MPU6050_RA_INT_PIN_CFG,
+                              MPU6050_INTCFG_FSYNC_INT_LEVEL_BIT,
+                              1, MPU6050_RW),
+    'fsync_interrupt_enabled': (MPU6050_RA_INT_PIN_CFG,
+                                MPU6050_INTCFG_FSYNC_INT_EN_BIT,
+                                1, MPU6050_RW),
+    # 1 with I2C_MST_EN = 0 gives the host direct access to the aux bus
+    'i2c_bypass_enabled': (MPU6050_RA_INT_PIN_CFG,
+                           MPU6050_INTCFG_I2C_BYPASS_EN_BIT, 1, MPU6050_RW),
+    # INT_ENABLE
+    'fifo_buffer_overflow_interrupt_enabled': (
+        MPU6050_RA_INT_ENABLE, MPU6050_INTERRUPT_FIFO_OFLOW_BIT,
+        1, MPU6050_RW),
+    'i2c_master_interrupt_enabled': (MPU6050_RA_INT_ENABLE,
+                                     MPU6050_INTERRUPT_I2C_MST_INT_BIT,
+                                     1, MPU6050_RW),
+    'data_ready_interrupt_enabled': (MPU6050_RA_INT_ENABLE,
+                                     MPU6050_INTERRUPT_DATA_RDY_BIT,
+                                     1, MPU6050_RW),
+    # INT_STATUS, cleared on read
+    'fifo_overflow_interrupt': (MPU6050_RA_INT_STATUS,
+                                MPU6050_INTERRUPT_FIFO_OFLOW_BIT,
+                                1, MPU6050_RO),
+    'i2c_master_interrupt': (MPU6050_RA_INT_STATUS,
+                             MPU6050_INTERRUPT_I2C_MST_INT_BIT,
+                             1, MPU6050_RO),
+    'data_ready_interrupt': (MPU6050_RA_INT_STATUS,
+                             MPU6050_INTERRUPT_DATA_RDY_BIT, 1, MPU6050_RO),
+    # USER_CTRL
+    'fifo_enabled': (MPU6050_RA_USER_CTRL, MPU6050_USERCTRL_FIFO_EN_BIT,
+                     1, MPU6050_RW),
+    'master_mode_enabled': (MPU6050_RA_USER_CTRL,
+                            MPU6050_USERCTRL_I2C_MST_EN_BIT, 1, MPU6050_RW),
+    # PWR_MGMT_1
+    'sleep_enabled': (MPU6050_RA_PWR_MGMT_1, MPU6050_PWR1_SLEEP_BIT,
+                      1, MPU6050_RW),
+    # 1 with SLEEP = 0 cycles between sleep and single samples at
+    # LP_WAKE_CTRL rate
+    'cycle_enabled': (MPU6050_RA_PWR_MGMT_1, MPU6050_PWR1_CYCLE_BIT,
+                      1, MPU6050_RW),
+    'temperature_sensor_disabled': (MPU6050_RA_PWR_MGMT_1,
+                                    MPU6050_PWR1_TEMP_DIS_BIT, 1, MPU6050_RW),
+    # CLKSEL, see MPU6050_CLOCK_*
+    'clock_source': (MPU6050_RA_PWR_MGMT_1, MPU6050_PWR1_CLKSEL_BIT,
+                     MPU6050_PWR1_CLKSEL_LENGTH, MPU6050_RW),
+    # PWR_MGMT_2
+    # LP_WAKE_CTRL: 0 1.25Hz, 1 5Hz, 2 20Hz, 3 40Hz
+    'low_power_wake_control': (MPU6050_RA_PWR_MGMT_2,
+                               MPU6050_PWR2_LP_WAKE_CTRL_BIT,
+                               MPU6050_PWR2_LP_WAKE_CTRL_LENGTH, MPU6050_RW),
+    'accel_x_standby_enabled': (MPU6050_RA_PWR_MGMT_2,
+                                MPU6050_PWR2_STBY_XA_BIT, 1, MPU6050_RW),
+    'accel_y_standby_enabled': (MPU6050_RA_PWR_MGMT_2,
+                                MPU6050_PWR2_STBY_YA_BIT, 1, MPU6050_RW),
+    'accel_z_standby_enabled': (MPU6050_RA_PWR_MGMT_2,
+                                MPU6050_PWR2_STBY_ZA_BIT, 1, MPU6050_RW),
+    'gyro_x_standby_enabled': (MPU6050_RA_PWR_MGMT_2,
+                               MPU6050_PWR2_STBY_XG_BIT, 1, MPU6050_RW),
+    'gyro_y_standby_enabled': (MPU6050_RA_PWR_MGMT_2,
+                               MPU6050_PWR2_STBY_YG_BIT, 1, MPU6050_RW),
+    'gyro_z_standby_enabled': (MPU6050_RA_PWR_MGMT_2,
+                               MPU6050_PWR2_STBY_ZG_BIT, 1, MPU6050_RW),
+}
+
+# set_<name> parameter names other than `enabled`, kept for keyword calls.
+MPU6050_FIELD_ARGS = {
+    'sample_rate': 'rate',
+    'external_frame_sync': 'sync',
+    'dlpf_mode': 'mode',
+    'full_scale_gyro_range': 'fscale',
+    'full_scale_accel_range': 'afs_sel',
+    'master_clock_speed': 'speed',
+    'interrupt_mode': 'mode',
+    'interrupt_drive': 'drive',
+    'latch_interrupt': 'latch',
+    'interrupt_rd_clear': 'mode',
+    'fsync_interrupt_level': 'mode',
+    'temperature_sensor_disabled': 'disabled',
+    'clock_source': 'clksel',
+    'low_power_wake_control': 'frec',
+}
+
+# Every read-write field, held in four runs of adjacent registers.
+MPU6050_CONFIG_BLOCKS = ((MPU6050_RA_SMPLRT_DIV, 4),    # to ACCEL_CONFIG
+                         (MPU6050_RA_FIFO_EN, 2),       # to I2C_MST_CTRL
+                         (MPU6050_RA_INT_PIN_CFG, 2),   # to INT_ENABLE
+                         (MPU6050_RA_USER_CTRL, 3))     # to PWR_MGMT_2
+MPU6050_CONFIG_FIELDS = tuple(sorted(name for name in MPU6050_FIELDS
+                                     if MPU6050_FIELDS[name][3] == MPU6050_RW))
+
+
+_formats = {}
+# Little-endian CPython: byte swapping a native array beats unpack_from.
+_byteswap = (hasattr(array('h'), 'byteswap')
+             and array('h', [1]).tobytes()[0] == 1)
+
+
+def int16_format(count):
+    """Get the cached big-endian struct format for `count` int16 values."""
+    fmt = _formats.get(count)
+    if fmt is None:
+        fmt = _formats[count] = '>%dh' % count
+    return fmt
+
+
+def decode_block(buf, offset=0, count=None):
+    """
+    Decode big-endian int16 values from a FIFO block or burst buffer.
+
+    Return an array('h') with `count` values starting at byte `offset`, all
+    the whole values left in `buf` by default. MicroPython unpacks with one
+    ustruct call, CPython byte swaps a native array.
+    """
+    if count is None:
+        count = (len(buf) - offset) >> 1
+    if _byteswap:
+        values = array('h')
+        values.frombytes(memoryview(buf)[offset:offset + 2 * count])
+        values.byteswap()
+        return values
+    return array('h', unpack_from(int16_format(count), buf, offset))
+
+
+def decode_into(raw, count, out, offset=0):
+    """
+    Decode `count` big-endian int16 values of `raw` into `out[offset:]`.
+
+    MicroPython decodes value by value to stay off the heap, CPython goes
+    through decode_block.
+    """
+    if _byteswap:
+        out[offset:offset + count] = decode_block(raw, 0, count)
+        return
+    i = 0
+    j = 0
+    while i < count:
+        value = raw[j] << 8 | raw[j + 1]
+        out[offset + i] = value - 0x10000 if value & 0x8000 else value
+        i += 1
+        j += 2
+
+
+def field_value(name, value):
+    """Extract field `name` of MPU6050_FIELDS from its register value."""
+    _, bit, length, _ = MPU6050_FIELDS[name]
+    return (value >> (bit - length + 1)) & ((1 << length) - 1)
 
-    def set_accel_fifo_enabled(self, enabled):
-        """
-        Set accelerometer FIFO enabled value.
 
-        When set to 1, this bit enables:
-        ACCEL_XOUT_H, ACCEL_XOUT_L
-        ACCEL_YOUT_H, ACCEL_YOUT_L
-        ACCEL_ZOUT_H, ACCEL_ZOUT_L
-        (Registers 59 to 64) to be written into the FIFO buffer
-        """
-        return self.write_bit(MPU6050_RA_FIFO_EN,
-                              MPU6050_ZG_FIFO_EN_BIT,
-                              enabled)
+class MPUException(OSError):
+    """MPUExeption."""
 
-    def get_accel_fifo_enabled(self):
-        """Get accelerometer FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_FIFO_EN,
-                             MPU6050_ZG_FIFO_EN_BIT)
+    pass
 
-    def set_slv2_fifo_enabled(self, enabled):
-        """
-        Set Slave 2 FIFO enabled value.
 
-        When set to 1, this bit enables:
-        EXT_SENS_DATA registers (Registers 73 to 96) associated with Slave 2
-        to be written intothe FIFO buffer.
-        """
-        return self.write_bit(MPU6050_RA_FIFO_EN,
-                              MPU6050_SLV2_FIFO_EN_BIT)
+class NoLock():
+    """Stand-in lock for ports without `_thread`."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class RLock():
+    """
+    Reentrant lock on `_thread`, which only has plain locks.
+
+    Lets a read-modify-write hold the bus lock across the transfers that
+    take it again.
+    """
+
+    def __init__(self):
+        """Init RLock."""
+        self.lock = allocate_lock()
+        self.owner = None
+        self.depth = 0
+
+    def __enter__(self):
+        me = get_ident()
+        if self.owner != me:
+            self.lock.acquire()
+            self.owner = me
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if not self.depth:
+            self.owner = None
+            self.lock.release()
+        return False
+
+
+FifoBatch = namedtuple('FifoBatch', ('anchor', 'count', 'data'))
+# Overflow in the stream: `lost` samples dropped before `anchor`. Shaped
+# like an empty FifoBatch so batch consumers can pass it through.
+FifoGap = namedtuple('FifoGap', ('anchor', 'count', 'data', 'lost'))
+# Event in the stream at `anchor`, e.g. kind 'profile' after a settings
+# change. Also shaped like an empty FifoBatch.
+Marker = namedtuple('Marker', ('anchor', 'count', 'data', 'kind', 'value'))
+LinkStep = namedtuple('LinkStep', ('freq', 'errors', 'trials', 'burst_us'))
+LinkReport = namedtuple('LinkReport', ('freq', 'steps'))
+SelfTest = namedtuple('SelfTest', ('passed', 'deviation', 'response',
+                                   'trim'))
+Config = namedtuple('Config', MPU6050_CONFIG_FIELDS)
+RatePlan = namedtuple('RatePlan', ('dlpf_cfg', 'divider', 'rate',
+                                   'bandwidth', 'warnings'))
+
+
+class Views():
+    """
+    memoryview slices of one buffer, created once per (start, length).
+
+    Slicing a memoryview allocates on MicroPython, repeated reads into the
+    same spans reuse the cached slices instead. Only callers cycling
+    through at most `limit` spans stay allocation free: fixed register
+    offsets, or a ring drained a fixed number of frames at a time whose
+    size is a small multiple of the drain. Past `limit` spans the cache is
+    cleared, so other patterns allocate like plain slicing but hold no
+    more than `limit` views.
+    """
+
+    def __init__(self, buf, limit=MPU6050_VIEWS_LIMIT):
+        """Init Views on `buf`."""
+        self.buf = buf
+        self.base = memoryview(buf)
+        self.limit = limit
+        self.cache = {}
+
+    def get(self, start, length):
+        """Get the view of buf[start:start + length]."""
+        key = start << 16 | length
+        view = self.cache.get(key)
+        if view is None:
+            if len(self.cache) >= self.limit:
+                self.cache.clear()
+            view = self.cache[key] = self.base[start:start + length]
+        return view
+
+
+class SampleClock():
+    """
+    Reconstruct sample instants from batch anchors.
+
+    A batch of `count` samples drained at `anchor` (ticks_us) ends with its
+    newest sample, so sample `i` was taken at:
+        anchor - (count - 1 - i) * period
+
+    The measured rate is the number of samples seen between anchors over the
+    elapsed time, it corrects the nominal period for clock drift.
+    """
+
+    def __init__(self, rate, window_us=10000000):
+        """Init SampleClock for a nominal rate in Hz."""
+        self.nominal = rate
+        self.window_us = window_us
+        self.reset()
+
+    def reset(self):
+        """Forget anchors, measured rate and jitter statistics."""
+        self.anchor = None
+        self.count = 0
+        self.first = None
+        self.samples = 0
+        self.measured = None
+        self.last = None
+        self.intervals = 0
+        self.jitter_sum = 0
+        self.jitter_max = 0
+
+    def stamp(self, count, now=None):
+        """Anchor a batch of `count` samples, return the anchor."""
+        if now is None:
+            now = ticks_us()
+        if self.first is None:
+            self.first = now
+        else:
+            self.samples += count
+            elapsed = ticks_diff(now, self.first)
+            if elapsed >= self.window_us:
+                # Restart the window before ticks_us wraps around.
+                self.measured = self.samples * 1000000 / elapsed
+                self.first = now
+                self.samples = 0
+        self.anchor = now
+        self.count = count
+        return now
+
+    def skip(self, count):
+        """Count `count` lost samples towards the measured rate."""
+        if self.first is not None:
+            self.samples += count
+
+    def tick(self, now=None):
+        """Stamp a single polled sample and track its interval jitter."""
+        if now is None:
+            now = ticks_us()
+        if self.last is not None:
+            error = abs(ticks_diff(now, self.last) - 1000000 / self.nominal)
+            self.intervals += 1
+            self.jitter_sum += error
+            if error > self.jitter_max:
+                self.jitter_max = error
+        self.last = now
+        return self.stamp(1, now)
+
+    def rate(self):
+        """Measured rate in Hz, nominal rate until one is available."""
+        if self.samples and self.anchor != self.first:
+            return self.samples * 1000000 / ticks_diff(self.anchor, self.first)
+        if self.measured:
+            return self.measured
+        return self.nominal
+
+    def drift(self):
+        """Measured versus nominal rate deviation in ppm."""
+        return (self.rate() / self.nominal - 1) * 1000000
+
+    def jitter(self):
+        """Get mean and max polling interval jitter in us."""
+        if not self.intervals:
+            return (0, 0)
+        return (self.jitter_sum / self.intervals, self.jitter_max)
+
+    def timestamp(self, index, corrected=True):
+        """Get ticks_us instant of sample `index` in the last batch."""
+        rate = self.rate() if corrected else self.nominal
+        offset = int((self.count - 1 - index) * 1000000 / rate)
+        return ticks_add(self.anchor, -offset)
+
+
+class Sampler():
+    """
+    Double-buffered FIFO acquisition on a `_thread` worker.
+
+    The worker drains whole FIFO frames into the back block. Once full, it
+    is swapped with the front block as soon as the consumer has released
+    it; meanwhile the sensor FIFO keeps buffering. On a FIFO overflow the
+    partial back block is dropped with the FIFO, and `get` returns a FifoGap
+    before the next block. Bus access is serialised
+    by the MPU6050 lock and the worker never touches the driver scratch
+    buffer, so setters can be called from the main thread while streaming.
+
+    The worker drains whole units of `step` frames, by default the
+    smallest divisor of `frames` giving at most MPU6050_SAMPLER_UNITS
+    units. Every run of units in a block has a preallocated memoryview, so
+    draining does not allocate.
+
+        sampler = Sampler(mpu).start()
+        batch = sampler.get()
+        if isinstance(batch, FifoGap):
+            ...  # batch.lost samples missing
+        elif batch:
+            ...  # batch.data holds batch.count frames
+            sampler.release()
+    """
+
+    def __init__(self, mpu, frames=32, frame_size=12, idle_ms=1, step=None):
+        """Init Sampler with blocks of `frames` FIFO frames."""
+        if allocate_lock is None:
+            raise MPUException('Sampler needs _thread')
+        if step is None:
+            step = 1
+            while frames % step or frames // step > MPU6050_SAMPLER_UNITS:
+                step += 1
+        elif frames % step:
+            raise MPUException('%d frames per block is not a multiple of '
+                               'step %d' % (frames, step))
+        self.mpu = mpu
+        self.frames = frames
+        self.frame_size = frame_size
+        self.idle_ms = idle_ms
+        self.step = step
+        self.units = frames // step
+        size = frames * frame_size
+        self.blocks = (bytearray(size), bytearray(size))
+        # spans[block][start * units + n - 1]: units start to start + n
+        unit = step * frame_size
+        self.spans = tuple(
+            [memoryview(block)[start * unit:(start + n) * unit]
+             if start + n <= self.units else None
+             for start in range(self.units)
+             for n in range(1, self.units + 1)]
+            for block in self.blocks)
+        self.back = 0
+        self.fill = 0
+        self.anchor = 0
+        self.count_buf = bytearray(2)
+        self.clock = None
+        self.pending_lost = 0
+        self.gap_anchor = 0
+        self.ready_gap = None
+        self.ready = False
+        self.held = False
+        self.running = False
+        self.stopped = True
+        self.swap_lock = allocate_lock()
+
+    def start(self):
+        """Start the worker thread."""
+        self.clock = SampleClock(self.mpu.output_rate())
+        self.fill = 0
+        self.anchor = ticks_us()
+        self.pending_lost = 0
+        self.ready_gap = None
+        self.ready = self.held = False
+        self.running = True
+        self.stopped = False
+        start_new_thread(self.run, ())
+        return self
+
+    def stop(self):
+        """Stop the worker thread and wait for it to exit."""
+        self.running = False
+        while not self.stopped:
+            sleep_ms(self.idle_ms)
+
+    def run(self):
+        """Worker loop, fill the back block and swap it when possible."""
+        mpu = self.mpu
+        size = len(self.blocks[0])
+        frame_size = self.frame_size
+        step = self.step
+        units = self.units
+        unit = step * frame_size
+        period_us = int(1000000 / self.clock.nominal)
+        try:
+            while self.running:
+                if self.fill == size and not self.swap():
+                    sleep_ms(self.idle_ms)
+                    continue
+                count = mpu.fifo_frames(frame_size, self.count_buf)
+                if count < 0:
+                    gap = mpu.fifo_gap(self.clock, self.anchor, frame_size,
+                                       self.fill // frame_size)
+                    if not self.pending_lost:
+                        self.gap_anchor = gap.anchor
+                    self.pending_lost += gap.lost
+                    self.anchor = gap.anchor
+                    self.fill = 0
+                    continue
+                counted = ticks_us()
+                n = min(count // step, (size - self.fill) // unit)
+                if not n:
+                    sleep_ms(self.idle_ms)
+                    continue
+                mpu.transfer(MPU6050_RA_FIFO_R_W, self.spans[self.back][
+                    self.fill // unit * units + n - 1])
+                # Frames short of a unit stay in the FIFO, newer than ours.
+                self.anchor = ticks_add(counted,
+                                        (n * step - count) * period_us)
+                self.fill += n * unit
+        finally:
+            self.stopped = True
+
+    def swap(self):
+        """Swap the full back block with a released front block."""
+        with self.swap_lock:
+            if self.ready or self.held:
+                return False
+            if self.pending_lost:
+                self.ready_gap = FifoGap(self.gap_anchor, 0, b'',
+                                         self.pending_lost)
+                self.pending_lost = 0
+            self.clock.stamp(self.frames, self.anchor)
+            self.back ^= 1
+            self.fill = 0
+            self.ready = True
+        return True
+
+    def get(self):
+        """
+        Take the newest full block.
+
+        Return FifoBatch(anchor, count, data) or None if no block is ready.
+        `self.clock.timestamp(i)` is valid for the block until `release`.
+        A FifoGap is returned first when samples were lost before the block,
+        it needs no `release`.
+        """
+        with self.swap_lock:
+            if not self.ready:
+                return None
+            if self.ready_gap is not None:
+                gap = self.ready_gap
+                self.ready_gap = None
+                return gap
+            self.ready = False
+            self.held = True
+            return FifoBatch(self.clock.anchor, self.frames,
+                             self.blocks[self.back ^ 1])
+
+    def release(self):
+        """Hand the front block back to the worker."""
+        self.held = False
 
-    def get_slv2_fifo_enabled(self):
-        """Get Slave 2 FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_FIFO_EN,
-                             MPU6050_SLV2_FIFO_EN_BIT)
 
-    def set_slv1_fifo_enabled(self, enabled):
-        """
-        Set Slave 1 FIFO enabled value.
+class MPU6050():
+    """A micropython module for the InvenSense MPU6050 sensor."""
 
-        When set to 1, this bit enables:
-        EXT_SENS_DATA registers (Registers 73 to 96) associated with Slave 1
-        to be written intothe FIFO buffer.
+    def __init__(self, i2c=None, address=MPU6050_DEFAULT_ADDRESS, freq=None,
+                 sda=None, scl=None):
         """
-        return self.write_bit(MPU6050_RA_FIFO_EN,
-                              MPU6050_SLV1_FIFO_EN_BIT)
+        Init MPU6050 instance.
 
-    def get_slv1_fifo_enabled(self):
-        """Get Slave 1 FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_FIFO_EN,
-                             MPU6050_SLV1_FIFO_EN_BIT)
+        `i2c` is any bus with the `machine.I2C` memory methods. It defaults
+        to hardware I2C on pins 21/22, or /dev/i2c-1 on Linux.
+        `freq` is the I2C clock in Hz, used for the default bus and for bus
+        budget estimates. It defaults to 400kHz, as `machine.I2C` does.
+        `sda` and `scl` are the bus pin numbers, needed by `recover_bus`
+        when passing your own `i2c`.
 
-    def set_slv0_fifo_enabled(self, enabled):
+        Every transfer is retried `retries` times with a doubling backoff
+        from `backoff_ms`, the bus is recovered after the second failure.
+        Worst case stall per transfer is about backoff_ms * (2^retries - 1)
+        plus one bus recovery, 7ms with the defaults.
         """
-        Set Slave 0 FIFO enabled value.
-
-        When set to 1, this bit enables:
-        EXT_SENS_DATA registers (Registers 73 to 96) associated with Slave 0
-        to be written intothe FIFO buffer.
-        """
-        return self.write_bit(MPU6050_RA_FIFO_EN,
-                              MPU6050_SLV0_FIFO_EN_BIT)
-
-    def get_slv0_fifo_enabled(self):
-        """Get Slave 0 FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_FIFO_EN,
-                             MPU6050_SLV0_FIFO_EN_BIT)
+        self.freq = freq or MPU6050_I2C_DEFAULT_FREQ
+        if i2c is not None:
+            self.i2c = i2c
+            self.pins = None if sda is None or scl is None else (sda, scl)
+        elif I2C is None:
+            from i2cdev import I2CDev
+            self.i2c = I2CDev()
+            self.pins = None
+        else:
+            # ESP32 DEVKIT V1
+            self.pins = (21 if sda is None else sda,
+                         22 if scl is None else scl)
+            self.i2c = self.open_bus()
 
-    # I2C_MST_CTRL
-    def set_multi_master_enabled(self, enabled):
-        """Set multi-master capability."""
-        return self.write_bit(MPU6050_RA_I2C_MST_CTRL,
-                              MPU6050_MULT_MST_EN_BIT,
-                              enabled)
-
-    def get_multi_master_enabled(self):
-        """Get multi-master enabled value."""
-        return self.read_bit(MPU6050_RA_I2C_MST_CTRL,
-                             MPU6050_MULT_MST_EN_BIT)
-
-    def set_wait_for_external_sensor_enabled(self, enabled):
-        """
-        Set wait for external sensor enable.
-
-        When setto 1,this bit delays the Data Ready interrupt until
-        External Sensor data from  the  Slave  devices  have  been
-        loaded into  the  EXT_SENS_DATA registers.
-        """
-        return self.write_bit(MPU6050_RA_I2C_MST_CTRL,
-                              MPU6050_WAIT_FOR_ES_BIT,
-                              enabled)
-
-    def get_wait_for_external_sensor_enabled(self):
-        """Get wait for external sensor value."""
-        return self.read_bit(MPU6050_RA_I2C_MST_CTRL,
-                             MPU6050_WAIT_FOR_ES_BIT)
-
-    def set_slv3_fifo_enabled(self, enabled):
-        """
-        Set Slave 3 FIFO enabled value.
-
-        When set to 1, this bit enables:
-        EXT_SENS_DATA registers associated with Slave 3 to be written into
-        the FIFO. The corresponding bits for Slaves 0-2 can be found in
-        Register 35.
-        """
-        return self.write_bit(MPU6050_RA_I2C_MST_CTRL,
-                              MPU6050_SLV3_FIFO_EN_BIT)
-
-    def get_slv3_fifo_enabled(self):
-        """Get Slave 3 FIFO enabled value."""
-        return self.read_bit(MPU6050_RA_I2C_MST_CTRL,
-                             MPU6050_SLV3_FIFO_EN_BIT)
-
-    def set_master_transition(self, enabled):
-        """
-        Set slave read/write transition enabled value.
-
-        When this bit equals 0, there is a restart between reads.
-        When this bit equals 1, there is a stop and start marking the beginning
-        of the next read.
-
-        When a write follows a read, a stop and start is always enforced.
-        """
-        return self.write_bit(MPU6050_RA_I2C_MST_CTRL,
-                              MPU6050_I2C_MST_P_NSR_BIT,
-                              enabled)
-
-    def get_master_transition(self):
-        """Get slave read/write transition enabled value."""
-        return self.read_bit(MPU6050_RA_I2C_MST_CTRL,
-                             MPU6050_I2C_MST_P_NSR_BIT)
-
-    def set_master_clock_speed(self, speed):
-        """
-        Set the I2C master clock speed divider.
-
-        MPU6050_CLOCK_DIV_348 = 0x0
-        MPU6050_CLOCK_DIV_333 = 0x1
-        MPU6050_CLOCK_DIV_320 = 0x2
-        MPU6050_CLOCK_DIV_308 = 0x3
-        MPU6050_CLOCK_DIV_296 = 0x4
-        MPU6050_CLOCK_DIV_286 = 0x5
-        MPU6050_CLOCK_DIV_276 = 0x6
-        MPU6050_CLOCK_DIV_267 = 0x7
-        MPU6050_CLOCK_DIV_258 = 0x8
-        MPU6050_CLOCK_DIV_500 = 0x9
-        MPU6050_CLOCK_DIV_471 = 0xA
-        MPU6050_CLOCK_DIV_444 = 0xB
-        MPU6050_CLOCK_DIV_421 = 0xC
-        MPU6050_CLOCK_DIV_400 = 0xD
-        MPU6050_CLOCK_DIV_381 = 0xE
-        MPU6050_CLOCK_DIV_364 = 0xF
-        """
-        return self.write_bits(MPU6050_RA_I2C_MST_CTRL,
-                               MPU6050_I2C_MST_CLK_BIT,
-                               MPU6050_I2C_MST_CLK_LENGTH,
-                               speed)
-
-    def get_master_clock_speed(self):
-        """
-        Get the I2C master clock speed divider.
-
-        ---------------------------------------------------------
-        I2C_MST_CLK | I2C Master Clock Speed | 8MHz Clock Divider
-        ------------+------------------------+-------------------
-        0           | 348kHz                 | 23
-        1           | 333kHz                 | 24
-        2           | 320kHz                 | 25
-        3           | 308kHz                 | 26
-        4           | 296kHz                 | 27
-        5           | 286kHz                 | 28
-        6           | 276kHz                 | 29
-        7           | 267kHz                 | 30
-        8           | 258kHz                 | 31
-        9           | 500kHz                 | 16
-        10          | 471kHz                 | 17
-        11          | 444kHz                 | 18
-        12          | 421kHz                 | 19
-        13          | 400kHz                 | 20
-        14          | 381kHz                 | 21
-        15          | 364kHz                 | 22
-        """
-        return self.read_bits(MPU6050_RA_I2C_MST_CTRL,
-                              MPU6050_I2C_MST_CLK_BIT,
-                              MPU6050_I2C_MST_CLK_LENGTH)
+        self.address = address
+        self.retries = 3
+        self.backoff_ms = 1
+        self.counters = {'retries': 0, 'recoveries': 0, 'restores': 0,
+                         'verify_errors': 0, 'failures': 0,
+                         'fifo_overflows': 0, 'lost_samples': 0}
+        self.shadow = {}
+        self.recovering = False
+        # Serialises bus access with a Sampler thread. Reentrant, so a
+        # read-modify-write holds it across its transfers.
+        self.lock = RLock() if allocate_lock else NoLock()
+        self.buf = bytearray(1)
+        self.write_buf = bytearray(1)
+        # Scratch for the *_into reads, the FIFO one is allocated on use.
+        self.scratch = Views(bytearray(MPU6050_POLL_LENGTH))
+        self.fifo_scratch = None
+        self.resync_buf = bytearray(1)
+        self.target = None
+        self.clock = None
+        self.poll_buf = bytearray(MPU6050_POLL_LENGTH)
+        self.status = 0
+        self.stale_samples = 0
 
     # I2C_SLV0_ADDR
     # I2C_SLV0_REG
@@ -708,358 +1025,6 @@ class MPU6050():
     # I2C_SLV4_CTRL
     # I2C_SLV4_DI
 
-    # I2C_MST_STATUS
-    def get_passthrough_status(self):
-        """
-        Get FSYNC interrupt status.
-
-        This bit reflects the status of the FSYNC interrupt from an external
-        device into the MPU-60X0. This is used as a way to pass an external
-        interrupt through the MPU-60X0 to the host application processor.
-        When set to 1, this bit will cause an interrupt if FSYNC_INT_EN is
-        asserted in INT_PIN_CFG (Register 55).
-        """
-        return self.read_bit(MPU6050_RA_I2C_MST_STATUS,
-                             MPU6050_MST_PASS_THROUGH_BIT)
-
-    def get_slv4_done(self):
-        """"Get slave 4 transaction completed."""
-        return self.read_bit(MPU6050_RA_I2C_MST_STATUS,
-                             MPU6050_MST_I2C_SLV4_DONE_BIT)
-
-    def get_lost_arbitration(self):
-        """
-        Get I2C Master lost arbitration.
-
-        This bit automatically sets to 1 when the I2C Master has lost
-        arbitration of the auxiliary I2C bus(an error condition).
-        This triggers an interrupt if the I2C_MST_INT_ENbit in the INT_ENABLE
-        register (Register 56) is asserted.
-        """
-        return self.read_bit(MPU6050_RA_I2C_MST_STATUS,
-                             MPU6050_MST_I2C_LOST_ARB_BIT)
-
-    def get_slv4_nack(self):
-        """
-        Get Slave 4 nack status.
-
-        This bit automatically sets to 1 when the I2C Master receives a NACK
-        in a transaction with Slave 4.
-        This triggers an interrupt if the I2C_MST_INT_ENbit in the INT_ENABLE
-        register (Register 56) is asserted.
-        """
-        return self.read_bit(MPU6050_RA_I2C_MST_STATUS,
-                             MPU6050_MST_I2C_SLV4_NACK_BIT)
-
-    def get_slv3_nack(self):
-        """
-        Get Slave 3 nack status.
-
-        This bit automatically sets to 1 when the I2C Master receives a NACK
-        in a transaction with Slave 3.
-        This triggers an interrupt if the I2C_MST_INT_ENbit in the INT_ENABLE
-        register (Register 56) is asserted.
-        """
-        return self.read_bit(MPU6050_RA_I2C_MST_STATUS,
-                             MPU6050_MST_I2C_SLV3_NACK_BIT)
-
-    def get_slv2_nack(self):
-        """
-        Get Slave 2 nack status.
-
-        This bit automatically sets to 1 when the I2C Master receives a NACK
-        in a transaction with Slave 2.
-        This triggers an interrupt if the I2C_MST_INT_ENbit in the INT_ENABLE
-        register (Register 56) is asserted.
-        """
-        return self.read_bit(MPU6050_RA_I2C_MST_STATUS,
-                             MPU6050_MST_I2C_SLV2_NACK_BIT)
-
-    def get_slv1_nack(self):
-        """
-        Get Slave 1 nack status.
-
-        This bit automatically sets to 1 when the I2C Master receives a NACK
-        in a transaction with Slave 1.
-        This triggers an interrupt if the I2C_MST_INT_ENbit in the INT_ENABLE
-        register (Register 56) is asserted.
-        """
-        return self.read_bit(MPU6050_RA_I2C_MST_STATUS,
-                             MPU6050_MST_I2C_SLV1_NACK_BIT)
-
-    def get_slv0_nack(self):
-        """
-        Get Slave 0 nack status.
-
-        This bit automatically sets to 1 when the I2C Master receives a NACK
-        in a transaction with Slave 0.
-        This triggers an interrupt if the I2C_MST_INT_ENbit in the INT_ENABLE
-        register (Register 56) is asserted.
-        """
-        return self.read_bit(MPU6050_RA_I2C_MST_STATUS,
-                             MPU6050_MST_I2C_SLV0_NACK_BIT)
-
-    # INT_PIN_CFG
-    def set_interrupt_mode(self, mode):
-        """
-        Set interrupt logic level.
-
-        0 | HIGH
-        1 | LOW
-        """
-        return self.write_bit(MPU6050_RA_INT_PIN_CFG,
-                              MPU6050_INTCFG_INT_LEVEL_BIT,
-                              mode)
-
-    def get_interrupt_mode(self):
-        """
-        Set interrupt logic level.
-
-        0, the logic level for the INT pin is active high.
-        1, the logic level for the INT pin is active low.
-        """
-        return self.read_bit(MPU6050_RA_INT_PIN_CFG,
-                             MPU6050_INTCFG_INT_LEVEL_BIT)
-
-    def set_interrupt_drive(self, drive):
-        """
-        Set interrup drive level.
-
-        0 | PUSH-PULL
-        1 | OPEN DRAIN
-        """
-        return self.write_bit(MPU6050_RA_INT_PIN_CFG,
-                              MPU6050_INTCFG_INT_OPEN_BIT,
-                              drive)
-
-    def get_interrupt_drive(self):
-        """
-        Get interrup drive level.
-
-        0, the INT pin is configured as push-pull.
-        1, the INT pin is configured as open drain.
-        """
-        return self.read_bit(MPU6050_RA_INT_PIN_CFG,
-                             MPU6050_INTCFG_INT_OPEN_BIT)
-
-    def set_latch_interrupt(self, latch):
-        """
-        Set interrupt latch mode.
-
-        0 | 50us pulse
-        1 | Latch until INT pin cleared
-        """
-        return self.write_bit(MPU6050_RA_INT_PIN_CFG,
-                              MPU6050_INTCFG_LATCH_INT_EN_BIT,
-                              latch)
-
-    def get_latch_interrupt(self):
-        """
-        Get interrupt latch mode.
-
-        0, the INT pin emits a 50us long pulse.
-        1, the INT pin is held high until the interrupt is cleared.
-        """
-        return self.read_bit(MPU6050_RA_INT_PIN_CFG,
-                             MPU6050_INTCFG_LATCH_INT_EN_BIT)
-
-    def set_interrupt_rd_clear(self, mode):
-        """
-        Set clear interrupts status bits mode.
-
-        0 | Only reading INT_STATUS
-        1 | Any read operation
-        """
-        return self.write_bit(MPU6050_RA_INT_PIN_CFG,
-                              MPU6050_INTCFG_INT_RD_CLEAR_BIT,
-                              mode)
-
-    def get_interrupt_rd_clear(self):
-        """
-        Get clear interrupts status bits mode.
-
-        0, interrupt status bits are cleared only by reading INT_STATUS
-        (Register 58)
-        1,interrupt status bits are cleared on any read operation
-        """
-        return self.read_bit(MPU6050_RA_INT_PIN_CFG,
-                             MPU6050_INTCFG_INT_RD_CLEAR_BIT)
-
-    def set_fsync_interrupt_level(self, mode):
-        """
-        Set FSYNC logic level.
-
-        0 | FSYNC active HIGH
-        1 | FSYNC active LOW
-        """
-        return self.write_bit(MPU6050_RA_INT_PIN_CFG,
-                              MPU6050_INTCFG_FSYNC_INT_EN_BIT,
-                              mode)
-
-    def get_fsync_interrupt_level(self):
-        """
-        Get FSYNC logic level.
-
-        0, the logic level for the FSYNC pin (when used as an interrupt to the
-        host processor) is active high.
-        1, the logic level for the FSYNC pin (when used as an interrupt to the
-        host processor) is active low.
-        """
-        return self.read_bit(MPU6050_RA_INT_PIN_CFG,
-                             MPU6050_INTCFG_FSYNC_INT_EN_BIT)
-
-    def set_fsync_interrupt_enabled(self, enabled):
-        """
-        Set FSYNC pin interrupt enabled setting.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_INT_PIN_CFG,
-                              MPU6050_INTCFG_FSYNC_INT_EN_BIT,
-                              enabled)
-
-    def get_fsync_interrupt_enabled(self):
-        """
-        Get FSYNC pin interrupt enabled setting.
-
-        0, this bit disables the FSYNC pin from causing an interrupt to the
-        host processor.
-        1, this bit enables the FSYNC pin to be used as an interrupt to the
-        host processor.
-        """
-        return self.read_bit(MPU6050_RA_INT_PIN_CFG,
-                             MPU6050_INTCFG_FSYNC_INT_EN_BIT)
-
-    def set_i2c_bypass_enabled(self, enabled):
-        """
-        Set I2C bypass enabled status.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_INT_PIN_CFG,
-                              MPU6050_INTCFG_I2C_BYPASS_EN_BIT,
-                              enabled)
-
-    def get_i2c_bypass_enabled(self):
-        """
-        Set I2C bypass enabled status.
-
-        When this bit is equal to 0, the host application processor will not be
-        able to directly access the auxiliary I2C bus of the MPU-60X0
-        regardless of the state of I2C_MST_EN(Register 106 bit[5]).
-
-        When this bit is equal to 1 and I2C_MST_EN(Register 106 bit[5]) is
-        equal to 0, the host application processor will be able to directly
-        access the auxiliary I2C bus of the MPU-60X0.
-        """
-        return self.read_bit(MPU6050_RA_INT_PIN_CFG,
-                             MPU6050_INTCFG_I2C_BYPASS_EN_BIT)
-
-    # INT_ENABLE
-    def set_fifo_buffer_overflow_interrupt_enabled(self, enabled):
-        """
-        Set FIFO buffer overflow interrupt enabled.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_INT_ENABLE,
-                              MPU6050_INTERRUPT_FIFO_OFLOW_BIT,
-                              enabled)
-
-    def get_fifo_buffer_overflow_interrupt_enabled(self, enabled):
-        """
-        Get FIFO buffer overflow interrupt enabled.
-
-        When set to 1, this bit enables a FIFO buffer overflow to generate  an
-        interrupt
-        """
-        return self.write_bit(MPU6050_RA_INT_ENABLE,
-                              MPU6050_INTERRUPT_FIFO_OFLOW_BIT,
-                              enabled)
-
-    def set_i2c_master_interrupt_enabled(self, enabled):
-        """
-        Set I2C master interrupt enabled.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_INT_ENABLE,
-                              MPU6050_INTERRUPT_I2C_MST_INT_BIT,
-                              enabled)
-
-    def get_i2c_master_interrupt_enabled(self, enabled):
-        """
-        Get I2C master interrupt enabled.
-
-        When set to 1, this bit enables any of the I2C Master interrupt sources
-        to generate an interrupt.
-        """
-        return self.write_bit(MPU6050_RA_INT_ENABLE,
-                              MPU6050_INTERRUPT_I2C_MST_INT_BIT,
-                              enabled)
-
-    def set_data_ready_interrupt_enabled(self, enabled):
-        """
-        Set Data Ready interrupt enabled.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_INT_ENABLE,
-                              MPU6050_INTERRUPT_DATA_RDY_BIT,
-                              enabled)
-
-    def get_data_ready_interrupt_enabled(self):
-        """
-        Get Data Ready interrupt enabled.
-
-        When set to 1, this bit enables the Data Ready interrupt, which occurs
-        each time a write operation to all of the sensor registers has been
-        completed.
-        """
-        return self.read_bit(MPU6050_RA_INT_ENABLE,
-                             MPU6050_INTERRUPT_DATA_RDY_BIT)
-
-    # INT_STATUS
-    def get_fifo_overflow_interrupt(self):
-        """
-        Get FIFO overflow interrupt status.
-
-        This bit automatically sets to 1 when a FIFO buffer overflow interrupt
-        has been generated.
-
-        The bit clears to 0 after the register has been read.
-        """
-        return self.read_bit(MPU6050_RA_INT_STATUS,
-                             MPU6050_INTERRUPT_FIFO_OFLOW_BIT)
-
-    def get_i2c_master_interrupt(self):
-        """
-        Get I2C Master interrupt status.
-
-        This bit automatically sets to 1 when an I2C Master interrupt has been
-        enerated.For a list of I2C Master interrupts, please refer to
-        Register 54.
-        The bit clears to 0 after the register has been read.
-        """
-        return self.read_bit(MPU6050_RA_INT_STATUS,
-                             MPU6050_INTERRUPT_I2C_MST_INT_BIT)
-
-    def get_data_ready_interrupt(self):
-        """
-        Get Data Ready interrupt status.
-
-        This bit automatically sets to 1 when a Data Ready interrupt is
-        generated.
-        The bit clears to 0 after the register has been read.
-        """
-        return self.read_bit(MPU6050_RA_INT_STATUS,
-                             MPU6050_INTERRUPT_DATA_RDY_BIT)
-
     # Accelerometer Measurements
     def accel(self):
         """
@@ -1074,10 +1039,7 @@ class MPU6050():
         3       | +/- 16g          | 2048 LSB/g
         """
         buff = self.read_bytes(MPU6050_RA_ACCEL_XOUT_H, 6)
-        ax = self.bytes_toint(buff[0], buff[1])
-        ay = self.bytes_toint(buff[2], buff[3])
-        az = self.bytes_toint(buff[4], buff[5])
-        return (ax, ay, az)
+        return unpack_from('>3h', buff)
 
     def accel_x(self):
         """Get X-axis accelerometer reading."""
@@ -1102,7 +1064,8 @@ class MPU6050():
 
     def temp_in_celsius(self):
         """Get current internal temperature in celsius."""
-        return (self.temperature() / 340 + 36.53)
+        return (self.temperature() / MPU6050_TEMP_SENSITIVITY
+                + MPU6050_TEMP_OFFSET)
 
     # Gyroscope Measurements
     def gyro(self):
@@ -1118,10 +1081,7 @@ class MPU6050():
         3      | +/- 2000 degrees/s | 16.4 LSB/deg/s
         """
         buff = self.read_bytes(MPU6050_RA_GYRO_XOUT_H, 6)
-        gx = self.bytes_toint(buff[0], buff[1])
-        gy = self.bytes_toint(buff[2], buff[3])
-        gz = self.bytes_toint(buff[4], buff[5])
-        return (gx, gy, gz)
+        return unpack_from('>3h', buff)
 
     def gyro_x(self):
         """Get X-axis gyroscope reading."""
@@ -1147,73 +1107,23 @@ class MPU6050():
     # SIGNAL_PATH_RESET
     def gyro_path_reset(self):
         """1 resets the gyroscope analog and digital signal paths."""
-        self.reset_flag = True
         return self.write_bit(MPU6050_RA_SIGNAL_PATH_RESET,
                               MPU6050_PATHRESET_GYRO_RESET_BIT,
-                              True)
+                              True, reset=True)
 
     def accel_path_reset(self):
         """1 resets the accelerometer analog and digital signal paths."""
-        self.reset_flag = True
         return self.write_bit(MPU6050_RA_SIGNAL_PATH_RESET,
                               MPU6050_PATHRESET_ACCEL_RESET_BIT,
-                              True)
+                              True, reset=True)
 
     def temperature_path_reset(self):
         """1 resets the temperature sensor analog and digital signal paths."""
-        self.reset_flag = True
         return self.write_bit(MPU6050_RA_SIGNAL_PATH_RESET,
                               MPU6050_PATHRESET_TEMP_RESET_BIT,
-                              True)
+                              True, reset=True)
 
     # USER_CTRL
-    def set_fifo_enabled(self, enabled):
-        """
-        Set FIFO enabled.
-
-        0 | FIFO buffer disabled
-        1 | FIFO operations enabled
-        """
-        return self.write_bit(MPU6050_RA_USER_CTRL,
-                              MPU6050_USERCTRL_FIFO_EN_BIT,
-                              enabled)
-
-    def get_fifo_enabled(self):
-        """
-        Get FIFO disabled.
-
-        1, this bit enables FIFO operations.
-        0, the FIFO buffer is disabled.The FIFO buffer cannot be written to or
-        read from while disabled.
-
-        The FIFO buffer's state does not change unless the MPU-60X0 is power
-        cycled.
-        """
-        return self.read_bit(MPU6050_RA_USER_CTRL,
-                             MPU6050_USERCTRL_FIFO_EN_BIT)
-
-    def set_master_mode_enabled(self, enabled):
-        """
-        Set Master mode enabled.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_USER_CTRL,
-                              MPU6050_USERCTRL_I2C_MST_EN_BIT,
-                              enabled)
-
-    def get_master_mode_enabled(self):
-        """
-        Get Master mode enabled.
-
-        1, this bit enables I2C Master Mode.
-        0, the auxiliary I2C bus lines (AUX_DA and AUX_CL) are logically driven
-        by the primary I2C bus (SDA and SCL).
-        """
-        return self.read_bit(MPU6050_RA_USER_CTRL,
-                             MPU6050_USERCTRL_I2C_MST_EN_BIT)
-
     def fifo_reset(self):
         """
         Set FIFO reset.
@@ -1221,10 +1131,9 @@ class MPU6050():
         This bit resetsthe FIFO buffewhen set to 1 while FIFO_EN equals 0.
         This bit automatically clears to 0 after the reset has been triggered.
         """
-        self.reset_flag = True
         return self.write_bit(MPU6050_RA_USER_CTRL,
                               MPU6050_USERCTRL_FIFO_RESET_BIT,
-                              True)
+                              True, reset=True)
 
     def master_mode_reset(self):
         """
@@ -1233,10 +1142,9 @@ class MPU6050():
         This bit resets the I2C Master when set to 1 while I2C_MST_EN equals 0.
         This bit automatically clears to 0 after the reset has been triggered.
         """
-        self.reset_flag = True
         return self.write_bit(MPU6050_RA_USER_CTRL,
                               MPU6050_USERCTRL_I2C_MST_RESET_BIT,
-                              True)
+                              True, reset=True)
 
     def sensors_reset(self):
         """
@@ -1250,10 +1158,9 @@ class MPU6050():
         When resetting only the signal path (and not the sensor registers),
         please use Register 104, SIGNAL_PATH_RESET.
         """
-        self.reset_flag = True
         return self.write_bit(MPU6050_RA_USER_CTRL,
                               MPU6050_USERCTRL_SIG_COND_RESET_BIT,
-                              True)
+                              True, reset=True)
 
     # PWR_MGMT_1
     def device_reset(self):
@@ -1272,232 +1179,10 @@ class MPU6050():
           3. Set GYRO_RESET = ACCEL_RESET = TEMP_RESET = 1 (SIGNAL_PATH_RESET)
           4. Wait 100ms
         """
-        self.reset_flag = True
+        self.shadow.clear()
         return self.write_bit(MPU6050_RA_PWR_MGMT_1,
                               MPU6050_PWR1_DEVICE_RESET_BIT,
-                              True)
-
-    def set_sleep_enabled(self, enabled):
-        """
-        Set sleep mode status.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_PWR_MGMT_1,
-                              MPU6050_PWR1_SLEEP_BIT,
-                              enabled)
-
-    def get_sleep_enabled(self):
-        """
-        Get sleep mode.
-
-        1, this bit puts the MPU-60X0 into sleep mode.
-        """
-        return self.read_bit(MPU6050_RA_PWR_MGMT_1,
-                             MPU6050_PWR1_SLEEP_BIT)
-
-    def set_cycle_enabled(self, enabled):
-        """Set cycle eneabled."""
-        return self.write_bit(MPU6050_RA_PWR_MGMT_1,
-                              MPU6050_PWR1_CYCLE_BIT,
-                              enabled)
-
-    def get_cycle_enabled(self):
-        """
-        Get cycle enabled.
-
-        When this bit is set to 1 and SLEEP is disabled, the MPU-60X0 will
-        cycle between sleep mode and waking up to take a single  sample of
-        data from active sensors at a rate determined by LP_WAKE_CTRL
-        (register 108).
-        """
-        return self.read_bit(MPU6050_RA_PWR_MGMT_1,
-                             MPU6050_PWR1_CYCLE_BIT)
-
-    def set_temperature_sensor_disabled(self, disabled):
-        """
-        Set temperature sensor disabled.
-
-        0 | Enabled
-        1 | Disabled
-        """
-        return self.write_bit(MPU6050_RA_PWR_MGMT_1,
-                              MPU6050_PWR1_TEMP_DIS_BIT,
-                              disabled)
-
-    def get_temperature_sensor_disabled(self):
-        """
-        Get temperature sensor disabled.
-
-        1, this bit disables the temperature sensor.
-        """
-        return self.read_bit(MPU6050_RA_PWR_MGMT_1,
-                             MPU6050_PWR1_TEMP_DIS_BIT)
-
-    def set_clock_source(self, clksel):
-        """
-        Set clock source setting.
-
-        MPU6050_CLOCK_INTERNAL   = 0x00
-        MPU6050_CLOCK_PLL_XGYRO  = 0x01
-        MPU6050_CLOCK_PLL_YGYRO  = 0x02
-        MPU6050_CLOCK_PLL_ZGYRO  = 0x03
-        MPU6050_CLOCK_PLL_EXT32K = 0x04
-        MPU6050_CLOCK_PLL_EXT19M = 0x05
-        MPU6050_CLOCK_KEEP_RESET = 0x07
-        """
-        self.write_bits(MPU6050_RA_PWR_MGMT_1,
-                        MPU6050_PWR1_CLKSEL_BIT,
-                        MPU6050_PWR1_CLKSEL_LENGTH,
-                        clksel)
-
-    def get_clock_source(self):
-        """
-        Get clock source setting.
-
-        -----------------------------------------------
-        CLK_SEL | Clock Source
-        --------+--------------------------------------
-        0       | Internal oscillator
-        1       | PLL with X Gyro reference
-        2       | PLL with Y Gyro reference
-        3       | PLL with Z Gyro reference
-        4       | PLL with external 32.768kHz reference
-        5       | PLL with external 19.2MHz reference
-        6       | Reserved
-        7       | Stops the clock and keeps the timing generator in reset
-        """
-        return self.read_bits(MPU6050_RA_PWR_MGMT_1,
-                              MPU6050_PWR1_CLKSEL_BIT,
-                              MPU6050_PWR1_CLKSEL_LENGTH)
-
-    # PWR_MGMT_2
-    def set_low_power_wake_control(self, frec):
-        """
-        Set frequency of wake-ups during Accel Only Low Power Mode.
-
-        0 | 1.25 Hz
-        1 | 5    Hz
-        2 | 20   Hz
-        3 | 40   Hz
-        """
-        return self.write_bits(MPU6050_RA_PWR_MGMT_2,
-                               MPU6050_PWR2_LP_WAKE_CTRL_BIT,
-                               MPU6050_PWR2_LP_WAKE_CTRL_LENGTH,
-                               frec)
-
-    def get_low_power_wake_control(self):
-        """
-        Get frequency of wake-ups during Accel Only Low Power Mode.
-
-        --------------------------------
-        LP_WAKE_CTRL | Wake_up Frecuency
-        -------------+------------------
-        0            |      1.25 Hz
-        1            |        5  Hz
-        2            |       20  Hz
-        3            |       40  Hz
-        """
-        return self.read_bits(MPU6050_RA_PWR_MGMT_2,
-                              MPU6050_PWR2_LP_WAKE_CTRL_BIT,
-                              MPU6050_PWR2_LP_WAKE_CTRL_LENGTH)
-
-    def set_accel_x_standby_enabled(self, enabled):
-        """
-        Set X axis accelerometer standby mode.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_PWR_MGMT_2,
-                              MPU6050_PWR2_STBY_XA_BIT,
-                              enabled)
-
-    def get_accel_x_standby_enabled(self):
-        """Get X axis accelerometer standby mode."""
-        return self.read_bit(MPU6050_RA_PWR_MGMT_2,
-                             MPU6050_PWR2_STBY_XA_BIT)
-
-    def set_accel_y_standby_enabled(self, enabled):
-        """
-        Set Y axis accelerometer standby mode.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_PWR_MGMT_2,
-                              MPU6050_PWR2_STBY_YA_BIT,
-                              enabled)
-
-    def get_accel_y_standby_enabled(self):
-        """Get Y axis accelerometer standby mode."""
-        return self.read_bit(MPU6050_RA_PWR_MGMT_2,
-                             MPU6050_PWR2_STBY_YA_BIT)
-
-    def set_accel_z_standby_enabled(self, enabled):
-        """
-        Set Z axis accelerometer standby mode.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_PWR_MGMT_2,
-                              MPU6050_PWR2_STBY_ZA_BIT,
-                              enabled)
-
-    def get_accel_z_standby_enabled(self):
-        """Get Z axis accelerometer standby mode."""
-        return self.read_bit(MPU6050_RA_PWR_MGMT_2,
-                             MPU6050_PWR2_STBY_ZA_BIT)
-
-    def set_gyro_x_standby_enabled(self, enabled):
-        """
-        Set X axis gyroscope standby mode.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_PWR_MGMT_2,
-                              MPU6050_PWR2_STBY_XG_BIT,
-                              enabled)
-
-    def get_gyro_x_standby_enabled(self):
-        """Get X axis gyroscope standby mode."""
-        return self.read_bit(MPU6050_RA_PWR_MGMT_2,
-                             MPU6050_PWR2_STBY_XG_BIT)
-
-    def set_gyro_y_standby_enabled(self, enabled):
-        """
-        Set Y axis gyroscope standby mode.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_PWR_MGMT_2,
-                              MPU6050_PWR2_STBY_YG_BIT,
-                              enabled)
-
-    def get_gyro_y_standby_enabled(self):
-        """Get Y axis gyroscope standby mode."""
-        return self.read_bit(MPU6050_RA_PWR_MGMT_2,
-                             MPU6050_PWR2_STBY_YG_BIT)
-
-    def set_gyro_z_standby_enabled(self, enabled):
-        """
-        Set Z axis gyroscope standby mode.
-
-        0 | Disabled
-        1 | Enabled
-        """
-        return self.write_bit(MPU6050_RA_PWR_MGMT_2,
-                              MPU6050_PWR2_STBY_ZG_BIT,
-                              enabled)
-
-    def get_gyro_z_standby_enabled(self):
-        """Get Z axis gyroscope standby mode."""
-        return self.read_bit(MPU6050_RA_PWR_MGMT_2,
-                             MPU6050_PWR2_STBY_ZG_BIT)
+                              True, reset=True)
 
     # FIFO_COUNT
     def get_fifo_count(self):
@@ -1526,24 +1211,177 @@ class MPU6050():
         else:
             "No device found."
 
+    def open_bus(self):
+        """Create the I2C bus on `self.pins` at `self.freq`."""
+        sda, scl = self.pins
+        return I2C(sda=Pin(sda), scl=Pin(scl), freq=self.freq)
+
+    def recover_bus(self):
+        """
+        Free a stuck SDA line and reopen the bus.
+
+        A slave holding SDA low is clocked out with up to 9 SCL pulses, then
+        a STOP condition is sent. If the device was reset meanwhile the last
+        known configuration is written back.
+        Return False when the bus pins are unknown or, without `machine`,
+        cannot be driven.
+        """
+        if self.pins is None or Pin is None:
+            return False
+        with self.lock:
+            sda = Pin(self.pins[0], Pin.IN, Pin.PULL_UP)
+            scl = Pin(self.pins[1], Pin.OPEN_DRAIN, value=1)
+            for _ in range(9):
+                if sda.value():
+                    break
+                scl.value(0)
+                sleep_us(5)
+                scl.value(1)
+                sleep_us(5)
+            # STOP: SDA rises while SCL is high.
+            scl.value(0)
+            sda.init(Pin.OPEN_DRAIN, value=0)
+            sleep_us(5)
+            scl.value(1)
+            sleep_us(5)
+            sda.value(1)
+            self.i2c = self.open_bus()
+        self.counters['recoveries'] += 1
+        self.restore_after_reset()
+        return True
+
+    def restore_after_reset(self):
+        """
+        Write back the last known configuration after a device reset.
+
+        A reset is detected by PWR_MGMT_1 differing from the last value
+        written to it. Return True if the configuration was restored.
+        """
+        expected = self.shadow.get(MPU6050_RA_PWR_MGMT_1)
+        if expected is None or self.recovering:
+            return False
+        self.recovering = True
+        try:
+            if self.read_byte(MPU6050_RA_PWR_MGMT_1)[0] == expected:
+                return False
+            self.restore_config()
+            return True
+        finally:
+            self.recovering = False
+
+    def restore_config(self):
+        """Write every register value set since the last device reset."""
+        # Wake the device up first, the other registers in address order.
+        registers = sorted(self.shadow)
+        if MPU6050_RA_PWR_MGMT_1 in registers:
+            registers.remove(MPU6050_RA_PWR_MGMT_1)
+            registers.insert(0, MPU6050_RA_PWR_MGMT_1)
+        for register in registers:
+            self.transfer(register, bytearray((self.shadow[register],)), True)
+        self.counters['restores'] += 1
+
+    def transfer(self, register, buf, write=False):
+        """
+        Read into or write `buf` from `register` with bounded retries.
+
+        Failed transfers back off exponentially, the bus is recovered after
+        the second failure. Raise MPUException once `retries` are exhausted.
+        """
+        delay = self.backoff_ms
+        attempt = 0
+        while True:
+            try:
+                with self.lock:
+                    if write:
+                        return self.i2c.writeto_mem(self.address, register,
+                                                    buf)
+                    return self.i2c.readfrom_mem_into(self.address, register,
+                                                      buf)
+            except OSError:
+                if attempt == self.retries:
+                    break
+                self.counters['retries'] += 1
+                sleep_ms(delay)
+                delay <<= 1
+                if attempt == 1 and not self.recovering:
+                    try:
+                        self.recover_bus()
+                    except OSError:
+                        pass
+                attempt += 1
+        self.counters['failures'] += 1
+        raise MPUException('I2C transfer failed at 0x%02X' % register)
+
+    def get_field(self, name, cached=False):
+        """
+        Read a register field from MPU6050_FIELDS.
+
+        With `cached`, the field is decoded from the last value written to
+        its register when there is one, without any bus transaction.
+        """
+        register = MPU6050_FIELDS[name][0]
+        value = self.shadow.get(register) if cached else None
+        if value is None:
+            value = self.read_byte(register)[0]
+        return field_value(name, value)
+
+    def set_field(self, name, value, verify=True):
+        """Write a register field from MPU6050_FIELDS."""
+        return self.set_fields({name: value}, verify)
+
+    def set_fields(self, fields, verify=True):
+        """
+        Write several register fields from a {name: value} dict.
+
+        Fields are merged per register, and each run of adjacent registers
+        is read and written back in one burst each. Registers fully covered
+        by their fields are not read. With `verify`, writes are read back.
+        """
+        values = {}
+        masks = {}
+        for name, value in fields.items():
+            register, bit, length, access = MPU6050_FIELDS[name]
+            if access != MPU6050_RW:
+                raise MPUException('%s is read-only' % name)
+            shift = bit - length + 1
+            mask = ((1 << length) - 1) << shift
+            values[register] = (values.get(register, 0) & ~mask
+                                | (value << shift) & mask)
+            masks[register] = masks.get(register, 0) | mask
+        registers = sorted(values)
+        while registers:
+            start = end = registers.pop(0)
+            while registers and registers[0] == end + 1:
+                end = registers.pop(0)
+            span = range(start, end + 1)
+            with self.lock:
+                if all(masks[register] == 0xFF for register in span):
+                    data = bytearray(len(span))
+                else:
+                    data = self.read_bytes(start, len(span))
+                for i, register in enumerate(span):
+                    data[i] = data[i] & ~masks[register] | values[register]
+                self.write_bytes(start, data, verify)
+        return True
+
     def read_bit(self, register, bit_num):
         """Read a single bit from an 8-bit device register."""
-        self.i2c.readfrom_mem_into(self.address, register, self.buf)
+        self.transfer(register, self.buf)
         b = self.buf[0]
         b & (1 << bit_num)
         b >>= bit_num
         return b
 
-    def write_bit(self, register, bit_num, data):
+    def write_bit(self, register, bit_num, data, reset=False):
         """Write a single bit in an 8-bit device register."""
-        self.buf = self.read_byte(register)
-        b = self.buf[0]
-        b = (b | (1 << bit_num)) if (data != 0) else (b & ~(1 << bit_num))
-        return self.write_byte(register, b)
+        with self.lock:
+            b = self.read_byte(register)[0]
+            b = (b | (1 << bit_num)) if (data != 0) else (b & ~(1 << bit_num))
+            return self.write_byte(register, b, reset)
 
     def read_bits(self, register, bit_start, length):
         """Read multiple bits from an 8-bit device register."""
-        self.i2c.readfrom_mem_into(self.address, register, self.buf)
+        self.transfer(register, self.buf)
         mask = ((1 << length) - 1) << (bit_start - length + 1)
         b = self.buf[0]
         b &= mask
@@ -1552,32 +1390,83 @@ class MPU6050():
 
     def write_bits(self, register, bit_start, length, data):
         """Write multiples bits in an 8-bit device register."""
-        self.buf = self.read_byte(register)
-        b = self.buf[0]
-        mask = ((1 << length) - 1) << (bit_start - length + 1)
-        data <<= (bit_start - length + 1)
-        data &= mask
-        b &= ~(mask)
-        b |= data
-        return self.write_byte(register, b)
+        with self.lock:
+            b = self.read_byte(register)[0]
+            mask = ((1 << length) - 1) << (bit_start - length + 1)
+            data <<= (bit_start - length + 1)
+            data &= mask
+            b &= ~(mask)
+            b |= data
+            return self.write_byte(register, b)
 
     def read_byte(self, register):
         """Read single byte from an 8-bit device register."""
-        self.i2c.readfrom_mem_into(self.address, register, self.buf)
+        self.transfer(register, self.buf)
         return self.buf
 
-    def write_byte(self, register, data):
+    def write_byte(self, register, data, reset=False):
         """Write a single byte in an 8-bit device register."""
-        data = bytearray([data])
-        self.i2c.writeto_mem(self.address, register, data)
-        if (data == self.read_byte(register)) or (self.reset_flag):
-            self.reset_flag = False
-            return True
-        raise MPUException()
+        self.write_buf[0] = data
+        return self.write_bytes(register, self.write_buf, reset=reset)
+
+    def write_bytes(self, register, data, verify=True, reset=False):
+        """
+        Write consecutive 8-bit device registers in a single transaction.
+
+        The written values are read back and the write retried on mismatch,
+        unless `verify` is False. A `reset` write sets self-clearing reset
+        bits: it is neither verified nor kept for `restore_config`.
+        """
+        length = len(data)
+        attempt = 0
+        while attempt <= self.retries:
+            self.transfer(register, data, True)
+            if reset:
+                return True
+            if not verify:
+                match = True
+            elif length == 1:
+                match = self.read_byte(register)[0] == data[0]
+            else:
+                match = data == self.read_bytes(register, length)
+            if match:
+                i = 0
+                while i < length:
+                    self.shadow[register + i] = data[i]
+                    i += 1
+                return True
+            self.counters['verify_errors'] += 1
+            attempt += 1
+        self.counters['failures'] += 1
+        raise MPUException('write verify failed at 0x%02X' % register)
 
     def read_bytes(self, register, length):
         """Read single byte from an 8-bit device register."""
-        return self.i2c.readfrom_mem(self.address, register, length)
+        data = bytearray(length)
+        self.transfer(register, data)
+        return data
+
+    def read_into(self, register, count, buf, offset=0):
+        """
+        Read `count` int16 values from `register` into caller storage.
+
+        A bytearray gets the raw big-endian bytes at byte `offset`, read in
+        place. Any other int16 storage (array('h'), list) gets the decoded
+        values at index `offset`. Return the offset past the written data.
+        """
+        length = count << 1
+        if isinstance(buf, bytearray):
+            self.transfer(register, self.views(buf).get(offset, length))
+            return offset + length
+        self.transfer(register, self.scratch.get(0, length))
+        decode_into(self.scratch.buf, count, buf, offset)
+        return offset + count
+
+    def views(self, buf):
+        """Get the Views of a caller buffer, kept for the last one used."""
+        if self.target is None or self.target.buf is not buf:
+            self.target = Views(buf)
+        return self.target
 
     # Helpers
     def bytes_toint(self, msb, lsb):
@@ -1617,29 +1506,563 @@ class MPU6050():
 
     def accel_in_g(self, raw_value):
         """Acceleration in `g` unit."""
-        sensitivity = {0: 16384, 1: 8192, 2: 4096, 3: 2048}
         full_scale = self.get_full_scale_accel_range()
-        return self.unit_converter(raw_value, sensitivity[full_scale])
+        return self.unit_converter(raw_value,
+                                   MPU6050_ACCEL_SENSITIVITY[full_scale])
 
     def gyro_in_deg(self, raw_value):
         """Gyroscope in `deg` unit."""
-        sensitivity = {0: 250, 1: 500, 2: 1000, 3: 2000}
         full_scale = self.get_full_scale_gyro_range()
-        return self.unit_converter(raw_value, sensitivity[full_scale])
+        return self.unit_converter(raw_value,
+                                   MPU6050_GYRO_SENSITIVITY[full_scale])
 
     def initialize(self,
                    clk_sel=MPU6050_CLOCK_PLL_XGYRO,
                    dlpf_cfg=MPU6050_DLPF_BW_42,
                    fs_gyro=MPU6050_GYRO_FS_250,
-                   fs_accel=MPU6050_ACCEL_FS_2):
+                   fs_accel=MPU6050_ACCEL_FS_2,
+                   rate=200):
         """Prepare for general usage."""
         self.device_reset()
         sleep_ms(100)
 
         self.disable_sleep()
         self.set_clock_source(clk_sel)
-        self.set_dlpf_mode(dlpf_cfg)
-        # Set sample rate = gyroscope output rate/(1 + SMPLRT_DIV)
-        self.set_sample_rate(0x04)
+        self.set_output_rate(rate, dlpf_cfg=dlpf_cfg)
         self.set_full_scale_gyro_range(fs_gyro)
         self.set_full_scale_accel_range(fs_accel)
+
+    def output_rate(self):
+        """
+        Get sample rate in Hz.
+
+        Sample Rate = Gyroscope Output Rate / (1 + SMPLRT_DIV)
+        The gyroscope output rate is 8kHz when the DLPF is disabled
+        (DLPF_CFG = 0 or 7), and 1kHz when the DLPF is enabled.
+        """
+        dlpf_cfg = self.get_dlpf_mode()
+        if dlpf_cfg in (0, 7):
+            rate = MPU6050_GYRO_OUTPUT_RATE
+        else:
+            rate = MPU6050_GYRO_OUTPUT_RATE_DLPF
+        return rate / (1 + self.get_sample_rate())
+
+    def start_clock(self):
+        """Start sample timestamp reconstruction at the current rate."""
+        self.clock = SampleClock(self.output_rate())
+        return self.clock
+
+    def stamped(self, reader):
+        """
+        Timestamp a polled reading.
+
+        `reader` is a bound read method such as `self.accel`, returns
+        `(ticks_us, value)` and updates the clock jitter statistics.
+        """
+        if self.clock is None:
+            self.start_clock()
+        return self.clock.tick(), reader()
+
+    def fifo_frame_size(self):
+        """Get bytes per FIFO frame from the accel, temp and gyro enables."""
+        fifo_en = self.read_byte(MPU6050_RA_FIFO_EN)[0]
+        size = 6 if fifo_en & (1 << MPU6050_ACCEL_FIFO_EN_BIT) else 0
+        for bit in (MPU6050_TEMP_FIFO_EN_BIT,
+                    MPU6050_XG_FIFO_EN_BIT,
+                    MPU6050_YG_FIFO_EN_BIT,
+                    MPU6050_ZG_FIFO_EN_BIT):
+            if fifo_en & (1 << bit):
+                size += 2
+        return size
+
+    def read_fifo(self, frame_size=None):
+        """
+        Drain all whole frames from the FIFO.
+
+        Return FifoBatch(anchor, count, data): `count` frames of `frame_size`
+        bytes, the newest one sampled at `anchor` (ticks_us).
+        Use `self.clock.timestamp(i)` for the instant of frame `i`.
+        After an overflow return FifoGap(anchor, 0, b'', lost) instead, the
+        FIFO is reset and the next batch starts on a frame boundary.
+        """
+        if self.clock is None:
+            self.start_clock()
+        if frame_size is None:
+            frame_size = self.fifo_frame_size()
+        if not frame_size:
+            return FifoBatch(self.clock.stamp(0), 0, b'')
+        count = self.fifo_frames(frame_size, self.scratch.get(0, 2))
+        if count < 0:
+            return self.fifo_gap(self.clock, self.clock.anchor, frame_size)
+        # The newest frame was sampled before FIFO_COUNT was read.
+        counted = ticks_us()
+        data = self.get_fifo_data(count * frame_size) if count else b''
+        return FifoBatch(self.clock.stamp(count, counted), count, data)
+
+    def fifo_frames(self, frame_size, buf):
+        """
+        Get the whole frames in the FIFO, checking for an overflow first.
+
+        `buf` is a 2-byte scratch buffer. An overflow is either FIFO_OFLOW_INT
+        in INT_STATUS (cleared by the read, as is DATA_RDY_INT) or a full
+        FIFO. The oldest frames were then overwritten and the frame
+        boundary is lost: the FIFO is reset and -1 returned.
+        """
+        self.transfer(MPU6050_RA_INT_STATUS, buf)
+        overflow = buf[0] & (1 << MPU6050_INTERRUPT_FIFO_OFLOW_BIT)
+        self.transfer(MPU6050_RA_FIFO_COUNTH, buf)
+        count = buf[0] << 8 | buf[1]
+        if overflow or count >= MPU6050_FIFO_SIZE:
+            self.fifo_resync()
+            self.counters['fifo_overflows'] += 1
+            return -1
+        return count // frame_size
+
+    def fifo_resync(self):
+        """
+        Empty the FIFO so it restarts on a frame boundary.
+
+        FIFO_RESET only acts while FIFO_EN is 0, so the FIFO is disabled
+        around it. A full FIFO keeps raising FIFO_OFLOW_INT until the
+        reset, INT_STATUS is read afterwards so the next drain does not see
+        that overflow again. Uses its own buffer, safe to call from a
+        Sampler worker: the lock is held across the USER_CTRL
+        read-modify-write so a set_* on another thread cannot land in
+        between and be written back stale.
+        """
+        buf = self.resync_buf
+        with self.lock:
+            self.transfer(MPU6050_RA_USER_CTRL, buf)
+            user_ctrl = buf[0] | 1 << MPU6050_USERCTRL_FIFO_EN_BIT
+            buf[0] = (user_ctrl & ~(1 << MPU6050_USERCTRL_FIFO_EN_BIT)
+                      | 1 << MPU6050_USERCTRL_FIFO_RESET_BIT)
+            self.transfer(MPU6050_RA_USER_CTRL, buf, True)
+            buf[0] = user_ctrl
+            self.transfer(MPU6050_RA_USER_CTRL, buf, True)
+            self.shadow[MPU6050_RA_USER_CTRL] = user_ctrl
+            self.transfer(MPU6050_RA_INT_STATUS, buf)
+
+    def fifo_gap(self, clock, since, frame_size, discarded=0):
+        """
+        Account for an overflow, return its FifoGap.
+
+        `since` (ticks_us) is the FIFO_COUNT read of the last drain, when
+        the newest frame handed on was sampled. Every sample after it is
+        lost: the frames still in the FIFO at the reset and those dropped
+        when it overflowed, at least a full FIFO of them. `discarded` adds
+        frames drained but dropped by the caller. The estimate uses the
+        measured rate of `clock`.
+        """
+        now = ticks_us()
+        lost = MPU6050_FIFO_SIZE // frame_size
+        if since is not None:
+            elapsed = int(ticks_diff(now, since) * clock.rate() / 1000000
+                          + 0.5)
+            if elapsed > lost:
+                lost = elapsed
+        lost += discarded
+        clock.skip(lost)
+        self.counters['lost_samples'] += lost
+        return FifoGap(now, 0, b'', lost)
+
+    # Zero-copy reads
+    def accel_into(self, buf, offset=0):
+        """Read (ax, ay, az) into `buf`, see `read_into`."""
+        return self.read_into(MPU6050_RA_ACCEL_XOUT_H, 3, buf, offset)
+
+    def gyro_into(self, buf, offset=0):
+        """Read (gx, gy, gz) into `buf`, see `read_into`."""
+        return self.read_into(MPU6050_RA_GYRO_XOUT_H, 3, buf, offset)
+
+    def temperature_into(self, buf, offset=0):
+        """Read the raw temperature into `buf`, see `read_into`."""
+        return self.read_into(MPU6050_RA_TEMP_OUT_H, 1, buf, offset)
+
+    def motion_into(self, buf, offset=0):
+        """
+        Read (ax, ay, az, temp, gx, gy, gz) into `buf` in one burst.
+
+        See `read_into`.
+        """
+        return self.read_into(MPU6050_RA_ACCEL_XOUT_H, 7, buf, offset)
+
+    def fifo_into(self, buf, offset=0, frame_size=None):
+        """
+        Drain the whole FIFO frames that fit into `buf` from `offset` on.
+
+        A bytearray gets raw frames, read in place. array('h') storage gets
+        decoded values, through a FIFO sized scratch buffer. Return the
+        number of frames read, stamped on `self.clock` when it is running,
+        or minus the estimated lost samples after an overflow (see
+        `read_fifo`).
+        Drains into the same few spans of `buf` reuse their memoryview
+        slices and do not allocate (see Views), pass `frame_size` to also
+        skip reading FIFO_EN.
+        """
+        if frame_size is None:
+            frame_size = self.fifo_frame_size()
+        if not frame_size:
+            return 0
+        count = self.fifo_frames(frame_size, self.scratch.get(0, 2))
+        if count < 0:
+            if self.clock is None:
+                self.start_clock()
+            return -self.fifo_gap(self.clock, self.clock.anchor,
+                                  frame_size).lost
+        # The newest frame was sampled before FIFO_COUNT was read.
+        counted = ticks_us()
+        raw_target = isinstance(buf, bytearray)
+        room = len(buf) - offset
+        if not raw_target:
+            room <<= 1
+        if count > room // frame_size:
+            if self.clock is not None:
+                # Frames left in the FIFO are newer than the last one read.
+                counted = ticks_add(counted, -int(
+                    (count - room // frame_size) * 1000000
+                    / self.clock.nominal))
+            count = room // frame_size
+        if count:
+            length = count * frame_size
+            if raw_target:
+                self.transfer(MPU6050_RA_FIFO_R_W,
+                              self.views(buf).get(offset, length))
+            else:
+                if self.fifo_scratch is None:
+                    self.fifo_scratch = Views(bytearray(MPU6050_FIFO_SIZE))
+                self.transfer(MPU6050_RA_FIFO_R_W,
+                              self.fifo_scratch.get(0, length))
+                decode_into(self.fifo_scratch.buf, length >> 1, buf, offset)
+        if self.clock is not None:
+            self.clock.stamp(count, counted)
+        return count
+
+    def plan_output_rate(self, rate, bandwidth=None, dlpf_cfg=None,
+                         frame_size=12):
+        """
+        Pick DLPF_CFG and SMPLRT_DIV for a target sample rate in Hz.
+
+        The closest achievable rate wins. Ties are broken by the DLPF
+        bandwidth closest to `bandwidth`, which defaults to half the rate,
+        avoiding bandwidths above Nyquist. `dlpf_cfg` pins the filter.
+
+        Return RatePlan(dlpf_cfg, divider, rate, bandwidth, warnings) where
+        `warnings` notes an achieved rate more than MPU6050_RATE_TOLERANCE
+        off target, and lists the limits it exceeds for the current I2C
+        clock and FIFO frames of `frame_size` bytes.
+        """
+        if not rate > 0:
+            raise ValueError('sample rate must be positive, got %r' % rate)
+        target_bw = bandwidth or min(rate / 2, MPU6050_DLPF_BANDWIDTH[0])
+        candidates = range(7) if dlpf_cfg is None else (dlpf_cfg,)
+        best = None
+        for cfg in candidates:
+            if cfg in (0, 7):
+                base = MPU6050_GYRO_OUTPUT_RATE
+            else:
+                base = MPU6050_GYRO_OUTPUT_RATE_DLPF
+            divider = min(max(int(base / rate + 0.5) - 1, 0), 255)
+            achieved = base / (1 + divider)
+            bw = MPU6050_DLPF_BANDWIDTH[cfg % 7]
+            key = (round(abs(achieved - rate) / rate, 3),
+                   bandwidth is None and bw > achieved / 2,
+                   abs(bw - target_bw))
+            if best is None or key < best[0]:
+                best = (key, cfg, divider, achieved, bw)
+        _, cfg, divider, achieved, bw = best
+
+        warnings = []
+        if abs(achieved - rate) > MPU6050_RATE_TOLERANCE * rate:
+            warnings.append('%g Hz is the closest rate to %g Hz'
+                            % (achieved, rate))
+        byte_rate = self.freq / MPU6050_I2C_BYTE_CLOCKS
+        # FIFO drained at half full: one count read and one data read.
+        frames = MPU6050_FIFO_SIZE // 2 // frame_size
+        overhead = (2 * MPU6050_I2C_READ_OVERHEAD + 2) / frames
+        fifo_limit = byte_rate / (frame_size + overhead)
+        poll_limit = byte_rate / (MPU6050_I2C_READ_OVERHEAD + 15)
+        if achieved > fifo_limit:
+            warnings.append('FIFO drain limited to %d Hz at %d Hz I2C'
+                            % (fifo_limit, self.freq))
+        elif achieved > poll_limit:
+            warnings.append('polling limited to %d Hz at %d Hz I2C, use FIFO'
+                            % (poll_limit, self.freq))
+        if achieved > MPU6050_ACCEL_OUTPUT_RATE:
+            warnings.append('accelerometer samples repeat above %d Hz'
+                            % MPU6050_ACCEL_OUTPUT_RATE)
+        return RatePlan(cfg, divider, achieved, bw, warnings)
+
+    def set_output_rate(self, rate, bandwidth=None, dlpf_cfg=None):
+        """
+        Set sample rate in Hz and DLPF bandwidth.
+
+        SMPLRT_DIV and CONFIG are adjacent registers, both are written in a
+        single transaction keeping EXT_SYNC_SET. Return the RatePlan applied.
+        """
+        plan = self.plan_output_rate(rate, bandwidth, dlpf_cfg)
+        config = self.read_byte(MPU6050_RA_CONFIG)[0]
+        mask = (1 << MPU6050_CFG_DLPF_CFG_LENGTH) - 1
+        config = (config & ~mask) | plan.dlpf_cfg
+        self.write_bytes(MPU6050_RA_SMPLRT_DIV,
+                         bytearray((plan.divider, config)))
+        if self.clock is not None:
+            self.clock.nominal = plan.rate
+            self.clock.reset()
+        return plan
+
+    def set_power_profile(self, name):
+        """
+        Switch to a MPU6050_POWER_PROFILES profile.
+
+        PWR_MGMT_1 and PWR_MGMT_2 are adjacent, both are written in one
+        2-byte transaction instead of a read-modify-write per bit. The
+        profile's clock source replaces the one set by `initialize`.
+        Return the typical supply current in uA.
+        """
+        pwr_mgmt_1, pwr_mgmt_2, current = MPU6050_POWER_PROFILES[name]
+        self.write_bytes(MPU6050_RA_PWR_MGMT_1,
+                         bytearray((pwr_mgmt_1, pwr_mgmt_2)))
+        return current
+
+    def get_power_profile(self):
+        """Get the name of the profile set in PWR_MGMT_1/2, None if none."""
+        pwr = self.read_bytes(MPU6050_RA_PWR_MGMT_1, 2)
+        for name, profile in MPU6050_POWER_PROFILES.items():
+            if pwr[0] == profile[0] and pwr[1] == profile[1]:
+                return name
+        return None
+
+    def set_sensor_config(self, rate, gyro_fs, accel_fs, bandwidth=None,
+                          dlpf_cfg=None):
+        """
+        Set sample rate, DLPF and both full scales in one transaction.
+
+        SMPLRT_DIV, CONFIG, GYRO_CONFIG and ACCEL_CONFIG are written as one
+        4-byte burst, keeping EXT_SYNC_SET and clearing the self-test bits.
+        Return the RatePlan applied.
+        """
+        plan = self.plan_output_rate(rate, bandwidth, dlpf_cfg)
+        ext_sync = self.get_field('external_frame_sync', cached=True)
+        self.write_bytes(MPU6050_RA_SMPLRT_DIV, bytearray((
+            plan.divider,
+            ext_sync << (MPU6050_CFG_EXT_SYNC_SET_BIT
+                         - MPU6050_CFG_EXT_SYNC_SET_LENGTH + 1)
+            | plan.dlpf_cfg,
+            gyro_fs << (MPU6050_GCONFIG_FS_SEL_BIT
+                        - MPU6050_GCONFIG_FS_SEL_LENGTH + 1),
+            accel_fs << (MPU6050_ACONFIG_AFS_SEL_BIT
+                         - MPU6050_ACONFIG_AFS_SEL_LENGTH + 1))))
+        if self.clock is not None:
+            self.clock.nominal = plan.rate
+            self.clock.reset()
+        return plan
+
+    def start_polling(self):
+        """Enable the Data Ready interrupt flag used by `poll`."""
+        self.stale_samples = 0
+        self.start_clock()
+        return self.set_data_ready_interrupt_enabled(True)
+
+    def poll(self):
+        """
+        Read INT_STATUS and all sensor data in a single 15-byte burst.
+
+        INT_STATUS (Register 58) sits right before ACCEL_XOUT_H, one read
+        returns the flags and the payload and clears the flags.
+        Return (ax, ay, az, temp, gx, gy, gz) when DATA_RDY_INT is set, or
+        None for a stale sample. The status byte is kept in `self.status`
+        for the FIFO overflow and I2C master flags.
+        """
+        buf = self.poll_buf
+        self.transfer(MPU6050_RA_INT_STATUS, buf)
+        self.status = buf[0]
+        if not buf[0] & (1 << MPU6050_INTERRUPT_DATA_RDY_BIT):
+            self.stale_samples += 1
+            return None
+        if self.clock is not None:
+            self.clock.tick()
+        return unpack_from('>7h', buf, 1)
+
+    def tune_link(self, freqs=MPU6050_I2C_FREQS, trials=50):
+        """
+        Step the I2C clock up and settle on the fastest reliable frequency.
+
+        Each frequency runs `trials` WHO_AM_I reads and 14-byte burst reads
+        of the static registers from SELF_TEST_X (Register 13), compared
+        with a reference taken at the first frequency. Stepping stops at the
+        first frequency with errors. Transfers are not retried here.
+
+        Return LinkReport(freq, steps), each step being
+        LinkStep(freq, errors, trials, burst_us). If even the first
+        frequency fails, the bus is reopened at the previous one and
+        MPUException raised.
+        """
+        if self.pins is None:
+            raise MPUException('bus pins unknown, pass sda and scl')
+        if I2C is None:
+            raise MPUException('tuning needs machine.I2C to reopen the bus')
+        previous = self.freq
+        reference = None
+        buf = bytearray(14)
+        steps = []
+        best = None
+        for freq in freqs:
+            self.freq = freq
+            self.i2c = self.open_bus()
+            errors = 0
+            elapsed = 0
+            for _ in range(trials):
+                try:
+                    start = ticks_us()
+                    self.i2c.readfrom_mem_into(self.address,
+                                               MPU6050_RA_SELF_TEST_X, buf)
+                    elapsed += ticks_diff(ticks_us(), start)
+                    if reference is None:
+                        reference = bytes(buf)
+                    elif buf != reference:
+                        errors += 1
+                    self.i2c.readfrom_mem_into(self.address,
+                                               MPU6050_RA_WHO_AM_I, self.buf)
+                    if (self.buf[0] >> 1) & 0x3F != 0x34:
+                        errors += 1
+                except OSError:
+                    errors += 1
+            steps.append(LinkStep(freq, errors, trials, elapsed / trials))
+            if errors:
+                break
+            best = freq
+        if best is None:
+            self.freq = previous
+            self.i2c = self.open_bus()
+            raise MPUException('no reliable I2C frequency')
+        self.freq = best
+        self.i2c = self.open_bus()
+        return LinkReport(best, steps)
+
+    def factory_trim(self):
+        """
+        Get factory trim values from SELF_TEST_X/Y/Z/A (Registers 13 to 16).
+
+        Return (ax, ay, az, gx, gy, gz) in LSB at +/- 8g and +/- 250 deg/s:
+          FT_A = 4096 * 0.34 * (0.92 / 0.34)^((A_TEST - 1) / 30)
+          FT_G = 25 * 131 * 1.046^(G_TEST - 1), negated for Y
+        A zero test value means a zero trim.
+        """
+        regs = self.read_bytes(MPU6050_RA_SELF_TEST_X, 4)
+        a_shift = MPU6050_TEST_A_BIT - MPU6050_TEST_A_LENGTH + 1
+        a_mask = (1 << MPU6050_TEST_A_LENGTH) - 1
+        low_mask = (1 << MPU6050_TEST_A_LOW_LENGTH) - 1
+        g_shift = MPU6050_TEST_G_BIT - MPU6050_TEST_G_LENGTH + 1
+        g_mask = (1 << MPU6050_TEST_G_LENGTH) - 1
+        accel = []
+        gyro = []
+        for axis in range(3):
+            low_shift = (MPU6050_TEST_A_LOW_BIT - MPU6050_TEST_A_LOW_LENGTH
+                         + 1 - axis * MPU6050_TEST_A_LOW_LENGTH)
+            a_test = (((regs[axis] >> a_shift) & a_mask)
+                      << MPU6050_TEST_A_LOW_LENGTH
+                      | (regs[3] >> low_shift) & low_mask)
+            g_test = (regs[axis] >> g_shift) & g_mask
+            accel.append(4096 * 0.34 * pow(0.92 / 0.34, (a_test - 1) / 30)
+                         if a_test else 0)
+            trim = 25 * 131 * pow(1.046, g_test - 1) if g_test else 0
+            gyro.append(-trim if axis == 1 else trim)
+        return tuple(accel + gyro)
+
+    def fifo_average(self, frames):
+        """Average `frames` accel and gyro FIFO frames taken from now on."""
+        self.fifo_resync()
+        count = 0
+        waited = 0
+        while count < frames:
+            if waited > 4 * frames:
+                raise MPUException('FIFO not filling')
+            sleep_ms(frames - count)
+            waited += frames - count
+            count = self.fifo_count() // 12
+        values = decode_block(self.get_fifo_data(frames * 12))
+        return [sum(values[axis::6]) / frames for axis in range(6)]
+
+    def self_test(self, frames=40):
+        """
+        Run the accelerometer and gyroscope self-test.
+
+        Sensors are set to +/- 8g and +/- 250 deg/s at 1kHz with a single
+        write of the four config registers, outputs are averaged over
+        `frames` FIFO frames with and without all self-test bits, and the
+        response is compared with the factory trim. An axis passes when the
+        change from factory trim is within +/- 14%.
+        The previous configuration and FIFO setup are restored, the whole
+        test takes about 150ms.
+
+        Return SelfTest(passed, deviation, response, trim), each a tuple
+        (ax, ay, az, gx, gy, gz).
+        """
+        config = self.read_bytes(MPU6050_RA_SMPLRT_DIV, 4)
+        fifo_en = self.read_byte(MPU6050_RA_FIFO_EN)[0]
+        fifo_enabled = self.get_fifo_enabled()
+        ext_sync = config[1] & ~((1 << MPU6050_CFG_DLPF_CFG_LENGTH) - 1)
+        test = bytearray((0, ext_sync | MPU6050_DLPF_BW_188,
+                          MPU6050_GYRO_FS_250 << 3, MPU6050_ACCEL_FS_8 << 3))
+        try:
+            self.write_byte(MPU6050_RA_FIFO_EN, 0x78)  # accel, XG, YG, ZG
+            self.write_bytes(MPU6050_RA_SMPLRT_DIV, test)
+            sleep_ms(20)
+            normal = self.fifo_average(frames)
+            test[2] |= 0xE0  # XG_ST, YG_ST, ZG_ST
+            test[3] |= 0xE0  # XA_ST, YA_ST, ZA_ST
+            self.write_bytes(MPU6050_RA_SMPLRT_DIV, test)
+            sleep_ms(20)
+            tested = self.fifo_average(frames)
+        finally:
+            self.set_fifo_enabled(False)
+            self.fifo_reset()
+            self.write_bytes(MPU6050_RA_SMPLRT_DIV, config)
+            self.write_byte(MPU6050_RA_FIFO_EN, fifo_en)
+            self.set_fifo_enabled(fifo_enabled)
+        trim = self.factory_trim()
+        response = tuple(t - n for t, n in zip(tested, normal))
+        deviation = tuple((r - ft) / ft if ft else None
+                          for r, ft in zip(response, trim))
+        passed = tuple(d is not None and abs(d) <= MPU6050_SELF_TEST_TOLERANCE
+                       for d in deviation)
+        return SelfTest(passed, deviation, response, trim)
+
+    def read_config(self):
+        """
+        Read every read-write register field in four burst reads.
+
+        Return an immutable Config record with one attribute per field of
+        MPU6050_CONFIG_FIELDS, e.g. `config.dlpf_mode`.
+        """
+        registers = {}
+        for start, length in MPU6050_CONFIG_BLOCKS:
+            data = self.read_bytes(start, length)
+            for i in range(length):
+                registers[start + i] = data[i]
+        return Config(*[field_value(name,
+                                    registers[MPU6050_FIELDS[name][0]])
+                        for name in MPU6050_CONFIG_FIELDS])
+
+
+def _field_getter(name):
+    def getter(self):
+        return self.get_field(name)
+    return getter
+
+
+def _field_setter(name):
+    arg = MPU6050_FIELD_ARGS.get(name, 'enabled')
+
+    def setter(self, *args, **kwargs):
+        if len(args) + len(kwargs) != 1 or kwargs and arg not in kwargs:
+            raise TypeError('set_%s() takes one argument, %s' % (name, arg))
+        return self.set_fields({name: args[0] if args else kwargs[arg]})
+    return setter
+
+
+# get_<field>() and set_<field>(<MPU6050_FIELD_ARGS name>) aliases.
+for _name, _field in MPU6050_FIELDS.items():
+    setattr(MPU6050, 'get_' + _name, _field_getter(_name))
+    if _field[3] == MPU6050_RW:
+        setattr(MPU6050, 'set_' + _name, _field_setter(_name))
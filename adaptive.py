@@ -0,0 +1,133 @@
+"""
+Activity-driven sample rate, bandwidth and full-scale selection.
+
+The controller watches the accelerometer variance of the FIFO stream and
+steps between profiles, from a slow idle one to a fast active one. It
+also auto-ranges the accelerometer full scale. Settings change in one
+4-register write, and a Marker record goes into the stream in front of
+the first batch taken with the new settings.
+
+    controller = AdaptiveController(mpu).start()
+    while True:
+        for record in controller.read():
+            store(record)  # FifoBatch, FifoGap or Marker
+"""
+from collections import namedtuple
+from IMU import (FifoGap, Marker, MPU6050_ACCEL_FS_2, MPU6050_ACCEL_FS_16,
+                 MPU6050_ACCEL_SENSITIVITY, MPU6050_DLPF_BW_10,
+                 MPU6050_DLPF_BW_42, MPU6050_DLPF_BW_188,
+                 MPU6050_GYRO_FS_250, MPU6050_GYRO_FS_500,
+                 MPU6050_GYRO_FS_2000, decode_block)
+from stats import WindowStats
+
+# `up`: activity above which the next profile is used, `down`: below which
+# the previous one is. Activity is the summed accel axis variance in g^2.
+Profile = namedtuple('Profile', ('name', 'rate', 'dlpf_cfg', 'gyro_fs',
+                                 'up', 'down'))
+
+PROFILES = (
+    Profile('idle', 25, MPU6050_DLPF_BW_10, MPU6050_GYRO_FS_250,
+            0.0004, None),
+    Profile('normal', 200, MPU6050_DLPF_BW_42, MPU6050_GYRO_FS_500,
+            0.01, 0.0002),
+    Profile('active', 1000, MPU6050_DLPF_BW_188, MPU6050_GYRO_FS_2000,
+            None, 0.005),
+)
+
+
+class AdaptiveController():
+    """
+    Switch PROFILES with hysteresis and auto-range the accelerometer.
+
+    Activity is evaluated every `window_s / steps` seconds over the last
+    `window_s`. A profile or range is kept at least `hold` evaluations.
+    The full scale steps up once a peak passes `clip` of the int16 range
+    and down once peaks would stay below `headroom` of the range at the
+    finer scale. FIFO frames are `frame_width` int16 values, starting with
+    the accelerometer.
+    """
+
+    def __init__(self, mpu, profiles=PROFILES, window_s=1.0, steps=4,
+                 hold=4, clip=0.9, headroom=0.7, frame_width=6):
+        """Init AdaptiveController."""
+        self.mpu = mpu
+        self.profiles = profiles
+        self.window_s = window_s
+        self.steps = steps
+        self.hold = hold
+        self.clip = clip * 32767
+        self.headroom = headroom * 32767
+        self.frame_width = frame_width
+        self.level = 0
+        self.accel_fs = MPU6050_ACCEL_FS_2
+        self.stats = None
+        self.dwell = 0
+        self.plan = None
+        self.pending = None
+
+    def start(self, level=0, accel_fs=MPU6050_ACCEL_FS_2):
+        """Apply profile `level` and the accelerometer full scale."""
+        self.level = level
+        self.accel_fs = accel_fs
+        self.apply()
+        return self
+
+    def apply(self):
+        """Write the current profile and range, restart the stream."""
+        profile = self.profiles[self.level]
+        mpu = self.mpu
+        self.plan = mpu.set_sensor_config(profile.rate, profile.gyro_fs,
+                                          self.accel_fs,
+                                          dlpf_cfg=profile.dlpf_cfg)
+        # Frames already in the FIFO were taken with the old settings.
+        mpu.fifo_resync()
+        mpu.start_clock()
+        step = max(1, int(self.plan.rate * self.window_s / self.steps))
+        self.stats = WindowStats(3, step * self.steps, step)
+        self.dwell = 0
+        self.pending = Marker(mpu.clock.stamp(0), 0, b'', 'profile',
+                              (profile.name, self.plan.rate,
+                               profile.dlpf_cfg, profile.gyro_fs,
+                               self.accel_fs))
+
+    def read(self):
+        """Drain the FIFO, return the records to store in order."""
+        records = []
+        if self.pending is not None:
+            records.append(self.pending)
+            self.pending = None
+        batch = self.mpu.read_fifo(2 * self.frame_width)
+        records.append(batch)
+        if not isinstance(batch, FifoGap) and batch.count:
+            self.feed(decode_block(batch.data))
+        return records
+
+    def feed(self, values):
+        """Update activity with decoded frames, switch settings if due."""
+        for summary in self.stats.add_block(values, self.frame_width):
+            self.dwell += 1
+            if self.dwell >= self.hold and self.decide(summary):
+                self.apply()
+                return
+
+    def decide(self, summary):
+        """Pick the profile and range for a Summary, True on a change."""
+        peak = max(max(summary.max), -min(summary.min))
+        accel_fs = self.accel_fs
+        if peak > self.clip and accel_fs < MPU6050_ACCEL_FS_16:
+            accel_fs += 1
+        elif peak * 2 < self.headroom and accel_fs > MPU6050_ACCEL_FS_2:
+            accel_fs -= 1
+        sensitivity = MPU6050_ACCEL_SENSITIVITY[self.accel_fs]
+        activity = sum(summary.variance) / (sensitivity * sensitivity)
+        profile = self.profiles[self.level]
+        level = self.level
+        if profile.up is not None and activity > profile.up:
+            level += 1
+        elif profile.down is not None and activity < profile.down:
+            level -= 1
+        if level == self.level and accel_fs == self.accel_fs:
+            return False
+        self.level = level
+        self.accel_fs = accel_fs
+        return True
@@ -0,0 +1,128 @@
+"""
+Benchmarks for the MPU6050 driver helpers.
+
+Run on the board with `import bench; bench.run()`, or on CPython.
+No sensor is needed, every benchmark works on synthetic data.
+"""
+import gc
+import sys
+from IMU import MPU6050, decode_block
+try:
+    from utime import ticks_diff, ticks_us
+except ImportError:
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+
+def timeit(func, repeat):
+    """Get mean time per call in us."""
+    start = ticks_us()
+    for _ in range(repeat):
+        func()
+    return ticks_diff(ticks_us(), start) / repeat
+
+
+def bench_decode(frames=85, repeat=100):
+    """Decode a full FIFO of 12-byte frames, bytes_toint vs decode_block."""
+    buf = bytearray((i * 37) & 0xFF for i in range(frames * 12))
+    bytes_toint = MPU6050.bytes_toint
+
+    def per_value():
+        return [bytes_toint(None, buf[i], buf[i + 1])
+                for i in range(0, len(buf), 2)]
+
+    def bulk():
+        return decode_block(buf)
+
+    assert list(bulk()) == per_value()
+    t_value = timeit(per_value, repeat)
+    t_bulk = timeit(bulk, repeat)
+    print('decode %d frames: bytes_toint %.1f us, decode_block %.1f us '
+          '(x%.1f)' % (frames, t_value, t_bulk, t_value / t_bulk))
+
+
+def bench_import():
+    """Import IMU afresh, heap is reported on MicroPython only."""
+    del sys.modules['IMU']
+    gc.collect()
+    free = gc.mem_free() if hasattr(gc, 'mem_free') else None
+    start = ticks_us()
+    import IMU  # noqa: F401
+    elapsed = ticks_diff(ticks_us(), start)
+    gc.collect()
+    if free is None:
+        print('import IMU: %d us' % elapsed)
+    else:
+        print('import IMU: %d us, %d bytes heap'
+              % (elapsed, free - gc.mem_free()))
+
+
+def bench_orientation(samples=1000000, reference=100000):
+    """Complementary filter, vectorised vs the scalar reference, host only."""
+    try:
+        import numpy as np
+        import orientation
+    except ImportError:
+        return
+    accel = np.tile((0.1, -0.2, 0.97), (samples, 1))
+    accel += np.sin(np.arange(samples) / 500)[:, None] * 0.05
+    gyro = np.tile((1.5, -0.5, 0.2), (samples, 1))
+    out = []
+
+    def vectorised():
+        out.append(orientation.ComplementaryFilter(1000).run(accel, gyro))
+
+    def scalar():
+        out.append(orientation.complementary_reference(
+            accel[:reference].tolist(), gyro[:reference].tolist(), 1000))
+
+    t_vector = timeit(vectorised, 1)
+    t_scalar = timeit(scalar, 1)
+    error = abs(out[0][:reference] - np.array(out[1])).max()
+    print('orientation: vectorised %.2f M samples/s, scalar %.2f M samples/s '
+          '(x%.0f, max error %.1e deg)'
+          % (samples / t_vector, reference / t_scalar,
+             (samples / t_vector) / (reference / t_scalar), error))
+
+
+def bench_codec(frames=85, repeat=20):
+    """Delta/varint encode a FIFO of a still sensor, host decode if NumPy."""
+    from array import array
+    from codec import Encoder, decode
+    # Still sensor at +/-2g, 250deg/s: gravity on Z and a few LSB of noise.
+    values = array('h', [0] * (frames * 6))
+    seed = 1
+    for i in range(len(values)):
+        seed = (seed * 1103515245 + 12345) & 0x7FFFFFFF
+        values[i] = (16384 if i % 6 == 2 else 0) + (seed >> 16) % 33 - 16
+    encoder = Encoder(6, frames)
+    size = encoder.encode(values)
+    t_encode = timeit(lambda: encoder.encode(values), repeat)
+    print('codec %d frames: %d -> %d bytes (x%.2f), encode %.1f us/frame'
+          % (frames, frames * 12, size, frames * 12 / size,
+             t_encode / frames))
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    stream = bytes(encoder.out[:size]) * 1000
+    assert (decode(stream)[:frames].ravel() == np.array(values)).all()
+    t_decode = timeit(lambda: decode(stream), 3)
+    print('codec decode: %.2f M frames/s' % (frames * 1000 / t_decode))
+
+
+def run():
+    """Run all benchmarks."""
+    bench_decode()
+    bench_import()
+    bench_orientation()
+    bench_codec()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,164 @@
+"""
+Accelerometer ellipsoid calibration.
+
+On the board, average the FIFO in a dozen or more still orientations:
+
+    poses = []
+    ...  # turn the sensor, then
+    poses.append(collect(mpu))
+
+On the host, fit and save the calibration for convert.py and the board:
+
+    calibration = fit(poses, accel_fs=0, gyro_fs=0)
+    save('cal.json', 'imu07', calibration)
+
+Back on the board, correct whole decoded buffers in place:
+
+    correction = AccelCorrection.load('cal.json', 'imu07')
+    values = decode_block(mpu.read_fifo().data)
+    correction.apply(values, width=6)
+
+The fit maps the measured ellipsoid of gravity readings onto the unit
+sphere: corrected = accel_matrix . (accel - accel_offset), in g. The board
+applies the same correction as a fixed-point 3x3 matrix on raw LSB, with
+`shift` fractional bits. Products stay within MicroPython small ints.
+"""
+import json
+from IMU import (FifoGap, MPUException, MPU6050_ACCEL_FIFO_EN_BIT,
+                 MPU6050_ACCEL_SENSITIVITY, MPU6050_GYRO_SENSITIVITY,
+                 MPU6050_RA_FIFO_EN, decode_block, sleep_ms)
+
+# Fractional bits of the fixed-point matrix: 3 * 32767 * 1.1 * 2^12 < 2^30
+MPU6050_CAL_SHIFT = 12
+# FIFO_EN: XG, YG and ZG
+MPU6050_GYRO_FIFO_EN = 0x70
+
+
+def collect(mpu, frames=100, idle_ms=10):
+    """
+    Average `frames` FIFO frames of the still sensor.
+
+    The FIFO must hold the accelerometer, the gyroscope is averaged too
+    when its three axes are in. Return (accel, gyro) raw means, gyro None.
+    """
+    fifo_en = mpu.read_byte(MPU6050_RA_FIFO_EN)[0]
+    if not fifo_en & (1 << MPU6050_ACCEL_FIFO_EN_BIT):
+        raise MPUException('accelerometer not in the FIFO')
+    gyro = fifo_en & MPU6050_GYRO_FIFO_EN == MPU6050_GYRO_FIFO_EN
+    frame_size = mpu.fifo_frame_size()
+    width = frame_size // 2
+    sums = [0] * 6
+    count = 0
+    mpu.fifo_resync()
+    while count < frames:
+        sleep_ms(idle_ms)
+        batch = mpu.read_fifo(frame_size)
+        if isinstance(batch, FifoGap):
+            continue
+        values = decode_block(batch.data)
+        for start in range(0, min(batch.count, frames - count) * width,
+                           width):
+            for axis in range(3):
+                sums[axis] += values[start + axis]
+                # Gyroscope values end the frame.
+                sums[3 + axis] += values[start + width - 3 + axis]
+            count += 1
+    accel = tuple(total / frames for total in sums[:3])
+    return accel, tuple(total / frames for total in sums[3:]) if gyro else None
+
+
+def fit(poses, accel_fs=0, gyro_fs=0):
+    """
+    Fit the calibration of `collect` results taken with AFS_SEL `accel_fs`.
+
+    Solves the quadric x'Ax + 2b'x = 1 through the mean readings by least
+    squares, at least 9 well spread poses are needed. Return the
+    calibration dict saved by `save`.
+    """
+    import numpy as np
+    accel = np.array([pose[0] for pose in poses], float)
+    if len(accel) < 9:
+        raise ValueError('at least 9 poses are needed, got %d' % len(accel))
+    x, y, z = accel.T
+    design = np.column_stack((x * x, y * y, z * z, 2 * x * y, 2 * x * z,
+                              2 * y * z, 2 * x, 2 * y, 2 * z))
+    p = np.linalg.lstsq(design, np.ones(len(accel)), rcond=None)[0]
+    quadric = np.array(((p[0], p[3], p[4]),
+                        (p[3], p[1], p[5]),
+                        (p[4], p[5], p[2])))
+    center = -np.linalg.solve(quadric, p[6:])
+    quadric /= 1 + center @ quadric @ center
+    values, vectors = np.linalg.eigh(quadric)
+    if values.min() <= 0:
+        raise ValueError('poses do not fit an ellipsoid')
+    # Symmetric square root, LSB to g.
+    matrix = vectors @ np.diag(np.sqrt(values)) @ vectors.T
+    sensitivity = MPU6050_ACCEL_SENSITIVITY[accel_fs]
+    gyros = [pose[1] for pose in poses if pose[1] is not None]
+    gyro_offset = np.mean(gyros, axis=0) / MPU6050_GYRO_SENSITIVITY[gyro_fs] \
+        if gyros else np.zeros(3)
+    return {'accel_offset': (center / sensitivity).tolist(),
+            'accel_matrix': (matrix * sensitivity).tolist(),
+            'gyro_offset': gyro_offset.tolist(),
+            'accel_fixed': to_fixed(center, matrix * sensitivity, accel_fs)}
+
+
+def to_fixed(center, matrix, accel_fs, shift=MPU6050_CAL_SHIFT):
+    """Get the on-board form: raw LSB offset and fixed-point matrix."""
+    return {'accel_fs': accel_fs,
+            'shift': shift,
+            'offset': [int(round(c)) for c in center],
+            'matrix': [int(round(m * (1 << shift)))
+                       for row in matrix for m in row]}
+
+
+def save(path, sensor, calibration):
+    """Store the calibration of `sensor` in the calibration file at `path`."""
+    try:
+        with open(path) as f:
+            calibrations = json.load(f)
+    except OSError:
+        calibrations = {}
+    calibrations[sensor] = calibration
+    with open(path, 'w') as f:
+        json.dump(calibrations, f)
+
+
+class AccelCorrection():
+    """Fixed-point accelerometer correction on raw int16 values."""
+
+    def __init__(self, fixed):
+        """Init AccelCorrection from the `accel_fixed` calibration entry."""
+        self.accel_fs = fixed['accel_fs']
+        self.shift = fixed['shift']
+        self.offset = tuple(fixed['offset'])
+        self.matrix = tuple(fixed['matrix'])
+
+    @classmethod
+    def load(cls, path, sensor):
+        """Load the correction of `sensor` from a calibration file."""
+        with open(path) as f:
+            return cls(json.load(f)[sensor]['accel_fixed'])
+
+    def apply(self, values, width=3, offset=0):
+        """
+        Correct (ax, ay, az) in place in every `width` values frame.
+
+        `values` is an array('h') such as decode_block returns, `offset`
+        the index of ax in a frame. Results saturate to int16.
+        """
+        m0, m1, m2, m3, m4, m5, m6, m7, m8 = self.matrix
+        ox, oy, oz = self.offset
+        shift = self.shift
+        half = 1 << (shift - 1)
+        for i in range(offset, len(values) - 2, width):
+            x = values[i] - ox
+            y = values[i + 1] - oy
+            z = values[i + 2] - oz
+            cx = (m0 * x + m1 * y + m2 * z + half) >> shift
+            cy = (m3 * x + m4 * y + m5 * z + half) >> shift
+            cz = (m6 * x + m7 * y + m8 * z + half) >> shift
+            values[i] = max(-32768, min(32767, cx))
+            values[i + 1] = max(-32768, min(32767, cy))
+            values[i + 2] = max(-32768, min(32767, cz))
+        return values
@@ -0,0 +1,180 @@
+"""
+Delta, zigzag and varint coding of int16 sample streams.
+
+Consecutive samples differ little, so each block stores its first frame
+as is (a keyframe) and then per-axis differences. Every value is zigzag
+mapped to an unsigned int and written as a little-endian base-128 varint:
+values within +/-63 take one byte. Blocks decode on their own.
+
+Block layout:
+    width    : 1 byte, int16 values per frame
+    count    : varint, frames
+    length   : 3-byte varint, payload bytes
+    payload  : count * width varints, keyframe then deltas
+
+On the board, with a preallocated output buffer:
+
+    encoder = Encoder(width=6, frames=85)
+    size = encoder.encode(decode_block(batch.data))
+    log.write(encoder.view[:size])
+
+On the host, `decode` turns a whole capture into an (N, width) array with
+vectorised NumPy.
+"""
+
+# Header: width byte, count varint (up to 3 bytes), length varint
+MPU6050_CODEC_HEADER = 7
+# Zigzag int17 delta: at most 3 varint bytes
+MPU6050_CODEC_VALUE_MAX = 3
+
+
+class Encoder():
+    """Block encoder writing into one preallocated buffer."""
+
+    def __init__(self, width=6, frames=85):
+        """Init Encoder for blocks of up to `frames` frames of `width`."""
+        self.width = width
+        self.frames = frames
+        self.out = bytearray(MPU6050_CODEC_HEADER
+                             + frames * width * MPU6050_CODEC_VALUE_MAX)
+        self.view = memoryview(self.out)
+        self.prev = [0] * width
+
+    def encode(self, values, count=None, offset=0):
+        """
+        Encode `count` frames of `values` from index `offset` as one block.
+
+        `values` is int16 storage such as decode_block returns, all whole
+        frames by default. Return the block size in bytes of `self.out`.
+        """
+        width = self.width
+        if count is None:
+            count = (len(values) - offset) // width
+        if count > self.frames:
+            raise ValueError('%d frames, encoder sized for %d'
+                             % (count, self.frames))
+        out = self.out
+        out[0] = width
+        pos = 1
+        z = count
+        while z > 0x7F:
+            out[pos] = z & 0x7F | 0x80
+            z >>= 7
+            pos += 1
+        out[pos] = z
+        pos += 1
+        length_pos = pos
+        pos += 3
+        start = pos
+        prev = self.prev
+        i = offset
+        end = offset + count * width
+        axis = 0
+        key = True
+        while i < end:
+            value = values[i]
+            delta = value if key else value - prev[axis]
+            prev[axis] = value
+            z = delta << 1 if delta >= 0 else (-delta << 1) - 1
+            while z > 0x7F:
+                out[pos] = z & 0x7F | 0x80
+                z >>= 7
+                pos += 1
+            out[pos] = z
+            pos += 1
+            i += 1
+            axis += 1
+            if axis == width:
+                axis = 0
+                key = False
+        length = pos - start
+        out[length_pos] = length & 0x7F | 0x80
+        out[length_pos + 1] = (length >> 7) & 0x7F | 0x80
+        out[length_pos + 2] = (length >> 14) & 0x7F
+        return pos
+
+
+def read_varint(data, pos):
+    """Read one varint at `pos`, return (value, next position)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def decode_varints(data):
+    """Decode a run of varints to an int64 array, vectorised."""
+    import numpy as np
+    data = np.frombuffer(data, np.uint8)
+    if not len(data):
+        return np.zeros(0, np.int64)
+    last = (data & 0x80) == 0
+    starts = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    value_index = np.cumsum(np.concatenate(([0], last[:-1])))
+    within = np.arange(len(data)) - starts[value_index]
+    parts = (data & 0x7F).astype(np.int64) << (7 * within)
+    return np.add.reduceat(parts, starts)
+
+
+def decode_blocks(data):
+    """
+    Decode every block of an encoded stream.
+
+    Return a list of (count, width) int16 arrays, one per block.
+    """
+    import numpy as np
+    blocks = []
+    pos = 0
+    while pos < len(data):
+        width = data[pos]
+        count, pos = read_varint(data, pos + 1)
+        length, pos = read_varint(data, pos)
+        z = decode_varints(data[pos:pos + length])
+        pos += length
+        deltas = (z >> 1) ^ -(z & 1)
+        blocks.append(np.cumsum(deltas.reshape(count, width), axis=0)
+                      .astype(np.int16))
+    return blocks
+
+
+def decode(data):
+    """
+    Decode an encoded stream of same-width blocks to one array.
+
+    Headers are valid varints too, so the whole stream is decoded in one
+    vectorised pass, then split. Blocks restart from their keyframe by
+    subtracting the running sum at each block start.
+    """
+    import numpy as np
+    values = decode_varints(data)
+    payloads = []
+    widths = set()
+    i = 0
+    while i < len(values):
+        width, count = int(values[i]), int(values[i + 1])
+        # Empty blocks, from empty FIFO reads, hold no values.
+        if count:
+            widths.add(width)
+            payloads.append((i + 3, i + 3 + count * width, count))
+        i += 3 + count * width
+    if not payloads:
+        return np.zeros((0, 0), np.int16)
+    if len(widths) > 1:
+        raise ValueError('blocks of different widths, use decode_blocks')
+    width = widths.pop()
+    keep = np.zeros(len(values), bool)
+    for start, end, _ in payloads:
+        keep[start:end] = True
+    z = values[keep]
+    sums = np.cumsum(((z >> 1) ^ -(z & 1)).reshape(-1, width), axis=0)
+    counts = np.array([count for _, _, count in payloads])
+    firsts = np.cumsum(counts) - counts
+    base = np.zeros((len(counts), width), np.int64)
+    base[1:] = sums[firsts[1:] - 1]
+    sums -= np.repeat(base, counts, axis=0)
+    return sums.astype(np.int16)
@@ -0,0 +1,236 @@
+"""
+Batch conversion of recorded MPU6050 captures to columnar files.
+
+A capture is a file of raw big-endian int16 frames, as read from the data
+registers or the FIFO. Each capture is decoded with the driver's scaling
+rules, calibrated per sensor and written as one compressed .npz, or
+.parquet when pyarrow is installed. Captures are spread over a process
+pool and streamed in chunks, so memory stays bounded per worker.
+
+    python convert.py captures/*.bin -o out --calibration cal.json -j 8
+
+The calibration file maps sensor ids to the fields below. A capture's
+sensor id is its file name up to the first '_' (imu07_0142.bin is imu07).
+
+    {"imu07": {"accel_offset": [0.01, -0.02, 0.03],        # g
+               "accel_matrix": [[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+               "gyro_offset": [-1.2, 0.4, 0.1]}}           # deg/s
+
+Calibrated accel = accel_matrix . (accel - accel_offset), calibrated
+gyro = gyro - gyro_offset.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from multiprocessing import Pool
+
+import numpy as np
+from IMU import (MPU6050_ACCEL_SENSITIVITY, MPU6050_GYRO_SENSITIVITY,
+                 MPU6050_TEMP_OFFSET, MPU6050_TEMP_SENSITIVITY)
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = pq = None
+
+# Frame layouts, column names in frame order.
+LAYOUTS = {
+    # 14 bytes burst read from ACCEL_XOUT_H
+    'registers': ('ax', 'ay', 'az', 'temp', 'gx', 'gy', 'gz'),
+    # accelerometer and gyroscope FIFO frames
+    'fifo': ('ax', 'ay', 'az', 'gx', 'gy', 'gz'),
+    # accelerometer, temperature and gyroscope FIFO frames
+    'fifo_temp': ('ax', 'ay', 'az', 'temp', 'gx', 'gy', 'gz'),
+}
+IDENTITY = {'accel_offset': (0, 0, 0),
+            'accel_matrix': ((1, 0, 0), (0, 1, 0), (0, 0, 1)),
+            'gyro_offset': (0, 0, 0)}
+
+
+def sensor_id(path):
+    """Get the sensor id of a capture file."""
+    return os.path.basename(path).split('_')[0].split('.')[0]
+
+
+def load_calibration(path):
+    """Load a calibration file, {sensor id: calibration}."""
+    with open(path) as f:
+        return json.load(f)
+
+
+class Converter():
+    """
+    Decode, scale and calibrate raw int16 frames of one capture.
+
+    `accel_fs` and `gyro_fs` are the AFS_SEL and FS_SEL the capture was
+    recorded with, `calibration` one entry of the calibration file.
+    """
+
+    def __init__(self, layout='registers', accel_fs=0, gyro_fs=0,
+                 calibration=None):
+        """Init Converter."""
+        self.columns = LAYOUTS[layout]
+        self.width = len(self.columns)
+        self.frame_size = 2 * self.width
+        calibration = dict(IDENTITY, **(calibration or {}))
+        self.accel_offset = np.array(calibration['accel_offset'], 'f4')
+        self.accel_matrix = np.array(calibration['accel_matrix'], 'f4')
+        self.gyro_offset = np.array(calibration['gyro_offset'], 'f4')
+        self.accel_scale = 1 / MPU6050_ACCEL_SENSITIVITY[accel_fs]
+        self.gyro_scale = 1 / MPU6050_GYRO_SENSITIVITY[gyro_fs]
+        self.accel = [self.columns.index(c) for c in ('ax', 'ay', 'az')]
+        self.gyro = [self.columns.index(c) for c in ('gx', 'gy', 'gz')]
+        self.temp = self.columns.index('temp') if 'temp' in self.columns \
+            else None
+
+    def convert(self, data):
+        """Convert whole frames of `data` bytes, return {column: array}."""
+        frames = np.frombuffer(data, '>i2').reshape(-1, self.width)
+        accel = frames[:, self.accel] * np.float32(self.accel_scale)
+        accel = (accel - self.accel_offset) @ self.accel_matrix.T
+        gyro = frames[:, self.gyro] * np.float32(self.gyro_scale)
+        gyro -= self.gyro_offset
+        out = {}
+        for i, name in enumerate(('ax', 'ay', 'az')):
+            out[name] = accel[:, i]
+        for i, name in enumerate(('gx', 'gy', 'gz')):
+            out[name] = gyro[:, i]
+        if self.temp is not None:
+            out['temp'] = (frames[:, self.temp]
+                           * np.float32(1 / MPU6050_TEMP_SENSITIVITY)
+                           + np.float32(MPU6050_TEMP_OFFSET))
+        return out
+
+    def chunks(self, path, frames=1 << 16):
+        """Yield converted chunks of up to `frames` frames from `path`."""
+        buf = bytearray(frames * self.frame_size)
+        view = memoryview(buf)
+        with open(path, 'rb') as f:
+            while True:
+                size = f.readinto(buf)
+                whole = size - size % self.frame_size
+                if whole:
+                    yield self.convert(view[:whole])
+                if size < len(buf):
+                    return
+
+
+def write_npz(path, chunks, columns):
+    """
+    Stream chunks into one compressed .npz, return the frame count.
+
+    Every name in `columns` gets a float32 array, empty for a capture
+    without whole frames. Columns are spooled to temporary files, then copied one at a time
+    behind a .npy header into their zip member, so memory stays one chunk.
+    """
+    spools = {}
+    count = 0
+    try:
+        for name in columns:
+            spools[name] = tempfile.TemporaryFile()
+        for chunk in chunks:
+            for name, values in chunk.items():
+                spools[name].write(
+                    np.ascontiguousarray(values, '<f4').data)
+            count += len(chunk['ax'])
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, spool in spools.items():
+                spool.seek(0)
+                with archive.open(name + '.npy', 'w',
+                                  force_zip64=True) as member:
+                    np.lib.format.write_array_header_1_0(member, {
+                        'descr': '<f4',
+                        'fortran_order': False,
+                        'shape': (count,)})
+                    shutil.copyfileobj(spool, member, 1 << 20)
+    finally:
+        for spool in spools.values():
+            spool.close()
+    return count
+
+
+def write_parquet(path, chunks, columns):
+    """
+    Stream chunks into a .parquet file, return the frame count.
+
+    The float32 `columns` schema is written up front, so a capture without
+    whole frames still gives a valid, empty file.
+    """
+    schema = pyarrow.schema([(name, pyarrow.float32()) for name in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for chunk in chunks:
+            table = pyarrow.table(chunk, schema=schema)
+            writer.write_table(table)
+            count += table.num_rows
+    return count
+
+
+WRITERS = {'npz': write_npz, 'parquet': write_parquet}
+
+
+def convert_file(job):
+    """Convert one capture, return (capture, output, frame count)."""
+    path, out_dir, fmt, options, calibration, chunk_frames = job
+    converter = Converter(calibration=calibration, **options)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    output = os.path.join(out_dir, '%s.%s' % (stem, fmt))
+    count = WRITERS[fmt](output, converter.chunks(path, chunk_frames),
+                         converter.columns)
+    return path, output, count
+
+
+def convert_all(paths, out_dir, fmt='npz', calibrations=None, processes=None,
+                chunk_frames=1 << 16, **options):
+    """
+    Convert captures over a process pool.
+
+    Yield (capture, output, frame count) as each one completes.
+    """
+    if fmt == 'parquet' and pq is None:
+        raise ImportError('parquet output needs pyarrow')
+    calibrations = calibrations or {}
+    jobs = [(path, out_dir, fmt, options, calibrations.get(sensor_id(path)),
+             chunk_frames) for path in paths]
+    with Pool(processes) as pool:
+        for result in pool.imap_unordered(convert_file, jobs):
+            yield result
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('captures', nargs='+', help='raw capture files')
+    parser.add_argument('-o', '--out', default='.', help='output directory')
+    parser.add_argument('-f', '--format', choices=sorted(WRITERS),
+                        default='npz')
+    parser.add_argument('-l', '--layout', choices=sorted(LAYOUTS),
+                        default='registers')
+    parser.add_argument('--accel-fs', type=int, choices=range(4), default=0,
+                        help='AFS_SEL of the captures')
+    parser.add_argument('--gyro-fs', type=int, choices=range(4), default=0,
+                        help='FS_SEL of the captures')
+    parser.add_argument('-c', '--calibration', help='calibration json')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes')
+    parser.add_argument('--chunk', type=int, default=1 << 16,
+                        help='frames per chunk')
+    args = parser.parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    calibrations = load_calibration(args.calibration) \
+        if args.calibration else None
+    total = 0
+    for path, output, count in convert_all(
+            args.captures, args.out, args.format, calibrations, args.jobs,
+            args.chunk, layout=args.layout, accel_fs=args.accel_fs,
+            gyro_fs=args.gyro_fs):
+        total += count
+        print('%s -> %s (%d frames)' % (path, output, count))
+    print('%d captures, %d frames' % (len(args.captures), total))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
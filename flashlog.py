@@ -0,0 +1,250 @@
+"""
+Buffered, power-loss safe flash logging of MPU6050 streams.
+
+Records are packed into a RAM block and written to flash one whole,
+block-aligned block at a time. Files are synced every few blocks and
+rotated after a fixed number of blocks. Every block carries a sequence
+number and a CRC, so after a power loss the log reads back up to the last
+complete block. A restarted logger continues the sequence in a new file,
+or in the newest file if that holds no complete block yet.
+
+    logger = FlashLogger('/log/imu')
+    sampler = Sampler(mpu).start()
+    while True:
+        batch = sampler.get()
+        if batch:
+            logger.log(batch)  # FifoBatch, FifoGap or Marker
+            if not isinstance(batch, FifoGap):
+                sampler.release()
+
+Block layout, little-endian:
+    magic 'MPUL', seq u32, length u16, flags u16, crc32 u32
+    records, `length` bytes: kind u8, anchor u32, count u16, size u16,
+                              payload `size` bytes
+    padding to `block_size`
+
+A FifoBatch record holds the raw FIFO data, a FifoGap record the lost
+sample count (u32), and a Marker record kind, NUL, JSON value. Records
+never span blocks: `block_size` must hold the largest batch, 1024 bytes
+of FIFO plus 25 bytes of headers.
+"""
+import json
+import os
+from binascii import crc32
+from IMU import FifoBatch, FifoGap, Marker
+try:
+    from ustruct import pack_into, unpack_from
+except ImportError:
+    from struct import pack_into, unpack_from
+
+MPU6050_LOG_MAGIC = b'MPUL'
+MPU6050_LOG_HEADER = '<4sIHHI'
+MPU6050_LOG_HEADER_SIZE = 16
+MPU6050_LOG_RECORD = '<BIHH'
+MPU6050_LOG_RECORD_SIZE = 9
+MPU6050_LOG_BATCH = 1
+MPU6050_LOG_GAP = 2
+MPU6050_LOG_MARKER = 3
+
+
+def block_crc(block, length):
+    """Get the CRC32 of a block header and its `length` record bytes."""
+    view = memoryview(block)
+    crc = crc32(view[:12])
+    return crc32(view[MPU6050_LOG_HEADER_SIZE:
+                      MPU6050_LOG_HEADER_SIZE + length], crc) & 0xFFFFFFFF
+
+
+def read_blocks(path, block_size=4096):
+    """
+    Yield (seq, records) for every complete block of a log file.
+
+    Reading stops at the first torn, corrupt or out of sequence block,
+    which is where an interrupted write left the file.
+    """
+    block = bytearray(block_size)
+    expected = None
+    with open(path, 'rb') as f:
+        while f.readinto(block) == block_size:
+            magic, seq, length, _, crc = unpack_from(MPU6050_LOG_HEADER,
+                                                     block)
+            if (magic != MPU6050_LOG_MAGIC
+                    or length > block_size - MPU6050_LOG_HEADER_SIZE
+                    or crc != block_crc(block, length)
+                    or expected is not None and seq != expected):
+                return
+            expected = seq + 1
+            yield seq, bytes(block[MPU6050_LOG_HEADER_SIZE:
+                                   MPU6050_LOG_HEADER_SIZE + length])
+
+
+def read_records(path, block_size=4096):
+    """Yield the FifoBatch, FifoGap and Marker records of a log file."""
+    for _, records in read_blocks(path, block_size):
+        pos = 0
+        while pos < len(records):
+            kind, anchor, count, size = unpack_from(MPU6050_LOG_RECORD,
+                                                    records, pos)
+            pos += MPU6050_LOG_RECORD_SIZE
+            payload = records[pos:pos + size]
+            pos += size
+            if kind == MPU6050_LOG_BATCH:
+                yield FifoBatch(anchor, count, payload)
+            elif kind == MPU6050_LOG_GAP:
+                yield FifoGap(anchor, 0, b'', unpack_from('<I', payload)[0])
+            elif kind == MPU6050_LOG_MARKER:
+                name, _, value = payload.partition(b'\0')
+                yield Marker(anchor, 0, b'', name.decode(),
+                             json.loads(value))
+
+
+class FlashLogger():
+    """
+    Log stream records into rotating files of whole blocks.
+
+    Files are `prefix` followed by a 5 digit index and '.log'. A file
+    holds `blocks_per_file` blocks, files are synced every `sync_every`
+    blocks, and with `keep` only the newest `keep` written files are kept
+    besides the current one.
+    """
+
+    def __init__(self, prefix='imu', block_size=4096, blocks_per_file=256,
+                 sync_every=4, keep=None):
+        """Init FlashLogger, resuming after the last existing file."""
+        self.prefix = prefix
+        self.block_size = block_size
+        self.blocks_per_file = blocks_per_file
+        self.sync_every = sync_every
+        self.keep = keep
+        self.block = bytearray(block_size)
+        self.pos = MPU6050_LOG_HEADER_SIZE
+        self.file = None
+        self.blocks = 0
+        self.unsynced = 0
+        self.index, self.seq = self.recover()
+        self.open()
+
+    # Files
+    def path(self, index):
+        """Get the path of file `index`."""
+        return '%s%05d.log' % (self.prefix, index)
+
+    def indexes(self):
+        """Get the sorted indexes of the existing log files."""
+        folder, _, base = self.prefix.rpartition('/')
+        found = []
+        for name in os.listdir(folder or '.'):
+            if (name.startswith(base) and name.endswith('.log')
+                    and name[len(base):-4].isdigit()):
+                found.append(int(name[len(base):-4]))
+        found.sort()
+        return found
+
+    def holds_blocks(self, index):
+        """True if file `index` is at least one block long."""
+        return os.stat(self.path(index))[6] >= self.block_size
+
+    def recover(self):
+        """
+        Get the next file index and block sequence number.
+
+        The sequence resumes after the last complete block of the newest
+        file holding one, blocks after a power loss are ignored. Newer
+        files without a complete block are removed and the first of them
+        is reused, otherwise logging resumes in a new file.
+        """
+        indexes = self.indexes()
+        index = indexes[-1] + 1 if indexes else 0
+        seq = -1
+        for last in reversed(indexes):
+            for seq, _ in read_blocks(self.path(last), self.block_size):
+                pass
+            if seq >= 0:
+                break
+            os.remove(self.path(last))
+            index = last
+        return index, seq + 1
+
+    def open(self):
+        """
+        Start the next file.
+
+        With `keep`, the oldest files beyond the newest `keep` ones holding
+        blocks are removed, the file just started is not counted.
+        """
+        self.file = open(self.path(self.index), 'wb')
+        self.blocks = 0
+        if self.keep:
+            full = [index for index in self.indexes()
+                    if index != self.index and self.holds_blocks(index)]
+            for index in full[:-self.keep]:
+                os.remove(self.path(index))
+
+    def sync(self):
+        """Push written blocks to flash."""
+        self.file.flush()
+        if hasattr(os, 'fsync'):
+            os.fsync(self.file.fileno())
+        elif hasattr(os, 'sync'):
+            os.sync()
+        self.unsynced = 0
+
+    def close(self):
+        """Write the pending records and close the file."""
+        self.flush()
+        self.sync()
+        self.file.close()
+        self.file = None
+
+    # Records
+    def log(self, record):
+        """Append a FifoBatch, FifoGap or Marker."""
+        if isinstance(record, FifoGap):
+            payload = bytearray(4)
+            pack_into('<I', payload, 0, record.lost)
+            self.append(MPU6050_LOG_GAP, record.anchor, 0, payload)
+        elif isinstance(record, Marker):
+            self.append(MPU6050_LOG_MARKER, record.anchor, 0,
+                        record.kind.encode() + b'\0'
+                        + json.dumps(record.value).encode())
+        elif record.count:
+            self.append(MPU6050_LOG_BATCH, record.anchor, record.count,
+                        record.data)
+
+    def append(self, kind, anchor, count, payload):
+        """Add one record to the RAM block, writing it out when full."""
+        size = MPU6050_LOG_RECORD_SIZE + len(payload)
+        if size > self.block_size - MPU6050_LOG_HEADER_SIZE:
+            raise ValueError('%d byte record, block holds %d'
+                             % (size, self.block_size
+                                - MPU6050_LOG_HEADER_SIZE))
+        if self.pos + size > self.block_size:
+            self.flush()
+        pos = self.pos
+        pack_into(MPU6050_LOG_RECORD, self.block, pos, kind,
+                  anchor & 0xFFFFFFFF, count, len(payload))
+        pos += MPU6050_LOG_RECORD_SIZE
+        self.block[pos:pos + len(payload)] = payload
+        self.pos = pos + len(payload)
+
+    def flush(self):
+        """Write the RAM block as one whole block, even if not full."""
+        length = self.pos - MPU6050_LOG_HEADER_SIZE
+        if not length:
+            return
+        block = self.block
+        pack_into(MPU6050_LOG_HEADER, block, 0, MPU6050_LOG_MAGIC,
+                  self.seq, length, 0, 0)
+        pack_into('<I', block, 12, block_crc(block, length))
+        self.file.write(block)
+        self.seq += 1
+        self.pos = MPU6050_LOG_HEADER_SIZE
+        self.blocks += 1
+        self.unsynced += 1
+        if self.blocks >= self.blocks_per_file:
+            self.sync()
+            self.file.close()
+            self.index += 1
+            self.open()
+        elif self.unsynced >= self.sync_every:
+            self.sync()
@@ -0,0 +1,180 @@
+"""
+Sample-accurate alignment of several MPU6050 through their FSYNC inputs.
+
+One GPIO drives FSYNC on every sensor of the group. Each sensor latches
+the pin into the least significant bit of a chosen sensor register
+(EXT_SYNC_SET), so a pulse marks one frame in every FIFO stream. The
+frame indices of the same pulse then give the sample offset between
+streams.
+
+    group = SyncGroup((mpu_a, mpu_b), pin=4).configure()
+    while True:
+        group.pulse()
+        batches = group.read()
+        offsets = group.offsets()  # frames behind the first sensor
+
+Sensors must share the sample rate. Pulses must be further apart than the
+largest offset between streams, so that the latest edges of all streams
+belong to the same pulse.
+"""
+from IMU import (FifoGap, MPUException, MPU6050_ACCEL_FIFO_EN_BIT,
+                 MPU6050_EXT_SYNC_ACCEL_ZOUT_L, MPU6050_EXT_SYNC_DISABLED,
+                 MPU6050_RA_FIFO_EN, MPU6050_TEMP_FIFO_EN_BIT,
+                 MPU6050_XG_FIFO_EN_BIT, MPU6050_YG_FIFO_EN_BIT,
+                 MPU6050_ZG_FIFO_EN_BIT, sleep_us)
+try:
+    from machine import Pin
+except ImportError:
+    Pin = None
+
+# EXT_SYNC_SET: (FIFO_EN bit of the register, int16 index within that group)
+MPU6050_EXT_SYNC_SOURCES = {
+    1: (MPU6050_TEMP_FIFO_EN_BIT, 0),   # TEMP_OUT_L
+    2: (MPU6050_XG_FIFO_EN_BIT, 0),     # GYRO_XOUT_L
+    3: (MPU6050_YG_FIFO_EN_BIT, 0),     # GYRO_YOUT_L
+    4: (MPU6050_ZG_FIFO_EN_BIT, 0),     # GYRO_ZOUT_L
+    5: (MPU6050_ACCEL_FIFO_EN_BIT, 0),  # ACCEL_XOUT_L
+    6: (MPU6050_ACCEL_FIFO_EN_BIT, 1),  # ACCEL_YOUT_L
+    7: (MPU6050_ACCEL_FIFO_EN_BIT, 2),  # ACCEL_ZOUT_L
+}
+# FIFO frame order: (FIFO_EN bit, int16 values)
+MPU6050_FIFO_ORDER = ((MPU6050_ACCEL_FIFO_EN_BIT, 3),
+                      (MPU6050_TEMP_FIFO_EN_BIT, 1),
+                      (MPU6050_XG_FIFO_EN_BIT, 1),
+                      (MPU6050_YG_FIFO_EN_BIT, 1),
+                      (MPU6050_ZG_FIFO_EN_BIT, 1))
+
+
+def sync_offset(ext_sync, fifo_en):
+    """
+    Get the byte offset of the FSYNC flag within a FIFO frame.
+
+    `ext_sync` is EXT_SYNC_SET, `fifo_en` the FIFO_EN register value.
+    Raise MPUException when the flagged register is not in the FIFO.
+    """
+    source = MPU6050_EXT_SYNC_SOURCES.get(ext_sync)
+    if source is None or not fifo_en & (1 << source[0]):
+        raise MPUException('EXT_SYNC_SET %d not in the FIFO' % ext_sync)
+    index = 0
+    for bit, count in MPU6050_FIFO_ORDER:
+        if bit == source[0]:
+            return 2 * (index + source[1]) + 1
+        if fifo_en & (1 << bit):
+            index += count
+
+
+def sync_edges(data, count, frame_size, offset, level=0):
+    """
+    Find FSYNC rising edges in `count` raw FIFO frames.
+
+    `level` is the flag of the frame before the first one. Return the list
+    of frame indices where the flag rises, and the flag of the last frame.
+    """
+    edges = []
+    position = offset
+    for index in range(count):
+        flag = data[position] & 1
+        if flag and not level:
+            edges.append(index)
+        level = flag
+        position += frame_size
+    return edges, level
+
+
+class SyncStream():
+    """FSYNC edge tracking of one sensor FIFO stream."""
+
+    def __init__(self, frame_size, offset):
+        """Init SyncStream for frames with the flag at byte `offset`."""
+        self.frame_size = frame_size
+        self.offset = offset
+        self.frames = 0
+        self.level = 0
+        self.last_edge = None
+
+    def feed(self, batch):
+        """Feed a FifoBatch or FifoGap, return the new edges' frame numbers."""
+        if isinstance(batch, FifoGap):
+            # Edges inside the gap are lost, its length is an estimate.
+            self.frames += batch.lost
+            self.level = 0
+            return []
+        edges, self.level = sync_edges(batch.data, batch.count,
+                                       self.frame_size, self.offset,
+                                       self.level)
+        edges = [self.frames + index for index in edges]
+        self.frames += batch.count
+        if edges:
+            self.last_edge = edges[-1]
+        return edges
+
+
+class SyncGroup():
+    """
+    MPU6050 sensors sampling on a shared FSYNC strobe.
+
+    `pin` is a machine.Pin, a GPIO number, or any object with `value(v)`.
+    `ext_sync` picks the register LSB latching FSYNC, a MPU6050_EXT_SYNC_*
+    value; the register must be in every sensor's FIFO frame.
+    """
+
+    def __init__(self, sensors, pin, ext_sync=MPU6050_EXT_SYNC_ACCEL_ZOUT_L):
+        """Init SyncGroup."""
+        self.sensors = tuple(sensors)
+        if isinstance(pin, int):
+            pin = Pin(pin, Pin.OUT, value=0)
+        self.pin = pin
+        self.ext_sync = ext_sync
+        self.streams = None
+        self.pulses = 0
+
+    def configure(self):
+        """Latch FSYNC on every sensor and reset their FIFO streams."""
+        self.pin.value(0)
+        streams = []
+        for mpu in self.sensors:
+            fifo_en = mpu.read_byte(MPU6050_RA_FIFO_EN)[0]
+            offset = sync_offset(self.ext_sync, fifo_en)
+            mpu.set_field('external_frame_sync', self.ext_sync)
+            streams.append(SyncStream(mpu.fifo_frame_size(), offset))
+        # Restart every FIFO together so streams start close in time.
+        for mpu in self.sensors:
+            mpu.fifo_resync()
+            mpu.start_clock()
+        self.streams = streams
+        self.pulses = 0
+        return self
+
+    def release(self):
+        """Stop latching FSYNC."""
+        for mpu in self.sensors:
+            mpu.set_field('external_frame_sync', MPU6050_EXT_SYNC_DISABLED)
+        self.streams = None
+
+    def pulse(self, width_us=10):
+        """Strobe FSYNC on all sensors."""
+        self.pin.value(1)
+        sleep_us(width_us)
+        self.pin.value(0)
+        self.pulses += 1
+
+    def read(self):
+        """Drain every sensor FIFO, return their FifoBatch or FifoGap."""
+        batches = []
+        for mpu, stream in zip(self.sensors, self.streams):
+            batch = mpu.read_fifo(stream.frame_size)
+            stream.feed(batch)
+            batches.append(batch)
+        return batches
+
+    def offsets(self):
+        """
+        Get the frame offset of each stream behind the first one.
+
+        Frame `n` of stream `i` was sampled with frame `n - offsets[i]` of
+        stream 0. None until every stream has seen a pulse.
+        """
+        edges = [stream.last_edge for stream in self.streams]
+        if None in edges:
+            return None
+        return tuple(edge - edges[0] for edge in edges)
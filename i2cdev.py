@@ -0,0 +1,168 @@
+"""
+Linux i2c-dev bus backend for the MPU6050 driver.
+
+I2CDev implements the `machine.I2C` methods used by the driver over
+/dev/i2c-N, so the same driver runs on single-board computers:
+
+    mpu = MPU6050(I2CDev(1))
+
+Register accesses use the I2C_RDWR ioctl: a register read is one combined
+write and read transaction with a repeated start, and a FIFO drain is a
+single read message into the caller's buffer.
+
+FakeDevice simulates the character device with a register file per
+address, so the driver runs without hardware:
+
+    device = FakeDevice({0x68: {0x75: 0x68}})
+    mpu = MPU6050(device.bus())
+"""
+import ctypes
+import errno
+import fcntl
+import os
+
+# linux/i2c-dev.h, linux/i2c.h
+I2C_RDWR = 0x0707
+I2C_M_RD = 0x0001
+
+
+class I2CMessage(ctypes.Structure):
+    """struct i2c_msg."""
+
+    _fields_ = [('addr', ctypes.c_uint16),
+                ('flags', ctypes.c_uint16),
+                ('len', ctypes.c_uint16),
+                ('buf', ctypes.c_void_p)]
+
+
+class I2CTransfer(ctypes.Structure):
+    """struct i2c_rdwr_ioctl_data."""
+
+    _fields_ = [('msgs', ctypes.POINTER(I2CMessage)),
+                ('nmsgs', ctypes.c_uint32)]
+
+
+class I2CDev():
+    """
+    I2C bus on a Linux i2c-dev character device.
+
+    `ioctl` is looked up on the instance, replace it to run against a fake
+    character device such as FakeDevice.
+    """
+
+    def __init__(self, bus=1, path=None):
+        """Open /dev/i2c-`bus`, or `path` when given."""
+        self.path = path or '/dev/i2c-%d' % bus
+        self.fd = os.open(self.path, os.O_RDWR)
+        self.ioctl = fcntl.ioctl
+
+    def close(self):
+        """Close the character device."""
+        os.close(self.fd)
+
+    def transfer(self, messages):
+        """
+        Run (addr, flags, buffer) messages as one combined transaction.
+
+        Buffers must be writable, read messages fill them in place.
+        """
+        msgs = (I2CMessage * len(messages))()
+        for msg, (addr, flags, buf) in zip(msgs, messages):
+            data = (ctypes.c_char * len(buf)).from_buffer(buf)
+            msg.addr = addr
+            msg.flags = flags
+            msg.len = len(buf)
+            msg.buf = ctypes.addressof(data)
+        self.ioctl(self.fd, I2C_RDWR, I2CTransfer(msgs, len(messages)))
+
+    def readfrom_mem_into(self, addr, memaddr, buf):
+        """Read `len(buf)` bytes from register `memaddr` into `buf`."""
+        self.transfer(((addr, 0, bytearray((memaddr,))),
+                       (addr, I2C_M_RD, buf)))
+
+    def readfrom_mem(self, addr, memaddr, nbytes):
+        """Read `nbytes` from register `memaddr`."""
+        buf = bytearray(nbytes)
+        self.readfrom_mem_into(addr, memaddr, buf)
+        return bytes(buf)
+
+    def writeto_mem(self, addr, memaddr, buf):
+        """Write `buf` from register `memaddr` on."""
+        self.transfer(((addr, 0, bytearray((memaddr,)) + buf),))
+
+    def scan(self):
+        """Get the 7-bit addresses acknowledging a one byte read."""
+        found = []
+        probe = bytearray(1)
+        for addr in range(0x08, 0x78):
+            try:
+                self.transfer(((addr, I2C_M_RD, probe),))
+            except OSError:
+                continue
+            found.append(addr)
+        return found
+
+
+class FakeDevice():
+    """
+    Simulated i2c-dev character device, an `ioctl` for I2CDev.
+
+    Each address has a 256 byte register file. The first byte of a write
+    sets the register pointer, reads and writes auto-increment it like the
+    MPU6050 does. Messages to other addresses fail with OSError, as a NACK
+    does. Override `read` and `write` to simulate register side effects.
+    """
+
+    def __init__(self, devices=None):
+        """Init FakeDevice with {address: {register: value}}."""
+        self.registers = {}
+        self.pointers = {}
+        self.transfers = 0
+        for addr, values in (devices or {}).items():
+            self.add(addr, values)
+
+    def add(self, addr, values=None):
+        """Add a device at `addr`, return its register file."""
+        registers = self.registers[addr] = bytearray(256)
+        for register, value in (values or {}).items():
+            registers[register] = value
+        self.pointers[addr] = 0
+        return registers
+
+    def bus(self):
+        """Get an I2CDev running on this device."""
+        bus = I2CDev(path=os.devnull)
+        bus.ioctl = self
+        return bus
+
+    def read(self, addr, register, length):
+        """Get `length` bytes from `register` on."""
+        registers = self.registers[addr]
+        return bytes(registers[(register + i) & 0xFF] for i in range(length))
+
+    def write(self, addr, register, data):
+        """Store `data` from `register` on."""
+        registers = self.registers[addr]
+        for i, value in enumerate(data):
+            registers[(register + i) & 0xFF] = value
+
+    def __call__(self, fd, request, data):
+        """Run an I2C_RDWR transfer."""
+        if request != I2C_RDWR:
+            raise OSError(errno.EINVAL, 'unsupported ioctl 0x%04X' % request)
+        self.transfers += 1
+        for i in range(data.nmsgs):
+            msg = data.msgs[i]
+            if msg.addr not in self.registers:
+                raise OSError(errno.EREMOTEIO, 'no ACK from 0x%02X' % msg.addr)
+            buf = (ctypes.c_ubyte * msg.len).from_address(msg.buf)
+            pointer = self.pointers[msg.addr]
+            if msg.flags & I2C_M_RD:
+                buf[:] = self.read(msg.addr, pointer, msg.len)
+                pointer += msg.len
+            elif msg.len:
+                pointer = buf[0]
+                self.write(msg.addr, pointer, bytes(buf[1:]))
+                pointer += msg.len - 1
+            self.pointers[msg.addr] = pointer & 0xFF
+        return 0
@@ -0,0 +1,165 @@
+"""
+Acquisition loop instrumentation around the MPU6050 driver.
+
+Fixed-size histograms and high-water marks of sample latency, loop
+jitter, deadline misses and FIFO fill level. Recording is integer-only
+and does not allocate, so it can stay on in production loops.
+
+    monitor = LoopMonitor(mpu)
+    while True:
+        monitor.tick()
+        batch = monitor.read()  # mpu.read_fifo(), instrumented
+        process(batch)
+        if monitor.saturated():
+            ...
+    send(monitor.export())
+"""
+import json
+from array import array
+from IMU import FifoGap, MPU6050_FIFO_SIZE, ticks_diff, ticks_us
+
+# Bucket upper bounds, the last bucket takes everything above.
+MPU6050_TIME_EDGES = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000,
+                      50000, 100000)  # us
+MPU6050_FIFO_EDGES = (64, 128, 256, 384, 512, 640, 768, 896, 1023)  # bytes
+
+
+class Histogram():
+    """Counts of integer values in fixed buckets, with the high-water mark."""
+
+    def __init__(self, edges):
+        """Init Histogram with ascending bucket upper bounds `edges`."""
+        self.edges = tuple(edges)
+        self.counts = array('I', [0] * (len(self.edges) + 1))
+        self.count = 0
+        self.high = 0
+
+    def reset(self):
+        """Clear the counts."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = self.high = 0
+
+    def add(self, value):
+        """Count `value`."""
+        edges = self.edges
+        n = len(edges)
+        i = 0
+        while i < n and value > edges[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        if value > self.high:
+            self.high = value
+
+    def percentile(self, p):
+        """Get the bucket upper bound holding percentile `p` (0-100)."""
+        if not self.count:
+            return 0
+        rank = self.count * p / 100
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.edges[i] if i < len(self.edges) else self.high
+        return self.high
+
+    def snapshot(self):
+        """Get the histogram as a dict."""
+        return {'edges': list(self.edges), 'counts': list(self.counts),
+                'count': self.count, 'high': self.high,
+                'p50': self.percentile(50), 'p99': self.percentile(99)}
+
+
+class LoopMonitor():
+    """
+    Acquisition loop statistics for one sensor.
+
+      latency : age of the oldest sample of a batch when it reaches the
+                consumer, us
+      jitter  : deviation of the loop interval from `period_us`, us
+      fifo    : FIFO fill level at each drain, bytes
+      misses  : loop intervals longer than `deadline_us`
+
+    `period_us` is the expected loop interval, one sample period by
+    default. `deadline_us` defaults to the time a half full FIFO takes to
+    fill, past which overflows become likely.
+    """
+
+    def __init__(self, mpu, frame_size=None, period_us=None,
+                 deadline_us=None):
+        """Init LoopMonitor, reading the rate and FIFO setup from `mpu`."""
+        self.mpu = mpu
+        self.frame_size = frame_size or mpu.fifo_frame_size() or 12
+        self.sample_us = int(1000000 / mpu.output_rate())
+        self.period_us = period_us or self.sample_us
+        self.deadline_us = deadline_us or (
+            MPU6050_FIFO_SIZE // 2 // self.frame_size * self.sample_us)
+        self.latency = Histogram(MPU6050_TIME_EDGES)
+        self.jitter = Histogram(MPU6050_TIME_EDGES)
+        self.fifo = Histogram(MPU6050_FIFO_EDGES)
+        self.last = None
+        self.loops = 0
+        self.misses = 0
+        self.batches = 0
+        self.gaps = 0
+
+    def reset(self):
+        """Clear all statistics."""
+        for histogram in (self.latency, self.jitter, self.fifo):
+            histogram.reset()
+        self.last = None
+        self.loops = self.misses = self.batches = self.gaps = 0
+
+    def tick(self, now=None):
+        """Mark the start of a loop iteration."""
+        if now is None:
+            now = ticks_us()
+        if self.last is not None:
+            interval = ticks_diff(now, self.last)
+            error = interval - self.period_us
+            self.jitter.add(-error if error < 0 else error)
+            if interval > self.deadline_us:
+                self.misses += 1
+        self.last = now
+        self.loops += 1
+
+    def observe(self, batch, now=None):
+        """Record a FifoBatch or FifoGap handed to the consumer."""
+        if now is None:
+            now = ticks_us()
+        if isinstance(batch, FifoGap):
+            self.gaps += 1
+            self.fifo.add(MPU6050_FIFO_SIZE)
+            return
+        self.batches += 1
+        self.fifo.add(batch.count * self.frame_size)
+        if batch.count:
+            self.latency.add(ticks_diff(now, batch.anchor)
+                             + (batch.count - 1) * self.sample_us)
+
+    def read(self):
+        """Drain the FIFO with `read_fifo` and record the batch."""
+        batch = self.mpu.read_fifo(self.frame_size)
+        self.observe(batch)
+        return batch
+
+    def saturated(self, margin=0.75):
+        """True once the FIFO filled past `margin` or overflowed."""
+        return (self.gaps > 0
+                or self.fifo.high > margin * MPU6050_FIFO_SIZE)
+
+    def snapshot(self):
+        """Get all statistics and the driver counters as a dict."""
+        return {'loops': self.loops, 'misses': self.misses,
+                'batches': self.batches, 'gaps': self.gaps,
+                'period_us': self.period_us,
+                'deadline_us': self.deadline_us,
+                'latency_us': self.latency.snapshot(),
+                'jitter_us': self.jitter.snapshot(),
+                'fifo_bytes': self.fifo.snapshot(),
+                'counters': dict(self.mpu.counters)}
+
+    def export(self):
+        """Get the snapshot as JSON."""
+        return json.dumps(self.snapshot())
@@ -0,0 +1,136 @@
+"""
+Vectorised host-side orientation over whole captures.
+
+Tilt and complementary filtering run as NumPy array operations. The
+filter recursion goes through `scipy.signal.lfilter` when SciPy is
+installed, and a blocked scan in NumPy otherwise.
+
+    capture = numpy.load('imu07_0142.npz')  # from convert.py
+    accel = numpy.column_stack([capture[c] for c in ('ax', 'ay', 'az')])
+    gyro = numpy.column_stack([capture[c] for c in ('gx', 'gy', 'gz')])
+    angles = ComplementaryFilter(rate=1000).run(accel, gyro)
+
+Angles are (roll, pitch) in degrees. Roll turns about X and follows gx,
+pitch turns about Y and follows gy. Accel is in any unit, gyro in deg/s.
+"""
+from math import atan2, degrees, hypot, log
+
+import numpy as np
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+# Blocked scan: largest growth of alpha^-j within a block, keeps the
+# cumulative sums well inside float64 precision.
+SCAN_RANGE = 1e6
+
+
+def tilt(accel):
+    """Get (roll, pitch) in degrees from an (N, 3) accel array."""
+    ax, ay, az = accel[:, 0], accel[:, 1], accel[:, 2]
+    out = np.empty((len(accel), 2))
+    out[:, 0] = np.arctan2(ay, az)
+    out[:, 1] = np.arctan2(-ax, np.hypot(ay, az))
+    return np.degrees(out, out=out)
+
+
+def blocked_scan(u, alpha, y0, block=None):
+    """
+    Solve y[n] = alpha * y[n - 1] + u[n] along axis 0, y[-1] = y0.
+
+    Within a block of B samples the recursion is a scaled cumulative sum,
+    y[k] = alpha^k * cumsum(u[j] * alpha^-j), solved for all blocks at once.
+    Only the B-times shorter sequence of block carries is a Python loop.
+    """
+    n, columns = u.shape
+    if not 0 < alpha < 1:
+        raise ValueError('alpha must be in (0, 1)')
+    if block is None:
+        block = max(1, int(log(SCAN_RANGE) / -log(alpha)))
+    block = min(block, n) or 1
+    blocks = -(-n // block)
+    padded = np.zeros((blocks * block, columns))
+    padded[:n] = u
+    padded = padded.reshape(blocks, block, columns)
+    j = np.arange(block)
+    local = np.cumsum(padded * (alpha ** -j)[:, None], axis=1)
+    local *= (alpha ** j)[:, None]
+    # y at the end of each block, from the previous one.
+    carry = np.empty((blocks, columns))
+    previous = np.asarray(y0, float)
+    decay = alpha ** block
+    ends = local[:, -1]
+    for b in range(blocks):
+        carry[b] = previous
+        previous = decay * previous + ends[b]
+    local += (alpha ** (j + 1))[:, None] * carry[:, None, :]
+    return local.reshape(-1, columns)[:n]
+
+
+def first_order(u, alpha, y0):
+    """Solve y[n] = alpha * y[n - 1] + u[n] along axis 0, y[-1] = y0."""
+    if lfilter is None:
+        return blocked_scan(u, alpha, y0)
+    zi = alpha * np.asarray(y0, float)[None, :]
+    return lfilter([1.0], [1.0, -alpha], u, axis=0, zi=zi)[0]
+
+
+class ComplementaryFilter():
+    """
+    Complementary filter over (N, 3) accel and gyro arrays.
+
+        angle[n] = alpha * (angle[n - 1] + gyro[n] * dt)
+                   + (1 - alpha) * tilt[n]
+
+    which is the first order recursion of `first_order`. The state carries
+    over between calls, so a capture can be fed in chunks.
+    """
+
+    def __init__(self, rate, alpha=0.98):
+        """Init ComplementaryFilter for samples at `rate` Hz."""
+        self.dt = 1 / rate
+        self.alpha = alpha
+        self.state = None
+
+    def reset(self):
+        """Restart from the next tilt."""
+        self.state = None
+
+    def process(self, accel, gyro):
+        """Filter one chunk, return its (N, 2) angles."""
+        if not len(accel):
+            return np.empty((0, 2))
+        angles = tilt(accel)
+        if self.state is None:
+            self.state = angles[0].copy()
+        u = angles
+        u *= 1 - self.alpha
+        u += (self.alpha * self.dt) * gyro[:, :2]
+        out = first_order(u, self.alpha, self.state)
+        self.state = out[-1].copy()
+        return out
+
+    def run(self, accel, gyro, chunk=1 << 20):
+        """Filter a whole capture in chunks of `chunk` samples."""
+        out = np.empty((len(accel), 2))
+        for start in range(0, len(accel), chunk):
+            end = start + chunk
+            out[start:end] = self.process(accel[start:end], gyro[start:end])
+        return out
+
+
+def complementary_reference(accel, gyro, rate, alpha=0.98):
+    """Scalar reference of ComplementaryFilter.run, one sample at a time."""
+    dt = 1 / rate
+    out = []
+    roll = pitch = None
+    for (ax, ay, az), (gx, gy, _) in zip(accel, gyro):
+        accel_roll = degrees(atan2(ay, az))
+        accel_pitch = degrees(atan2(-ax, hypot(ay, az)))
+        if roll is None:
+            roll, pitch = accel_roll, accel_pitch
+        roll = alpha * (roll + gx * dt) + (1 - alpha) * accel_roll
+        pitch = alpha * (pitch + gy * dt) + (1 - alpha) * accel_pitch
+        out.append((roll, pitch))
+    return out
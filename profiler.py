@@ -0,0 +1,184 @@
+"""
+Heap allocation profiling for the MPU6050 driver.
+
+Wraps the public methods of a driver instance and records call counts and
+heap bytes allocated per method, with `gc.mem_alloc()` on the board and
+`tracemalloc` on CPython.
+
+    profiler = AllocProfiler(mpu)
+    profiler.start()
+    for _ in range(100):
+        mpu.accel_in_g(mpu.accel())
+        profiler.sample()
+    profiler.stop()
+    profiler.print_report()
+
+Counts are inclusive: `accel_in_g` also counts the field read it does.
+The wrappers' own allocations are measured once at start and subtracted.
+On CPython a call counts its peak heap growth, so memory freed inside the
+call only counts up to the peak.
+"""
+import gc
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+class Profile():
+    """Call count and allocated bytes of one method."""
+
+    def __init__(self):
+        """Init Profile."""
+        self.calls = 0
+        self.allocated = 0
+        self.worst = 0
+
+
+class AllocProfiler():
+    """
+    Per-method heap allocation profiler.
+
+    `names` restricts the wrapped methods, all public methods by default.
+    """
+
+    def __init__(self, target, names=None):
+        """Init AllocProfiler for `target`."""
+        self.target = target
+        self.names = names or [name for name in dir(type(target))
+                               if not name.startswith('_')
+                               and callable(getattr(target, name))]
+        self.profiles = {}
+        self.samples = 0
+        self.stack = []
+        self.overhead = 0
+        self.running = False
+
+    # Heap probes
+    def enter(self):
+        """Open a measurement frame."""
+        if self.stack:
+            self.stack[-1][2] += 1
+        if tracemalloc is None:
+            self.stack.append([gc.mem_alloc(), 0, 0])
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack and peak > self.stack[-1][1]:
+            self.stack[-1][1] = peak
+        tracemalloc.reset_peak()
+        self.stack.append([current, 0, 0])
+
+    def leave(self):
+        """Close a measurement frame, return the bytes allocated in it."""
+        base, top, nested = self.stack.pop()
+        if tracemalloc is None:
+            allocated = gc.mem_alloc() - base
+        else:
+            peak = tracemalloc.get_traced_memory()[1]
+            if peak > top:
+                top = peak
+            if self.stack and top > self.stack[-1][1]:
+                self.stack[-1][1] = top
+            allocated = top - base
+        return allocated - self.overhead * (1 + nested)
+
+    def wrap(self, name):
+        """Get a counting wrapper for method `name`."""
+        method = getattr(self.target, name)
+        profile = self.profiles[name] = Profile()
+
+        def wrapper(*args, **kwargs):
+            self.enter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                allocated = self.leave()
+                if allocated < 0:
+                    allocated = 0
+                profile.calls += 1
+                profile.allocated += allocated
+                if allocated > profile.worst:
+                    profile.worst = allocated
+        return wrapper
+
+    def calibrate(self, repeat=20):
+        """Measure the bytes a wrapper allocates around an empty call."""
+        def empty():
+            pass
+
+        self.overhead = 0
+        costs = []
+        for _ in range(repeat):
+            self.enter()
+            empty()
+            costs.append(self.leave())
+        self.overhead = min(costs)
+
+    # Session
+    def start(self):
+        """Wrap the methods and start counting."""
+        if tracemalloc is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        gc.collect()
+        # Collections would show up as negative allocations.
+        gc.disable()
+        self.calibrate()
+        for name in self.names:
+            setattr(self.target, name, self.wrap(name))
+        self.running = True
+
+    def stop(self):
+        """Unwrap the methods and stop counting."""
+        for name in self.names:
+            try:
+                delattr(self.target, name)
+            except AttributeError:
+                pass
+        gc.enable()
+        if tracemalloc is not None:
+            tracemalloc.stop()
+        self.running = False
+
+    def sample(self, count=1):
+        """Count `count` samples produced, for the per sample figures."""
+        self.samples += count
+
+    def reset(self):
+        """Clear the counts."""
+        for profile in self.profiles.values():
+            profile.calls = profile.allocated = profile.worst = 0
+        self.samples = 0
+
+    # Results
+    def report(self):
+        """
+        Get the called methods, most allocating first.
+
+        Rows are (name, calls, bytes, bytes per call, worst call,
+        bytes per sample), bytes per sample is None without samples.
+        """
+        rows = []
+        for name, profile in self.profiles.items():
+            if not profile.calls:
+                continue
+            per_sample = profile.allocated / self.samples \
+                if self.samples else None
+            rows.append((name, profile.calls, profile.allocated,
+                         profile.allocated / profile.calls, profile.worst,
+                         per_sample))
+        rows.sort(key=lambda row: -row[2])
+        return rows
+
+    def allocating(self):
+        """Get the names of methods that allocated at all."""
+        return [row[0] for row in self.report() if row[2]]
+
+    def print_report(self):
+        """Print the report as a table."""
+        print('%-32s %8s %10s %9s %7s %10s' % (
+            'method', 'calls', 'bytes', 'B/call', 'worst', 'B/sample'))
+        for name, calls, allocated, per_call, worst, per_sample in \
+                self.report():
+            print('%-32s %8d %10d %9.1f %7d %10s' % (
+                name, calls, allocated, per_call, worst,
+                '-' if per_sample is None else '%.1f' % per_sample))
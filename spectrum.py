@@ -0,0 +1,121 @@
+"""
+Streaming vibration spectrum analysis over MPU6050 FIFO data.
+
+Runs on `ulab.numpy` on the board and on NumPy on the host. Only the
+summaries (peak frequency, band energies, RMS) need to leave the device.
+
+    analyzer = SpectrumAnalyzer(mpu.output_rate())
+    for spectrum in analyzer.feed(mpu.read_fifo()):
+        send(spectrum)
+"""
+from collections import namedtuple
+from IMU import FifoGap, decode_block
+try:
+    from ulab import numpy as np
+except ImportError:
+    import numpy as np
+
+Spectrum = namedtuple('Spectrum', ('end', 'peaks', 'bands', 'rms'))
+
+
+class SpectrumAnalyzer():
+    """
+    Windowed, overlapping magnitude spectra per accelerometer axis.
+
+    Every `window * (1 - overlap)` samples a Spectrum is emitted for the
+    last `window` samples:
+      end   : index of the last sample in the window since start
+      peaks : (frequency Hz, amplitude LSB) of the strongest bin per axis,
+              None for a constant axis
+      bands : energy in LSB^2 within each `bands` (low Hz, high Hz) range
+      rms   : RMS of the mean-removed signal per axis, LSB
+
+    FIFO frames are `frame_width` int16 values, `axes` picks the analysed
+    ones (accelerometer X, Y, Z first in the FIFO).
+    """
+
+    def __init__(self, rate, window=256, overlap=0.5,
+                 bands=((0, 10), (10, 100), (100, 500)),
+                 axes=(0, 1, 2), frame_width=6):
+        """Init SpectrumAnalyzer for samples at `rate` Hz."""
+        self.rate = rate
+        self.window = window
+        self.hop = max(1, int(window * (1 - overlap)))
+        self.axes = axes
+        self.frame_width = frame_width
+        self.bins = [(int(low * window / rate), int(high * window / rate) + 1)
+                     for low, high in bands]
+        # Hann window, amplitude normalised.
+        self.taper = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(window) / window)
+        self.scale = 2 / np.sum(self.taper)
+        self.pending = [np.zeros(window) for _ in axes]
+        self.count = 0
+        self.total = 0
+        self.magnitudes = None
+
+    def feed(self, batch):
+        """
+        Feed a FifoBatch, return the list of Spectrum emitted.
+
+        A FifoGap restarts the window, so no spectrum spans the lost
+        samples. Records without data, such as a Marker, are skipped.
+        """
+        if isinstance(batch, FifoGap):
+            self.count = 0
+            self.total += batch.lost
+            return []
+        return self.feed_values(decode_block(batch.data))
+
+    def feed_values(self, values):
+        """Feed decoded int16 frames, return the list of Spectrum emitted."""
+        width = self.frame_width
+        samples = len(values) // width
+        if not samples:
+            return []
+        frames = np.array(values[:samples * width])
+        columns = [frames[axis::width] for axis in self.axes]
+        spectra = []
+        start = 0
+        while start < samples:
+            take = min(self.window - self.count, samples - start)
+            for pending, column in zip(self.pending, columns):
+                pending[self.count:self.count + take] = \
+                    column[start:start + take]
+            self.count += take
+            self.total += take
+            start += take
+            if self.count == self.window:
+                spectra.append(self.analyze())
+                keep = self.window - self.hop
+                for pending in self.pending:
+                    pending[:keep] = pending[self.hop:]
+                self.count = keep
+        return spectra
+
+    def magnitude(self, x):
+        """Get the one-sided amplitude spectrum of a window."""
+        spectrum = np.fft.fft((x - np.mean(x)) * self.taper)
+        if isinstance(spectrum, tuple):
+            # ulab built without complex support returns (real, imag).
+            real, imag = spectrum
+        else:
+            real, imag = np.real(spectrum), np.imag(spectrum)
+        half = self.window // 2 + 1
+        return np.sqrt(real[:half] ** 2 + imag[:half] ** 2) * self.scale
+
+    def analyze(self):
+        """Summarise the current window."""
+        self.magnitudes = [self.magnitude(x) for x in self.pending]
+        peaks = []
+        bands = []
+        for magnitude in self.magnitudes:
+            # Skip the DC bin.
+            peak = int(np.argmax(magnitude[1:])) + 1
+            amplitude = float(magnitude[peak])
+            peaks.append((peak * self.rate / self.window, amplitude)
+                         if amplitude else None)
+            energy = magnitude ** 2
+            bands.append(tuple(float(np.sum(energy[low:high]))
+                               for low, high in self.bins))
+        rms = tuple(float(np.std(x)) for x in self.pending)
+        return Spectrum(self.total, tuple(peaks), tuple(bands), rms)
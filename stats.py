@@ -0,0 +1,137 @@
+"""
+Windowed running statistics per axis for MPU6050 samples.
+
+    stats = WindowStats(window=6000)  # one summary per minute at 100Hz
+    summary = stats.add(mpu.accel())
+    if summary:
+        send(summary)
+"""
+from collections import namedtuple
+from math import sqrt
+
+Summary = namedtuple('Summary', ('end', 'count', 'mean', 'variance', 'rms',
+                                 'min', 'max', 'p2p'))
+
+
+class WindowStats():
+    """
+    Per-axis mean, variance, RMS, min, max and peak-to-peak over windows.
+
+    Samples are summed as integer offsets from a per-axis reference (the
+    first sample seen), so the variance is exact without Welford's per
+    sample division. Nothing is allocated per sample while the sums fit
+    small ints (30 bits on the ESP32), larger sums fall back to long ints.
+
+    Windows tumble when `step` equals `window` (the default). A smaller
+    `step` dividing `window` slides: one Summary every `step` samples over
+    the last `window` samples, built from per-step partial sums.
+
+    Each Summary field except `end` (samples seen so far) and `count` is a
+    tuple with one value per axis, in raw LSB.
+    """
+
+    def __init__(self, axes=3, window=1000, step=None):
+        """Init WindowStats for samples of `axes` values."""
+        step = step or window
+        if window % step:
+            raise ValueError('window must be a multiple of step')
+        self.axes = axes
+        self.step = step
+        self.slots = window // step
+        size = axes * self.slots
+        self.sums = [0] * size
+        self.squares = [0] * size
+        self.mins = [0] * size
+        self.maxs = [0] * size
+        self.ref = [0] * axes
+        self.started = False
+        self.slot = 0
+        self.filled = 0
+        self.count = 0
+        self.total = 0
+
+    def reset(self):
+        """Drop the current window."""
+        self.started = False
+        self.slot = self.filled = self.count = 0
+
+    def add(self, sample, offset=0):
+        """
+        Add one sample, values `offset` to `offset + axes` of `sample`.
+
+        Return a Summary when a window completes, None otherwise.
+        """
+        ref = self.ref
+        if not self.started:
+            for i in range(self.axes):
+                ref[i] = sample[offset + i]
+            self.started = True
+        base = self.slot * self.axes
+        first = not self.count
+        i = 0
+        while i < self.axes:
+            value = sample[offset + i]
+            delta = value - ref[i]
+            j = base + i
+            if first:
+                self.sums[j] = delta
+                self.squares[j] = delta * delta
+                self.mins[j] = self.maxs[j] = value
+            else:
+                self.sums[j] += delta
+                self.squares[j] += delta * delta
+                if value < self.mins[j]:
+                    self.mins[j] = value
+                elif value > self.maxs[j]:
+                    self.maxs[j] = value
+            i += 1
+        self.count += 1
+        self.total += 1
+        if self.count == self.step:
+            return self.close_step()
+        return None
+
+    def add_block(self, values, width=6, offset=0):
+        """
+        Add interleaved frames of `width` values, e.g. from decode_block.
+
+        Return the list of Summary completed by the block.
+        """
+        summaries = []
+        for start in range(offset, len(values) - self.axes + 1, width):
+            summary = self.add(values, start)
+            if summary:
+                summaries.append(summary)
+        return summaries
+
+    def close_step(self):
+        """Close the current step, return a Summary once a window is full."""
+        self.count = 0
+        self.slot = (self.slot + 1) % self.slots
+        if self.filled < self.slots:
+            self.filled += 1
+        if self.filled < self.slots:
+            return None
+        return self.summary()
+
+    def summary(self):
+        """Combine the partial sums of the last window."""
+        n = self.step * self.slots
+        mean = []
+        variance = []
+        rms = []
+        low = []
+        high = []
+        for i in range(self.axes):
+            cells = range(i, self.axes * self.slots, self.axes)
+            total = sum(self.sums[j] for j in cells)
+            squares = sum(self.squares[j] for j in cells)
+            ref = self.ref[i]
+            mean.append(ref + total / n)
+            variance.append((squares - total * total / n) / n)
+            rms.append(sqrt((squares + 2 * ref * total + n * ref * ref) / n))
+            low.append(min(self.mins[j] for j in cells))
+            high.append(max(self.maxs[j] for j in cells))
+        return Summary(self.total, n, tuple(mean), tuple(variance), tuple(rms),
+                       tuple(low), tuple(high),
+                       tuple(h - lo for h, lo in zip(high, low)))
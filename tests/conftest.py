@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+import IMU
+from IMU import MPU6050
+from i2cdev import FakeDevice
+
+
+@pytest.fixture
+def device():
+    """A simulated bus holding a powered-up MPU6050 at 0x68."""
+    return FakeDevice({0x68: {0x75: 0x68, 0x6B: 0x40}})
+
+
+@pytest.fixture
+def mpu(device):
+    """An MPU6050 driver on `device`."""
+    return MPU6050(device.bus())
+
+
+class FakeSensor(FakeDevice):
+    """
+    FakeDevice with an MPU6050 FIFO filling at `rate` Hz on a virtual clock.
+
+    `now` (us) advances with every transfer by its bus time at 400kHz.
+    Each frame starts with its big-endian sequence number. A frame pushed
+    into a full FIFO drops the oldest bytes and sets FIFO_OFLOW_INT.
+    """
+
+    def __init__(self, rate=1000, frame_size=12):
+        super().__init__({0x68: {0x75: 0x68, 0x6B: 0x01, 0x1A: 0x01,
+                                 0x23: 0x78, 0x6A: 0x40}})
+        self.rate = rate
+        self.frame_size = frame_size
+        self.now = 0
+        self.produced = 0
+        self.fifo = bytearray()
+        self.overflow = False
+        self.lock = threading.RLock()
+
+    def advance(self, us):
+        """Let `us` microseconds pass."""
+        with self.lock:
+            self.now += us
+            due = self.now * self.rate // 1000000
+            while self.produced < due:
+                if self.registers[0x68][0x6A] & 0x40:
+                    self.fifo += self.frame(self.produced)
+                    if len(self.fifo) > 1024:
+                        del self.fifo[:len(self.fifo) - 1024]
+                        self.overflow = True
+                self.produced += 1
+
+    def frame(self, seq):
+        """Get the FIFO frame sampled as number `seq`."""
+        return seq.to_bytes(2, 'big') + bytes(self.frame_size - 2)
+
+    def read(self, addr, register, length):
+        if register == 0x3A:
+            status = 0x10 if self.overflow else 0
+            self.overflow = False
+            return bytes((status,)) + super().read(addr, 0x3B, length - 1)
+        if register == 0x72:
+            return len(self.fifo).to_bytes(2, 'big')[:length]
+        if register == 0x74:
+            data = bytes(self.fifo[:length])
+            del self.fifo[:length]
+            return data + bytes(length - len(data))
+        return super().read(addr, register, length)
+
+    def write(self, addr, register, data):
+        super().write(addr, register, data)
+        if register == 0x6A and data and data[0] & 0x04:
+            if not data[0] & 0x40:
+                self.fifo = bytearray()
+            self.registers[addr][0x6A] &= ~0x04
+
+    def __call__(self, fd, request, data):
+        with self.lock:
+            size = sum(data.msgs[i].len + 1 for i in range(data.nmsgs))
+            self.advance(size * 9 * 1000000 // 400000)
+            return super().__call__(fd, request, data)
+
+
+@pytest.fixture
+def sensor(monkeypatch):
+    """A FakeSensor whose virtual clock drives the driver's ticks_us."""
+    sensor = FakeSensor()
+    monkeypatch.setattr(IMU, 'ticks_us', lambda: sensor.now)
+    return sensor
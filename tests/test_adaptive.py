@@ -0,0 +1,63 @@
+from array import array
+
+from adaptive import AdaptiveController
+from IMU import MPU6050_ACCEL_SENSITIVITY, Marker
+
+
+def frames(amplitude, count, accel_fs=0):
+    """Frames with the accel axes alternating +-`amplitude` g around 1g z."""
+    one_g = MPU6050_ACCEL_SENSITIVITY[accel_fs]
+    values = array('h')
+    for i in range(count):
+        a = int(amplitude * one_g) * (1 if i % 2 else -1)
+        values.extend([max(-32768, min(32767, v))
+                       for v in (a, a, one_g + a)] + [0, 0, 0])
+    return values
+
+
+def run(controller, amplitude, evaluations):
+    """
+    Feed `evaluations` steps of frames, return the levels after each.
+
+    After a change the window refills before the next evaluation.
+    """
+    levels = []
+    for _ in range(evaluations):
+        controller.feed(frames(amplitude, controller.stats.step,
+                               controller.accel_fs))
+        levels.append(controller.level)
+    return levels
+
+
+def test_profile_steps_up_and_down(mpu):
+    controller = AdaptiveController(mpu).start()
+    assert controller.read()[0].value[0] == 'idle'
+    # 0.03 g^2 of activity, past both up thresholds.
+    levels = run(controller, 0.1, 20)
+    assert levels[-1] == 2
+    # Each profile is held `hold` evaluations of a full window.
+    assert levels.index(1) == controller.steps + controller.hold - 2
+    assert isinstance(controller.pending, Marker)
+    assert controller.pending.value[:2] == ('active', controller.plan.rate)
+    # Still: steps back down, one profile per hold.
+    levels = run(controller, 0, 20)
+    assert levels[-1] == 0 and 1 in levels
+    assert controller.pending.value[0] == 'idle'
+
+
+def test_hysteresis_holds_profile(mpu):
+    controller = AdaptiveController(mpu).start(level=1)
+    # 0.003 g^2: below normal's up threshold, above its down one.
+    assert run(controller, 0.03, 12) == [1] * 12
+
+
+def test_accel_range_follows_peaks(mpu):
+    controller = AdaptiveController(mpu).start(level=2)
+    # A 3g shake clips at 2g, then fits 4g.
+    run(controller, 2, 10)
+    assert controller.accel_fs == 1
+    run(controller, 2, 20)
+    assert controller.accel_fs == 1
+    # At rest gravity fits the finest range again.
+    run(controller, 0, 10)
+    assert controller.accel_fs == 0
@@ -0,0 +1,43 @@
+from array import array
+
+import numpy as np
+import pytest
+from calibration import AccelCorrection, fit
+
+OFFSET = np.array((300., -150., 500.))
+# Symmetric scale and cross-axis error, LSB per nominal LSB.
+SCALE = np.array(((1.02, 0.01, -0.02),
+                  (0.01, 0.97, 0.015),
+                  (-0.02, 0.015, 1.05)))
+
+
+def poses(sensitivity=16384):
+    """Mean readings of 26 orientations seen through OFFSET and SCALE."""
+    directions = [np.array((x, y, z), float)
+                  for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)
+                  if x or y or z]
+    gravity = [d / np.linalg.norm(d) * sensitivity for d in directions]
+    return [(tuple(OFFSET + SCALE @ g), (10, -20, 5)) for g in gravity], \
+        gravity
+
+
+def test_fit_round_trip():
+    readings, gravity = poses()
+    calibration = fit(readings)
+    assert calibration['accel_offset'] == pytest.approx(OFFSET / 16384,
+                                                        abs=1e-9)
+    assert np.array(calibration['accel_matrix']) == pytest.approx(
+        np.linalg.inv(SCALE), abs=1e-9)
+    assert calibration['gyro_offset'] == pytest.approx((10 / 131, -20 / 131,
+                                                        5 / 131))
+    correction = AccelCorrection(calibration['accel_fixed'])
+    values = array('h', [int(round(v)) for pose in readings
+                         for v in pose[0]])
+    correction.apply(values)
+    assert np.array(values, float).reshape(-1, 3) == pytest.approx(
+        np.array(gravity), abs=10)
+
+
+def test_fit_needs_nine_poses():
+    with pytest.raises(ValueError):
+        fit(poses()[0][:8])
@@ -0,0 +1,25 @@
+from array import array
+from codec import Encoder, decode, decode_blocks
+
+
+def encode_all(blocks, width=6):
+    encoder = Encoder(width=width, frames=8)
+    stream = bytearray()
+    for values in blocks:
+        size = encoder.encode(array('h', values))
+        stream += encoder.out[:size]
+    return bytes(stream)
+
+
+def test_round_trip_with_empty_blocks():
+    blocks = [[], list(range(1, 13)), [], [100] * 6, [-32768, 32767] * 3,
+              []]
+    stream = encode_all(blocks)
+    expected = [v for values in blocks for v in values]
+    assert decode(stream).ravel().tolist() == expected
+    assert [block.ravel().tolist() for block in decode_blocks(stream)] \
+        == blocks
+
+
+def test_empty_stream():
+    assert decode(encode_all([[], []])).shape == (0, 0)
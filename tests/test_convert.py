@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from convert import Converter, LAYOUTS, WRITERS, convert_file
+
+
+def capture(tmp_path, frames, size=None):
+    path = tmp_path / 'imu07_0001.bin'
+    data = np.arange(frames * 7, dtype='>i2').tobytes()
+    path.write_bytes(data if size is None else data[:size])
+    return str(path)
+
+
+def load(output):
+    if output.endswith('.npz'):
+        with np.load(output) as columns:
+            return {name: columns[name] for name in columns.files}
+    pq = pytest.importorskip('pyarrow.parquet')
+    table = pq.read_table(output)
+    return {name: table[name].to_numpy() for name in table.column_names}
+
+
+@pytest.mark.parametrize('fmt', sorted(WRITERS))
+@pytest.mark.parametrize('frames, size', [(50, None), (0, None), (1, 5)])
+def test_convert_file(tmp_path, fmt, frames, size):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    path = capture(tmp_path, frames, size)
+    _, output, count = convert_file((path, str(tmp_path), fmt, {}, None,
+                                     16))
+    expected = frames if size is None else 0
+    assert count == expected
+    columns = load(output)
+    assert sorted(columns) == sorted(LAYOUTS['registers'])
+    reference = Converter().convert(
+        np.arange(expected * 7, dtype='>i2').tobytes())
+    for name, values in columns.items():
+        assert np.allclose(values, reference[name])
@@ -0,0 +1,110 @@
+import time
+
+from IMU import FifoBatch, FifoGap, MPU6050, Sampler
+
+
+def drain(mpu, sensor, batches):
+    """Read the FIFO every 10ms, return (frames delivered, gaps)."""
+    frames = 0
+    gaps = []
+    for _ in range(batches):
+        sensor.advance(10000)
+        batch = mpu.read_fifo(12)
+        if isinstance(batch, FifoGap):
+            gaps.append(batch)
+        else:
+            frames += batch.count
+    return frames, gaps
+
+
+def test_overflow_counted_once(sensor):
+    mpu = MPU6050(sensor.bus())
+    mpu.fifo_resync()
+    # Long enough for the measured rate to settle.
+    delivered, gaps = drain(mpu, sensor, 100)
+    assert not gaps
+    # Consumer stall, timed so a sample lands while the FIFO is reset.
+    sensor.advance(1000200)
+    more, gaps = drain(mpu, sensor, 20)
+    delivered += more
+    assert len(gaps) == 1
+    assert mpu.counters['fifo_overflows'] == 1
+    lost = gaps[0].lost
+    assert mpu.counters['lost_samples'] == lost
+    # Frames not yet drained are neither delivered nor lost.
+    pending = len(sensor.fifo) // 12
+    assert abs(sensor.produced - pending - delivered - lost) <= 1
+
+
+def wait(sampler, fill=None):
+    """Poll the worker until `get` has a record, or the back block fill."""
+    for _ in range(2000):
+        if fill is not None:
+            if sampler.fill == fill:
+                return None
+        else:
+            batch = sampler.get()
+            if batch:
+                return batch
+        time.sleep(0.001)
+    raise AssertionError('sampler worker stalled')
+
+
+def first_frame(batch):
+    return int.from_bytes(batch.data[:2], 'big')
+
+
+def test_sampler_handoff(sensor):
+    mpu = MPU6050(sensor.bus())
+    mpu.fifo_resync()
+    sampler = Sampler(mpu, frames=32).start()
+    try:
+        sensor.advance(40000)
+        batch = wait(sampler)
+        assert isinstance(batch, FifoBatch) and batch.count == 32
+        frames = [int.from_bytes(batch.data[i:i + 2], 'big')
+                  for i in range(0, 32 * 12, 12)]
+        assert frames == list(range(frames[0], frames[0] + 32))
+        # The held front block is not swapped out under the consumer.
+        sensor.advance(40000)
+        wait(sampler, fill=32 * 12)
+        assert sampler.get() is None
+        sampler.release()
+        assert first_frame(wait(sampler)) == frames[0] + 32
+    finally:
+        sampler.stop()
+
+
+def test_sampler_gap(sensor):
+    mpu = MPU6050(sensor.bus())
+    mpu.fifo_resync()
+    sampler = Sampler(mpu, frames=32).start()
+    try:
+        # Long enough for the measured rate to settle. Worker polling also
+        # moves the clock, so this stays below a block per round.
+        delivered = 0
+        for _ in range(20):
+            sensor.advance(16000)
+            delivered += wait(sampler).count
+            sampler.release()
+        delivered += wait(sampler).count
+        sensor.advance(40000)
+        wait(sampler, fill=32 * 12)
+        sensor.advance(1000000)  # held block, the FIFO overflows
+        sampler.release()
+        delivered += wait(sampler).count
+        sampler.release()
+        sensor.advance(40000)
+        gap = wait(sampler)
+        assert isinstance(gap, FifoGap)
+        batch = wait(sampler)
+        assert isinstance(batch, FifoBatch)
+        delivered += batch.count
+        assert mpu.counters['fifo_overflows'] == 1
+        assert mpu.counters['lost_samples'] == gap.lost
+        sampler.stop()
+        # Frames still in the FIFO or the back block are not lost.
+        pending = len(sensor.fifo) // 12 + sampler.fill // 12
+        assert abs(sensor.produced - pending - delivered - gap.lost) <= 1
+    finally:
+        sampler.stop()
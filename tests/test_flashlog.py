@@ -0,0 +1,70 @@
+from IMU import FifoBatch, FifoGap, Marker
+from flashlog import FlashLogger, read_blocks, read_records
+
+
+def batch(i):
+    return FifoBatch(i * 1000, 2, bytes([i]) * 24)
+
+
+def records(logger):
+    found = []
+    for index in logger.indexes():
+        found += read_records(logger.path(index), logger.block_size)
+    return found
+
+
+def test_round_trip(tmp_path):
+    logger = FlashLogger(str(tmp_path / 'imu'), block_size=256,
+                         blocks_per_file=3)
+    logged = [batch(1), FifoGap(5, 0, b'', 42),
+              Marker(6, 0, b'', 'profile', ['idle', 25])]
+    logged += [batch(i) for i in range(2, 30)]
+    for record in logged:
+        logger.log(record)
+    logger.close()
+    assert len(logger.indexes()) > 1
+    assert records(logger) == logged
+
+
+def test_torn_block(tmp_path):
+    logger = FlashLogger(str(tmp_path / 'imu'), block_size=256)
+    for i in range(20):
+        logger.log(batch(i))
+    logger.close()
+    path = logger.path(0)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:-10])
+    assert len(list(read_blocks(path, 256))) == len(data) // 256 - 1
+
+
+def test_restart_keeps_data(tmp_path):
+    prefix = str(tmp_path / 'imu')
+    logger = FlashLogger(prefix, block_size=256, keep=2)
+    for i in range(6):
+        logger.log(batch(i))
+    logger.close()
+    written = records(logger)
+    seq = logger.seq
+    for _ in range(2):
+        # Power lost before the first block of the new file.
+        logger = FlashLogger(prefix, block_size=256, keep=2)
+        logger.file.close()
+    assert logger.indexes() == [0, 1]
+    assert logger.seq == seq
+    assert records(logger) == written
+    logger = FlashLogger(prefix, block_size=256, keep=2)
+    logger.log(batch(7))
+    logger.close()
+    assert [s for s, _ in read_blocks(logger.path(1), 256)] == [seq]
+
+
+def test_keep(tmp_path):
+    logger = FlashLogger(str(tmp_path / 'imu'), block_size=256,
+                         blocks_per_file=1, keep=2)
+    for i in range(40):
+        logger.log(batch(i))
+    assert len(logger.indexes()) == 3
+    logger.close()
+    assert len(logger.indexes()) == 3
@@ -0,0 +1,69 @@
+from conftest import FakeSensor
+from fsync import SyncGroup, sync_edges, sync_offset
+from IMU import MPU6050
+
+
+class FsyncSensor(FakeSensor):
+    """FakeSensor latching FSYNC into ACCEL_ZOUT_L of the next frame."""
+
+    def __init__(self):
+        super().__init__()
+        self.latched = False
+
+    def frame(self, seq):
+        frame = bytearray(super().frame(seq))
+        frame[5] = self.latched
+        self.latched = False
+        return frame
+
+
+class Strobe():
+    """FSYNC line shared by `sensors`."""
+
+    def __init__(self, sensors):
+        self.sensors = sensors
+        self.level = 0
+
+    def value(self, level):
+        if level and not self.level:
+            for sensor in self.sensors:
+                sensor.latched = True
+        self.level = level
+
+
+def test_sync_offset():
+    # Accel, then gyro: ACCEL_ZOUT_L is byte 5, GYRO_XOUT_L byte 7.
+    assert sync_offset(7, 0x78) == 5
+    assert sync_offset(2, 0x78) == 7
+    # With TEMP in the FIFO, the gyro moves back 2 bytes.
+    assert sync_offset(2, 0xF8) == 9
+
+
+def test_sync_edges():
+    frames = bytes((1, 1, 0, 1, 0))
+    assert sync_edges(frames, 5, 1, 0) == ([0, 3], 0)
+    # A flag still high from the previous batch is no edge.
+    assert sync_edges(frames, 5, 1, 0, level=1) == ([3], 0)
+
+
+def test_group_alignment():
+    sensors = (FsyncSensor(), FsyncSensor())
+    group = SyncGroup([MPU6050(sensor.bus()) for sensor in sensors],
+                      Strobe(sensors)).configure()
+    # Sample number of each stream's first frame.
+    first = [sensor.produced - len(sensor.fifo) // 12 for sensor in sensors]
+    assert group.offsets() is None
+    # The second sensor runs 3ms ahead.
+    sensors[0].advance(10000)
+    sensors[1].advance(13000)
+    for _ in range(3):
+        pulsed = [sensor.produced - start
+                  for sensor, start in zip(sensors, first)]
+        group.pulse()
+        for sensor in sensors:
+            sensor.advance(20000)
+        group.read()
+        assert group.offsets() == (0, pulsed[1] - pulsed[0])
+    assert pulsed[1] - pulsed[0] >= 3
+    for stream, sensor in zip(group.streams, sensors):
+        assert stream.frames == sensor.produced - len(sensor.fifo) // 12
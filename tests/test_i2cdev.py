@@ -0,0 +1,26 @@
+import pytest
+from IMU import MPU6050, MPUException
+from i2cdev import FakeDevice
+
+
+def test_registers(device, mpu):
+    assert mpu.test_connection()
+    mpu.initialize()
+    mpu.set_sample_rate(7)
+    assert device.registers[0x68][0x19] == 7
+    device.registers[0x68][0x3B:0x41] = bytes((0xFF, 0xFE, 0, 1, 0x40, 0))
+    assert tuple(mpu.accel()) == (-2, 1, 16384)
+
+
+def test_scan(device):
+    device.add(0x69)
+    assert device.bus().scan() == [0x68, 0x69]
+
+
+def test_missing_device():
+    mpu = MPU6050(FakeDevice().bus(), sda=21, scl=22)
+    mpu.backoff_ms = 0
+    # No pins to drive without machine, so no bus recovery either.
+    assert not mpu.recover_bus()
+    with pytest.raises(MPUException):
+        mpu.read_byte(0x75)
@@ -0,0 +1,82 @@
+import pytest
+import IMU
+from IMU import MPU6050, MPUException
+
+
+def test_field_keywords(mpu):
+    mpu.set_sample_rate(rate=4)
+    mpu.set_dlpf_mode(mode=3)
+    mpu.set_full_scale_accel_range(afs_sel=1)
+    mpu.set_sleep_enabled(enabled=False)
+    assert (mpu.get_sample_rate(), mpu.get_dlpf_mode(),
+            mpu.get_full_scale_accel_range()) == (4, 3, 1)
+    with pytest.raises(TypeError):
+        mpu.set_dlpf_mode(rate=3)
+
+
+def test_plan_output_rate(mpu):
+    plan = mpu.plan_output_rate(200)
+    assert (plan.rate, plan.warnings) == (200, [])
+    assert mpu.plan_output_rate(1).warnings == [
+        '3.90625 Hz is the closest rate to 1 Hz']
+    for rate in (0, -5):
+        with pytest.raises(ValueError):
+            mpu.plan_output_rate(rate)
+
+
+class FlakyBus():
+    """A FakeDevice bus failing every read above `limit` Hz."""
+
+    def __init__(self, device, freq, limit):
+        self.bus = device.bus()
+        self.freq = freq
+        self.limit = limit
+
+    def readfrom_mem_into(self, addr, memaddr, buf):
+        if self.freq > self.limit:
+            raise OSError(5, 'EIO')
+        self.bus.readfrom_mem_into(addr, memaddr, buf)
+
+    def writeto_mem(self, addr, memaddr, buf):
+        self.bus.writeto_mem(addr, memaddr, buf)
+
+
+@pytest.fixture
+def flaky(device, monkeypatch):
+    """Patch machine.I2C and Pin with FlakyBus, return a setter for limit."""
+    limit = [400000]
+    monkeypatch.setattr(IMU, 'Pin', lambda pin: pin)
+    monkeypatch.setattr(IMU, 'I2C', lambda sda, scl, freq: FlakyBus(
+        device, freq, limit[0]))
+    return limit
+
+
+def test_tune_link(device, flaky):
+    mpu = MPU6050(FlakyBus(device, 100000, 400000), freq=100000,
+                  sda=21, scl=22)
+    report = mpu.tune_link(trials=5)
+    assert report.freq == mpu.freq == mpu.i2c.freq == 400000
+    assert [step.errors for step in report.steps] == [0, 0, 5]
+
+
+def test_tune_link_failure(device, flaky):
+    mpu = MPU6050(FlakyBus(device, 100000, 400000), freq=100000,
+                  sda=21, scl=22)
+    flaky[0] = 0
+    with pytest.raises(MPUException):
+        mpu.tune_link(freqs=(400000, 800000), trials=5)
+    assert mpu.freq == mpu.i2c.freq == 100000
+
+
+def test_tune_link_without_machine(device):
+    mpu = MPU6050(device.bus(), sda=21, scl=22)
+    with pytest.raises(MPUException):
+        mpu.tune_link()
+
+
+def test_factory_trim(device, mpu):
+    # XA_TEST 22, YA_TEST 13, ZA_TEST 1, XG_TEST 16, YG_TEST 1, ZG_TEST 0
+    device.registers[0x68][0x0D:0x11] = bytes((0b10110000, 0b01100001,
+                                                0b00000000, 0b00100101))
+    assert mpu.factory_trim() == pytest.approx(
+        (2795.4717, 2073.7788, 1392.64, 6429.6387, -3275, 0))
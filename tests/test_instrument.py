@@ -0,0 +1,49 @@
+import json
+
+from IMU import FifoBatch, FifoGap, MPU6050_FIFO_SIZE
+from instrument import Histogram, LoopMonitor
+
+
+def test_histogram_bucket_edges():
+    histogram = Histogram((10, 20, 50))
+    # An edge value is counted in the bucket it bounds.
+    for value in (0, 10, 11, 20, 21, 50, 51, 1000):
+        histogram.add(value)
+    assert list(histogram.counts) == [2, 2, 2, 2]
+    assert histogram.count == 8
+    assert histogram.high == 1000
+
+
+def test_histogram_percentile():
+    histogram = Histogram((10, 20, 50))
+    assert histogram.percentile(50) == 0
+    for value in [5] * 98 + [15, 70]:
+        histogram.add(value)
+    assert histogram.percentile(50) == 10
+    assert histogram.percentile(99) == 20
+    # Past the last edge the high-water mark is the bound.
+    assert histogram.percentile(100) == 70
+    histogram.reset()
+    assert list(histogram.counts) == [0, 0, 0, 0]
+    assert histogram.count == histogram.high == 0
+
+
+def test_loop_monitor(mpu):
+    monitor = LoopMonitor(mpu, frame_size=12, period_us=1000,
+                          deadline_us=5000)
+    for now in (0, 1000, 2300, 3000, 9000):
+        monitor.tick(now)
+    assert monitor.loops == 5
+    assert monitor.misses == 1
+    assert list(monitor.jitter.counts[:6]) == [1, 0, 0, 2, 0, 0]
+    assert monitor.jitter.high == 5000
+    sample_us = monitor.sample_us
+    monitor.observe(FifoBatch(1000, 4, bytes(48)), now=1500)
+    assert monitor.latency.high == 500 + 3 * sample_us
+    assert monitor.fifo.high == 48
+    monitor.observe(FifoGap(2000, 0, b'', 90))
+    assert monitor.gaps == 1 and monitor.saturated()
+    assert monitor.fifo.high == MPU6050_FIFO_SIZE
+    snapshot = json.loads(monitor.export())
+    assert snapshot['batches'] == 1
+    assert snapshot['fifo_bytes']['count'] == 2